@@ -1,20 +1,62 @@
+# Mode async (eventlet/gevent) harus monkey patch sebelum import lain
+import async_runtime
+async_runtime.patch()
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
-import pandas as pd
 import numpy as np
 import joblib
 from datetime import datetime
 import traceback
+import atexit
+import contextlib
+import io
 import os
 from collections import defaultdict
 import logging
 import threading
 import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from fallback_estimator import FallbackEstimator
+from feature_row import FeatureRowBuilder
+from feature_pipeline import (
+    MODEL_FEATURES, build_serving_frame, clean_categorical_value, finalize_features, lokasi_key,
+    serving_stages,
+)
+from accuracy_monitor import AccuracyMonitor
+from async_runtime import ASYNC_MODE, run_cpu, server_kwargs
+from block_optimizer import alternative_block_code, candidate_blocks, fifo_baseline, solve_assignment
+from calendar_features import build_calendar_table, parse_gate_in_time
+from congestion_tracker import CongestionTracker
+from gate_feed import GateFeedSubscriber
+from ingest_control import ClientRateLimiter, IngestQueue
+from load_generator import SyntheticYard
+from lookup_store import has_lookup_store, load_lookup_store
+from lookup_telemetry import LookupTelemetry
+from payload_normalizer import (
+    FIELD_ALIASES, REST_DEFAULTS, SOCKET_DEFAULTS, TruckRecord, compile_normalizer, parse_block,
+)
+from process_memory import read_process_memory
+from prediction_cube import compute_fingerprint, load_cube, model_artifact_paths
+import profiling_hook
+from profiling_hook import profiled
+from queue_store import BlockQueues
+from service_metrics import metrics
+from timer_wheel import TimerWheel
+from truck_archive import TruckArchive
+from truck_entry import QueuedTruck
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Message queue (mis. redis://localhost:6379/0) agar broadcast sampai ke semua
+# worker saat berjalan lebih dari satu proses (prefork.py)
+SOCKETIO_MESSAGE_QUEUE = os.getenv('ARTG_SOCKETIO_MESSAGE_QUEUE') or None
+socketio = SocketIO(
+    app, cors_allowed_origins="*", async_mode=ASYNC_MODE, message_queue=SOCKETIO_MESSAGE_QUEUE
+)
 
 # Logging dasar untuk debugging
 logging.basicConfig(level=logging.INFO)
@@ -24,9 +66,6 @@ logger = logging.getLogger(__name__)
 # VARIABEL GLOBAL
 # ============================================================================
 
-# Struktur antrian: {block_id: [truck1, truck2, ...]}
-QUEUES = defaultdict(list)
-
 # Label nama blok
 BLOCK_LABELS = {
     1: "CY1",
@@ -38,6 +77,10 @@ BLOCK_LABELS = {
     7: "D1"
 }
 
+# Struktur antrian: {block_id: (QueuedTruck, QueuedTruck, ...)}
+# Lock per blok untuk penulis, snapshot tuple copy-on-write untuk pembaca
+QUEUES = BlockQueues(BLOCK_LABELS.keys())
+
 # Mapping stack (tier) ke block_id yang valid
 # Stack/Tier dan Block harus match - CY D1 hanya accept stack D1
 STACK_TO_BLOCK_MAPPING = {
@@ -72,13 +115,16 @@ processed_trucks_cache = {}
 cache_lock = threading.Lock()
 cleanup_thread = None
 cache_initialized = False
+cache_init_lock = threading.Lock()
 
 def initialize_cache_cleanup():
-    """Memulai thread pembersih cache (hanya sekali saat startup)"""
+    """Memulai thread pembersih cache (sekali per proses: startup worker, gate feed, atau koneksi pertama)"""
     global cleanup_thread, cache_initialized
     
-    if cache_initialized:
-        return
+    with cache_init_lock:
+        if cache_initialized:
+            return
+        cache_initialized = True
     
     def cleanup_cache():
         """Menghapus entri cache yang berusia lebih dari 60 detik"""
@@ -101,7 +147,6 @@ def initialize_cache_cleanup():
     
     cleanup_thread = threading.Thread(target=cleanup_cache, daemon=True)
     cleanup_thread.start()
-    cache_initialized = True
     logger.info("Deduplication cache cleanup thread initialized")
 
 print("="*80)
@@ -119,13 +164,27 @@ try:
     print("[OK] Label encoders loaded")
     
     features_list = joblib.load(os.path.join(model_dir, 'features_list_2_bulan.pkl'))
+    # features_list hasil pruning: tahap lookup yang tidak dipakai model dilewati
+    feature_stages = serving_stages(features_list)
     print("[OK] Features list loaded")
     
-    lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
-    print("[OK] Lookup tables loaded")
+    # Prioritaskan lookup store kolom (memory-mapped), fallback ke pickle lama
+    lookup_store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(lookup_store_dir):
+        lookup_tables = load_lookup_store(lookup_store_dir)
+        print("[OK] Lookup tables loaded (columnar, memory-mapped)")
+    else:
+        lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
+        print("[OK] Lookup tables loaded")
+    
+    # Fitur waktu per (tanggal, jam) dihitung sekali saat startup
+    calendar_table = build_calendar_table(lookup_tables)
+    print("[OK] Calendar feature table built")
     
     print(f"\nConfiguration:")
     print(f"   Total features: {len(features_list)}")
+    if len(features_list) < len(MODEL_FEATURES):
+        print(f"   Pruned feature set: serving stages {', '.join(sorted(feature_stages)) or '-'}")
     print(f"   Shift type: {lookup_tables['metadata']['shift_type']}")
     print(f"   Target mean: {lookup_tables['metadata']['target_mean']:.2f} minutes")
     print("="*80)
@@ -139,22 +198,6 @@ except Exception as e:
 # HELPER FUNCTIONS - FEATURE ENGINEERING (MATCH DENGAN TRAINING!)
 # ============================================================================
 
-def clean_categorical_value(value):
-    """Bersihkan nilai kategorikal untuk konsistensi"""
-    s = str(value).strip()
-    if s.endswith('.0'):
-        s = s[:-2]
-    return s
-
-def calculate_shift(hour):
-    """Hitung shift (8 shift, interval 3 jam)"""
-    shift_index = hour // 3
-    return f'shift_{shift_index + 1}'
-
-def get_lookup_value(lookup_dict, key, default_value):
-    """Ambil nilai dari dictionary lookup dengan aman"""
-    return lookup_dict.get(key, default_value)
-
 def validate_stack_for_block(tier_val, block_num):
     """
     Validasi bahwa tier/stack yang dikirim sesuai dengan block tujuan.
@@ -188,305 +231,728 @@ def validate_stack_for_block(tier_val, block_num):
     except Exception as e:
         return False, f"Validation error: {str(e)}"
 
-def engineer_features(input_data):
+# Normalizer payload dikompilasi sekali, dipakai semua entry point (REST + WebSocket)
+payload_normalizer = compile_normalizer(FIELD_ALIASES, validate_stack_for_block)
+
+def build_queue_entry(record, predicted_duration, degraded_reason=None):
     """
-    Rekayasa SEMUA 45 fitur dari data input mentah.
-    MATCH DENGAN TRAINING DATASET 2 BULAN!
+    Bentuk objek truk untuk disimpan di QUEUES dari TruckRecord.
+    QueuedTruck (__slots__, string di-intern); JSON lewat .to_dict() di endpoint.
     """
+    return QueuedTruck.from_record(record, predicted_duration, degraded_reason)
+
+# Telemetri miss lookup tables / fallback label encoder untuk traffic satu truk
+# (batch demo/cube/optimizer tidak dihitung), top-K key miss dan warm set per ruang key
+LOOKUP_TELEMETRY = os.getenv('ARTG_LOOKUP_TELEMETRY', '1').lower() in ('1', 'true', 'yes')
+LOOKUP_TELEMETRY_TOP_K = int(os.getenv('ARTG_LOOKUP_TELEMETRY_TOP_K', '200'))
+LOOKUP_TELEMETRY_WARM_K = int(os.getenv('ARTG_LOOKUP_TELEMETRY_WARM_K', '1000'))
+# Warm set hanya menerima 1 dari N lookup (overhead kecil per truk)
+LOOKUP_TELEMETRY_WARM_SAMPLE = int(os.getenv('ARTG_LOOKUP_TELEMETRY_WARM_SAMPLE', '10'))
+
+lookup_telemetry = None
+tracked_lookup_tables = lookup_tables
+if LOOKUP_TELEMETRY:
+    lookup_telemetry = LookupTelemetry(LOOKUP_TELEMETRY_TOP_K, LOOKUP_TELEMETRY_WARM_K, LOOKUP_TELEMETRY_WARM_SAMPLE)
+    tracked_lookup_tables = lookup_telemetry.instrument(lookup_tables)
+
+def engineer_features(input_data, live_congestion=None, tracked=False):
+    """
+    Rekayasa SEMUA 45 fitur dari data input mentah.
+    MATCH DENGAN TRAINING DATASET 2 BULAN! (definisi di feature_pipeline.py)
     
-    df = pd.DataFrame([input_data])
-    overall_avg = lookup_tables['overall_avg']
-    
-    # ========================================================================
-    # 1. BERSIHKAN FITUR KATEGORI
-    # ========================================================================
-    
-    df['slot'] = df['slot'].apply(clean_categorical_value)
-    df['tier'] = df['tier'].apply(clean_categorical_value)
-    df['block'] = df['block'].apply(clean_categorical_value)
-    
-    if 'row' in df.columns:
-        df['row'] = df['row'].apply(clean_categorical_value)
-        df['row_numeric'] = pd.to_numeric(df['row'], errors='coerce').fillna(0).astype(int)
-    else:
-        df['row_numeric'] = 0
-    
-    # Buat LOKASI
-    df['LOKASI'] = df['slot'] + ' ' + df['row_numeric'].astype(str) + ' ' + df['tier']
-    
-    # ========================================================================
-    # 2. FITUR WAKTU
-    # ========================================================================
-    
-    gate_in_raw = input_data.get('gate_in_time') or input_data.get('gate_in') or datetime.now().isoformat()
-    try:
-        gate_in_dt = pd.to_datetime(gate_in_raw)
-        if pd.isna(gate_in_dt):
-            gate_in_dt = pd.Timestamp(datetime.now())
-    except Exception:
-        gate_in_dt = pd.Timestamp(datetime.now())
-    
-    current_time = gate_in_dt.to_pydatetime()
-    df['gate_in_hour'] = current_time.hour
-    df['gate_in_dayofweek'] = current_time.weekday()
-    df['gate_in_day'] = current_time.day
-    df['gate_in_month'] = current_time.month
-    
-    # Hitung shift (8 shift, interval 3 jam)
-    df['gate_in_shift'] = df['gate_in_hour'].apply(calculate_shift)
-    
-    df['gate_in_is_weekend'] = (df['gate_in_dayofweek'] >= 5).astype(int)
-    df['gate_in_is_peak'] = df['gate_in_hour'].isin([9, 10, 11, 13, 14, 15]).astype(int)
-    
-    # ========================================================================
-    # 3. FITUR LOKASI NUMERIK
-    # ========================================================================
-    
-    df['slot_numeric'] = pd.to_numeric(df['slot'], errors='coerce').fillna(0).astype(int)
-    df['tier_numeric'] = pd.to_numeric(df['tier'], errors='coerce').fillna(0).astype(int)
-    df['block_numeric'] = df['block'].str.extract(r'(\d+)').astype(float).fillna(0).astype(int)
+    input_data: dict satu truk, atau list dict / DataFrame untuk batch
+    (dipakai build_prediction_cube.py). Hasil: satu baris fitur per truk.
+    live_congestion: hasil live_congestion_inputs() (ambil di luar run_cpu),
+    None = kepadatan statis saja.
+    tracked=True: miss lookup/encoder dicatat ke lookup_telemetry (traffic produksi).
+    """
     
-    df['distance_from_gate'] = (
-        df['slot_numeric'] * 10 + 
-        df['row_numeric'] * 2 + 
-        df['tier_numeric'] * 3
+    df = build_serving_frame(
+        input_data, tracked_lookup_tables if tracked else lookup_tables, calendar_table,
+        live_congestion=live_congestion,
+        stages=feature_stages,
     )
-    df['vertical_distance'] = df['tier_numeric'] ** 2
-    
-    # ========================================================================
-    # 4. FITUR KEPADATAN
-    # ========================================================================
     
-    df['hourly_volume'] = df['gate_in_hour'].apply(
-        lambda h: get_lookup_value(lookup_tables['hourly_volume'], h, 50)
-    )
+    # Penting: label encode + urutkan fitur agar sesuai urutan pelatihan
+    print(f"\nReordering features to match features_list...")
+    print(f"   Features in engineer_features: {len(MODEL_FEATURES)}")
+    print(f"   Features in features_list: {len(features_list)}")
     
-    df['hour_slot_key'] = df['gate_in_hour'].astype(str) + '_' + df['slot']
-    df['congestion_count'] = df['hour_slot_key'].apply(
-        lambda k: get_lookup_value(lookup_tables['congestion_by_hour_slot'], k, 10)
+    X = finalize_features(
+        df, label_encoders, features_list, telemetry=lookup_telemetry if tracked else None
     )
     
-    # ========================================================================
-    # 5. FITUR HISTORIS
-    # ========================================================================
+    print(f"   Features reordered successfully")
     
-    df['slot_historical_avg'] = df['slot'].apply(
-        lambda s: get_lookup_value(lookup_tables['slot_historical_avg'], s, overall_avg)
+    return X
+
+# Jalur cepat satu truk: fitur langsung ke buffer float prealokasi per thread,
+# model.predict tanpa DataFrame (feature_row.py). Batch tetap engineer_features.
+SINGLE_ROW_FAST_PATH = os.getenv('ARTG_SINGLE_ROW_FAST_PATH', '1').lower() in ('1', 'true', 'yes')
+
+feature_row_builder = None
+if SINGLE_ROW_FAST_PATH:
+    try:
+        feature_row_builder = FeatureRowBuilder(
+            tracked_lookup_tables, calendar_table, label_encoders, features_list, feature_stages,
+            telemetry=lookup_telemetry,
+        )
+        # Model di-fit dengan DataFrame; input array memang tanpa nama kolom
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        print("[OK] Single-row fast path enabled (preallocated feature buffer)")
+    except ValueError as e:
+        print(f"[WARN] Single-row fast path disabled: {e}")
+
+def single_row_features(record, live_congestion=None):
+    """
+    Fitur satu TruckRecord untuk model.predict: buffer (1, n) milik thread ini
+    (dipakai ulang, salin jika perlu disimpan), atau DataFrame engineer_features
+    jika jalur cepat nonaktif. live_congestion seperti engineer_features.
+    """
+    if feature_row_builder is None:
+        return engineer_features(record.to_feature_input(), live_congestion, tracked=True)
+    return feature_row_builder.fill(record.to_feature_input(), live_congestion)
+
+def compute_single_row_features(record):
+    """
+    single_row_features lewat run_cpu. Snapshot kepadatan live dan drain
+    telemetri lookup dilakukan di sisi pemanggil (tanpa lock di thread CPU).
+    """
+    X = run_cpu(single_row_features, record, live_congestion_inputs((record,)))
+    if lookup_telemetry is not None:
+        lookup_telemetry.drain()
+    return X
+
+# ============================================================================
+# KEPADATAN LIVE (jendela geser dari kedatangan truk yang diterima)
+# ============================================================================
+
+# Jendela counter (menit), jendela yang dipakai fitur, dan bobot campuran
+# live vs statis untuk congestion_count/hourly_volume (0 = statis saja)
+LIVE_WINDOWS_MIN = tuple(
+    int(w) for w in os.getenv('ARTG_LIVE_WINDOWS_MIN', '15,60').split(',') if w.strip()
+)
+LIVE_FEATURE_WINDOW_MIN = int(os.getenv('ARTG_LIVE_FEATURE_WINDOW_MIN', '60'))
+LIVE_CONGESTION_WEIGHT = min(1.0, max(0.0, float(os.getenv('ARTG_LIVE_CONGESTION_WEIGHT', '0'))))
+# Jumlah hari histori lookup tables (skala hitungan per jam -> skala 2 bulan)
+LIVE_HISTORY_DAYS = float(os.getenv('ARTG_LIVE_HISTORY_DAYS', '60'))
+
+# Counter per slot/blok hanya untuk kosakata lookup tables / blok yard
+congestion_tracker = CongestionTracker(
+    LIVE_WINDOWS_MIN, LIVE_FEATURE_WINDOW_MIN, LIVE_HISTORY_DAYS,
+    known_slots=lookup_tables['slot_historical_avg'].keys(),
+    known_blocks=BLOCK_LABELS.keys(),
+)
+
+def record_arrival(record):
+    """Catat kedatangan truk yang diterima ke counter kepadatan live."""
+    congestion_tracker.record(clean_categorical_value(record.slot), record.block_id)
+
+def live_congestion_inputs(records):
+    """
+    Argumen live_congestion untuk truk `records` (None jika bobot 0): hanya slot
+    truk tersebut yang dibaca. Ambil sebelum run_cpu (lock congestion_tracker
+    tidak boleh diambil di thread CPU).
+    """
+    if LIVE_CONGESTION_WEIGHT <= 0:
+        return None
+    slot_congestion = {}
+    hourly_volume = 0.0
+    for slot in {clean_categorical_value(r.slot) for r in records}:
+        slot_congestion[slot], hourly_volume = congestion_tracker.feature_inputs(slot)
+    return slot_congestion, hourly_volume, LIVE_CONGESTION_WEIGHT
+
+if LIVE_CONGESTION_WEIGHT > 0:
+    print(f"[OK] Live congestion blended into features | weight {LIVE_CONGESTION_WEIGHT} "
+          f"| window {LIVE_FEATURE_WINDOW_MIN} min")
+
+# ============================================================================
+# PREDICTION CUBE (prediksi terhitung untuk key yard yang dikenal)
+# ============================================================================
+
+PREDICTION_CUBE_DIR = os.getenv('ARTG_PREDICTION_CUBE_DIR', os.path.join(model_dir, 'prediction_cube'))
+
+model_fingerprint = None
+
+def get_model_fingerprint():
+    """sha256 artefak model (dihitung sekali, dipakai cube dan arsip truk)."""
+    global model_fingerprint
+    if model_fingerprint is None:
+        model_fingerprint = compute_fingerprint(model_artifact_paths(model_dir))
+    return model_fingerprint
+
+prediction_cube = None
+if LIVE_CONGESTION_WEIGHT > 0:
+    # Cube berisi prediksi dengan kepadatan statis
+    print("[WARN] Prediction cube not used: live congestion is enabled")
+elif os.path.isdir(PREDICTION_CUBE_DIR):
+    try:
+        prediction_cube, cube_status = load_cube(
+            PREDICTION_CUBE_DIR,
+            expected_fingerprint=get_model_fingerprint(),
+        )
+        if prediction_cube is None:
+            print(f"[WARN] Prediction cube not used: {cube_status}")
+        else:
+            print(f"[OK] Prediction cube loaded | {prediction_cube.values.shape} "
+                  f"from {prediction_cube.manifest['start_date']}")
+    except Exception as e:
+        print(f"[WARN] Prediction cube not used: {e}")
+        prediction_cube = None
+
+def lookup_prediction_cube(record):
+    """
+    Prediksi dari cube untuk TruckRecord, atau None jika key tidak dikenal
+    (LOKASI/block/profil baru, tanggal di luar cube) -> inferensi live.
+    """
+    if prediction_cube is None:
+        return None
+    
+    # Key dibentuk dengan aturan yang sama dengan engineer_features
+    lokasi = lokasi_key(record.slot, record.row, record.tier)
+    
+    # JOB_TYPE hanya masuk model lewat label encoder (nilai asing -> classes_[0])
+    job_classes = label_encoders['JOB_TYPE'].classes_
+    job_type = record.job_type if record.job_type in job_classes else job_classes[0]
+    profile = (job_type, record.container_size, record.ctr_status, record.container_type)
+    
+    prediction = prediction_cube.lookup(
+        lokasi,
+        clean_categorical_value(record.block_code),
+        parse_gate_in_time(record.gate_in_time),
+        profile,
     )
+    metrics.inc('cube_hits' if prediction is not None else 'cube_misses')
+    return prediction
+
+# ============================================================================
+# ARSIP TRUK (ground truth untuk retraining / generate_lookups.py --archive)
+# ============================================================================
+
+# Direktori arsip ('' = nonaktif), ukuran segmen, interval flush, buffer dan retensi
+ARCHIVE_DIR = os.getenv('ARTG_ARCHIVE_DIR', 'archive')
+ARCHIVE_SEGMENT_ROWS = int(os.getenv('ARTG_ARCHIVE_SEGMENT_ROWS', '50000'))
+ARCHIVE_FLUSH_S = float(os.getenv('ARTG_ARCHIVE_FLUSH_S', '300'))
+ARCHIVE_BUFFER = int(os.getenv('ARTG_ARCHIVE_BUFFER', '100000'))
+ARCHIVE_MAX_MB = float(os.getenv('ARTG_ARCHIVE_MAX_MB', '512'))
+
+# Parent prefork.py tidak boleh menjalankan thread sebelum fork:
+# thread background dimulai per worker di init_worker()
+PREFORK_PARENT = os.getenv('ARTG_PREFORK_PARENT', '0') == '1'
+
+truck_archive = None
+
+def start_truck_archive():
+    """Mulai writer arsip (thread background) untuk proses ini."""
+    global truck_archive
+    if not ARCHIVE_DIR:
+        return
+    try:
+        truck_archive = TruckArchive(
+            ARCHIVE_DIR,
+            model_version=get_model_fingerprint()[:16],
+            segment_rows=ARCHIVE_SEGMENT_ROWS,
+            flush_interval_s=ARCHIVE_FLUSH_S,
+            buffer_size=ARCHIVE_BUFFER,
+            max_bytes=int(ARCHIVE_MAX_MB * 2**20),
+        )
+        atexit.register(truck_archive.close)
+        print(f"[OK] Truck archive: {ARCHIVE_DIR} (model version {truck_archive.model_version})")
+    except Exception as e:
+        print(f"[WARN] Truck archive disabled: {e}")
+        truck_archive = None
+
+if not PREFORK_PARENT:
+    start_truck_archive()
+
+def archive_trucks(trucks, block_id, reason):
+    """Catat truk yang keluar dari antrian ke arsip (non-blocking)."""
+    if truck_archive is not None and trucks:
+        truck_archive.extend(trucks, block_id, reason)
+
+# ============================================================================
+# SWEEPER TRUK KEDALUWARSA (timer wheel pada expected_ready_time + grace)
+# ============================================================================
+
+# Truk yang melewati expected_ready_time + grace dianggap selesai: keluar dari
+# QUEUES dan masuk arsip dengan removal_reason 'expired' (tidak dipakai sebagai
+# ground truth). Grace < 0 = nonaktif; tick = resolusi timer wheel (detik)
+EXPIRY_GRACE_MIN = float(os.getenv('ARTG_EXPIRY_GRACE_MIN', '30'))
+EXPIRY_TICK_S = float(os.getenv('ARTG_EXPIRY_TICK_S', '1'))
+
+expiry_wheel = TimerWheel(EXPIRY_TICK_S, now=time.time()) if EXPIRY_GRACE_MIN >= 0 else None
+expiry_thread = None
+metrics.register_gauge('expiry_scheduled', lambda: len(expiry_wheel) if expiry_wheel is not None else 0)
+
+def schedule_expiry(block_id, trucks):
+    """Daftarkan truk yang baru masuk QUEUES ke timer wheel (O(1) per truk)."""
+    if expiry_wheel is None:
+        return
+    grace_s = EXPIRY_GRACE_MIN * 60.0
+    for truck in trucks:
+        expiry_wheel.schedule(truck.expected_ready_ts + grace_s, (block_id, truck))
+
+def expire_due(now=None):
+    """
+    Keluarkan truk yang jatuh tempo dari QUEUES dan catat ke arsip.
+    Truk yang sudah dihapus / di-clear manual diabaikan (pembatalan lazy).
     
-    df['tier_historical_avg'] = df['tier'].apply(
-        lambda t: get_lookup_value(lookup_tables['tier_historical_avg'], t, overall_avg)
-    )
+    Returns:
+        dict: {block_id: tuple truk yang dikeluarkan}
+    """
+    due = defaultdict(list)
+    for block_id, truck in expiry_wheel.advance(time.time() if now is None else now):
+        due[block_id].append(truck)
+    removed = {}
+    for block_id, trucks in due.items():
+        gone = QUEUES.remove(block_id, trucks)
+        if gone:
+            archive_trucks(gone, block_id, 'expired')
+            removed[block_id] = gone
+    return removed
+
+def start_expiry_sweeper():
+    """Thread sweeper per proses (di pre-fork dimulai per worker)."""
+    global expiry_thread
+    if expiry_wheel is None or expiry_thread is not None:
+        return
     
-    df['lokasi_historical_avg'] = df['LOKASI'].apply(
-        lambda l: get_lookup_value(lookup_tables['lokasi_historical_avg'], l, overall_avg)
-    )
+    def sweep():
+        while True:
+            time.sleep(EXPIRY_TICK_S)
+            try:
+                removed = expire_due()
+                if not removed:
+                    continue
+                expired = [
+                    {'truck_id': truck.truck_id, 'block_id': block_id, 'block_name': BLOCK_LABELS[block_id]}
+                    for block_id, trucks in removed.items() for truck in trucks
+                ]
+                metrics.inc('trucks_expired', len(expired))
+                logger.info(f"Expired {len(expired)} overdue trucks")
+                socketio.emit('TRUCKS_EXPIRED', {
+                    'trucks': expired,
+                    'count': len(expired),
+                    'timestamp': datetime.now().isoformat()
+                })
+            except Exception as e:
+                logger.error(f"Expiry sweeper error: {e}", exc_info=True)
     
-    df['hour_historical_avg'] = df['gate_in_hour'].apply(
-        lambda h: get_lookup_value(lookup_tables['hour_historical_avg'], h, overall_avg)
+    expiry_thread = threading.Thread(target=sweep, name='expiry-sweeper', daemon=True)
+    expiry_thread.start()
+    print(f"[OK] Expiry sweeper: grace {EXPIRY_GRACE_MIN:g} min | tick {EXPIRY_TICK_S:g} s")
+
+if not PREFORK_PARENT:
+    start_expiry_sweeper()
+
+# ============================================================================
+# MONITOR AKURASI (error live dari waktu selesai aktual)
+# ============================================================================
+
+# Batas prediksi pending, half-life EWMA (jumlah sampel), sampel minimum
+# sebelum confidence memakai akurasi live block
+ACCURACY_MAX_PENDING = int(os.getenv('ARTG_ACCURACY_MAX_PENDING', '50000'))
+ACCURACY_HALFLIFE = int(os.getenv('ARTG_ACCURACY_HALFLIFE', '500'))
+ACCURACY_MIN_SAMPLES = int(os.getenv('ARTG_ACCURACY_MIN_SAMPLES', '50'))
+DEFAULT_CONFIDENCE = 0.85
+
+MODEL_VERSION = get_model_fingerprint()[:16]
+
+accuracy_monitor = AccuracyMonitor(ACCURACY_MAX_PENDING, ACCURACY_HALFLIFE, ACCURACY_MIN_SAMPLES)
+metrics.register_gauge('accuracy', accuracy_monitor.summary)
+
+def prediction_version(degraded_reason, prediction_tier):
+    """Label versi untuk grup akurasi: <fingerprint>:<tier> atau fallback."""
+    if degraded_reason is not None:
+        return 'fallback'
+    return f'{MODEL_VERSION}:{prediction_tier}'
+
+def register_prediction(record, prediction, degraded_reason, prediction_tier='ensemble'):
+    """Simpan prediksi terkirim sampai completion truk dilaporkan."""
+    gate_in = parse_gate_in_time(record.gate_in_time)
+    accuracy_monitor.register(
+        record.truck_id, prediction, record.block_id, gate_in.hour,
+        prediction_version(degraded_reason, prediction_tier), gate_in.timestamp(),
     )
+
+def record_completion(truck_id, data):
+    """
+    Catat completion dari payload {actual_minutes} atau {completed_at} (default: sekarang).
     
-    # ========================================================================
-    # 6. FITUR KONTAINER
-    # ========================================================================
-    
-    df['container_size_numeric'] = pd.to_numeric(
-        df['CONTAINER_SIZE'].astype(str).str.extract(r'(\d+)')[0], 
-        errors='coerce'
-    ).fillna(20).astype(int)
-    
-    df['is_empty'] = (df['CTR_STATUS'] == 'MTY').astype(int)
-    df['is_full'] = (df['CTR_STATUS'] == 'FCL').astype(int)
-    df['is_reefer'] = df['CONTAINER_TYPE'].str.contains('RF|REEFER|RH', case=False, na=False).astype(int)
-    df['is_special'] = df['CONTAINER_TYPE'].str.contains('OT|FR|FLAT|OPEN', case=False, na=False).astype(int)
-    
-    # ========================================================================
-    # 7. FITUR JAM SIBUK
-    # ========================================================================
+    Returns:
+        tuple: (hasil dict atau None, pesan error atau None)
+    """
+    data = data or {}
+    actual_minutes = data.get('actual_minutes')
+    completed_at = data.get('completed_at')
+    completed_ts = None
+    try:
+        if actual_minutes is not None:
+            actual_minutes = float(actual_minutes)
+            if not np.isfinite(actual_minutes) or actual_minutes < 0:
+                return None, 'actual_minutes must be a non-negative number'
+        elif completed_at is None:
+            completed_ts = time.time()
+        else:
+            # Timestamp tidak valid ditolak, bukan dianggap "selesai sekarang"
+            completed_ts = parse_gate_in_time(completed_at, strict=True).timestamp()
+    except (TypeError, ValueError, OverflowError):
+        return None, 'Invalid actual_minutes / completed_at'
     
-    df['is_morning_rush'] = df['gate_in_hour'].isin([8, 9, 10]).astype(int)
-    df['is_afternoon_rush'] = df['gate_in_hour'].isin([13, 14, 15]).astype(int)
-    df['is_rush_hour'] = (df['is_morning_rush'] | df['is_afternoon_rush']).astype(int)
+    try:
+        result = accuracy_monitor.complete(truck_id, actual_minutes, completed_ts)
+    except ValueError as e:
+        return None, str(e)
+    if result is None:
+        metrics.inc('completions_unmatched')
+        return None, f'No pending prediction for truck {truck_id}'
+    metrics.inc('completions_total')
+    return result, None
+
+# ============================================================================
+# LATENCY BUDGET & FALLBACK ESTIMATOR
+# ============================================================================
+
+# Budget latency per request (ms). 0 = tanpa budget, inferensi inline
+LATENCY_BUDGET_MS = float(os.getenv('ARTG_LATENCY_BUDGET_MS', '0'))
+# Jumlah thread inferensi dan antrian maksimum sebelum dianggap penuh
+INFERENCE_WORKERS = int(os.getenv('ARTG_INFERENCE_WORKERS', '4'))
+MAX_INFERENCE_QUEUE = int(os.getenv('ARTG_MAX_INFERENCE_QUEUE', '8'))
+
+fallback_estimator = FallbackEstimator(lookup_tables)
+inference_pool = None
+inference_inflight = 0
+inference_lock = threading.Lock()
+
+metrics.register_gauge('inference_inflight', lambda: inference_inflight)
+metrics.register_gauge('latency_budget_ms', lambda: LATENCY_BUDGET_MS)
+
+def get_inference_pool():
+    """Thread pool inferensi (dibuat saat pertama dipakai)."""
+    global inference_pool
+    if inference_pool is None:
+        with inference_lock:
+            if inference_pool is None:
+                inference_pool = ThreadPoolExecutor(
+                    max_workers=INFERENCE_WORKERS, thread_name_prefix='inference'
+                )
+    return inference_pool
+
+def _release_inference_slot(_future):
+    global inference_inflight
+    with inference_lock:
+        inference_inflight -= 1
+
+def run_inference(record, debug=False):
+    """Rekayasa fitur + model.predict untuk satu TruckRecord (bagian CPU-bound)."""
+    # Bagian CPU keluar dari event loop pada mode eventlet/gevent
+    X = compute_single_row_features(record)
+    
+    if debug:
+        # Diagnostik hanya untuk jalur debug (REST add_truck), bukan per event WebSocket
+        values = np.asarray(X, dtype=np.float64)
+        print(f"Features engineered successfully")
+        print(f"   Shape: {values.shape}")
+        print(f"   Columns: {values.shape[1]}")
+        
+        # Periksa nilai NaN/inf
+        print(f"   NaN values: {int(np.isnan(values).sum())}")
+        print(f"   Inf values: {int(np.isinf(values).sum())}")
+        
+        # Cetak 10 nilai fitur pertama
+        print(f"\nFirst 10 feature values:")
+        for i in range(min(10, values.shape[1])):
+            print(f"  {i+1}. {features_list[i]:30s} = {values[0, i]}")
+        
+        print("\nCalling model.predict()...")
     
-    # ========================================================================
-    # 8. FITUR INTERAKSI NUMERIK
-    # ========================================================================
+    started = time.perf_counter()
+    prediction = float(run_cpu(model.predict, X)[0])
+    metrics.observe('model_predict_ms', (time.perf_counter() - started) * 1000)
+    return prediction
+
+def estimate_fallback(record):
+    """Estimasi murah dari lookup tables (tanpa model)."""
+    try:
+        hour = parse_gate_in_time(record.gate_in_time).hour
+        return fallback_estimator.estimate(
+            record.slot, record.row, record.tier, record.block_code, hour
+        )
+    except Exception as e:
+        logger.error(f"Fallback estimator error: {e}")
+        return float(lookup_tables['metadata']['target_mean'])
+
+def predict_with_budget(record, debug=False):
+    """
+    Prediksi dengan latency budget.
     
-    df['slot_tier_interaction'] = df['slot_numeric'] * df['tier_numeric']
-    df['size_tier_interaction'] = df['container_size_numeric'] * df['tier_numeric']
-    df['congestion_tier'] = df['congestion_count'] * df['tier_numeric']
-    df['rush_hour_congestion'] = df['is_rush_hour'] * df['congestion_count']
+    Jika pool inferensi penuh, inferensi melewati budget, atau model error,
+    jawaban langsung diambil dari fallback estimator (ditandai degraded).
     
-    # ========================================================================
-    # 9. FITUR STATISTIK
-    # ========================================================================
+    Returns:
+        tuple: (prediction: float, degraded_reason: None | 'saturated' | 'timeout' | 'error')
+    """
+    global inference_inflight
+    started = time.perf_counter()
+    prediction = None
+    degraded_reason = None
     
-    df['slot_duration_std'] = df['slot'].apply(
-        lambda s: get_lookup_value(lookup_tables['slot_duration_std'], s, 0)
-    )
-    df['slot_duration_min'] = df['slot'].apply(
-        lambda s: get_lookup_value(lookup_tables['slot_duration_min'], s, 7.35)
-    )
-    df['slot_duration_max'] = df['slot'].apply(
-        lambda s: get_lookup_value(lookup_tables['slot_duration_max'], s, 42.47)
-    )
+    try:
+        cube_prediction = lookup_prediction_cube(record)
+        if cube_prediction is not None:
+            metrics.inc('predictions_total')
+            metrics.observe('prediction_latency_ms', (time.perf_counter() - started) * 1000)
+            return cube_prediction, None
+        
+        if LATENCY_BUDGET_MS <= 0:
+            prediction = run_inference(record, debug)
+        else:
+            with inference_lock:
+                saturated = inference_inflight >= INFERENCE_WORKERS + MAX_INFERENCE_QUEUE
+                if not saturated:
+                    inference_inflight += 1
+            
+            if saturated:
+                degraded_reason = 'saturated'
+            else:
+                future = get_inference_pool().submit(run_inference, record, debug)
+                future.add_done_callback(_release_inference_slot)
+                try:
+                    prediction = future.result(timeout=LATENCY_BUDGET_MS / 1000.0)
+                except FuturesTimeout:
+                    degraded_reason = 'timeout'
+    except Exception as e:
+        logger.error(f"Inference error for truck {record.truck_id}: {e}", exc_info=True)
+        degraded_reason = 'error'
     
-    # ========================================================================
-    # 10. FITUR LAG
-    # ========================================================================
+    if degraded_reason is not None:
+        prediction = estimate_fallback(record)
+        metrics.inc('predictions_degraded_total')
+        metrics.inc(f'predictions_degraded_{degraded_reason}')
     
-    location_key = df['LOKASI'].iloc[0]
-    location_hist = lookup_tables['location_history'].get(location_key, None)
+    metrics.inc('predictions_total')
+    metrics.observe('prediction_latency_ms', (time.perf_counter() - started) * 1000)
+    return prediction, degraded_reason
+
+# ============================================================================
+# PREDIKSI BERTINGKAT (fast model dulu, ensemble menyusul di background)
+# ============================================================================
+
+TIERED_PREDICTION = os.getenv('ARTG_TIERED_PREDICTION', '0').lower() in ('1', 'true', 'yes')
+# Nama base model cepat (lgbm / xgb / catboost)
+FAST_MODEL_NAME = os.getenv('ARTG_FAST_MODEL', 'lgbm')
+# Selisih minimum (menit) agar PREDICTION_REFINED dikirim
+REFINE_THRESHOLD_MIN = float(os.getenv('ARTG_REFINE_THRESHOLD_MIN', '1.0'))
+REFINE_WORKERS = int(os.getenv('ARTG_REFINE_WORKERS', '2'))
+MAX_REFINE_BACKLOG = int(os.getenv('ARTG_MAX_REFINE_BACKLOG', '64'))
+
+def load_fast_model(name):
+    """
+    Ambil model cepat untuk tier 1.
     
-    if location_hist:
-        df['prev_duration_same_location'] = location_hist['last_duration']
-        df['rolling_mean_3'] = location_hist['rolling_mean_3']
+    Prioritas: base estimator di dalam stacking ensemble (tanpa memori tambahan),
+    lalu all_models_2_bulan.pkl hasil notebook modeling.
+    """
+    named_estimators = getattr(model, 'named_estimators_', None)
+    if named_estimators is not None and name in named_estimators:
+        return named_estimators[name], f'{name} (ensemble base estimator)'
+    
+    all_models_path = os.path.join(model_dir, 'all_models_2_bulan.pkl')
+    if os.path.exists(all_models_path):
+        all_models = joblib.load(all_models_path)
+        if name in all_models:
+            return all_models[name], f'{name} (all_models_2_bulan.pkl)'
+    return None, None
+
+fast_model = None
+refine_pool = None
+refine_backlog = 0
+refine_lock = threading.Lock()
+
+if TIERED_PREDICTION:
+    fast_model, fast_model_source = load_fast_model(FAST_MODEL_NAME)
+    if fast_model is None:
+        print(f"[WARN] Tiered prediction disabled: fast model '{FAST_MODEL_NAME}' not found")
     else:
-        df['prev_duration_same_location'] = df['lokasi_historical_avg']
-        df['rolling_mean_3'] = df['lokasi_historical_avg']
-    
-    # ========================================================================
-    # 11. TARGET ENCODING
-    # ========================================================================
-    
-    df['BLOCK_target_enc'] = df['block'].apply(
-        lambda b: get_lookup_value(lookup_tables['BLOCK_target_enc'], b, overall_avg)
-    )
-    df['LOKASI_target_enc'] = df['lokasi_historical_avg']
-    
-    # ========================================================================
-    # 12. PILIH DAN URUTKAN FITUR
-    # ========================================================================
-    
-    categorical_features = [
-        'JOB_TYPE', 'CONTAINER_SIZE', 'CTR_STATUS', 'CONTAINER_TYPE',
-        'slot', 'tier', 'block', 'gate_in_shift'
-    ]
-    
-    numerical_features = [
-        'gate_in_hour', 'gate_in_dayofweek', 'gate_in_day', 'gate_in_month',
-        'gate_in_is_weekend', 'gate_in_is_peak',
-        'slot_numeric', 'row_numeric', 'tier_numeric', 'block_numeric',
-        'distance_from_gate', 'vertical_distance',
-        'hourly_volume', 'congestion_count',
-        'slot_historical_avg', 'tier_historical_avg', 
-        'lokasi_historical_avg', 'hour_historical_avg',
-        'container_size_numeric', 'is_empty', 'is_full', 'is_reefer', 'is_special',
-        'is_morning_rush', 'is_afternoon_rush', 'is_rush_hour',
-        'slot_tier_interaction', 'size_tier_interaction',
-        'congestion_tier', 'rush_hour_congestion',
-        'slot_duration_std', 'slot_duration_min', 'slot_duration_max',
-        'prev_duration_same_location', 'rolling_mean_3',
-        'BLOCK_target_enc', 'LOKASI_target_enc'
-    ]
-    
-    all_features = categorical_features + numerical_features
-    
-    # ========================================================================
-    # 13. LABEL ENCODE UNTUK FITUR KATEGORI
-    # ========================================================================
-    
-    for col in categorical_features:
-        if col in df.columns and col in label_encoders:
-            le = label_encoders[col]
-            try:
-                unknown_mask = ~df[col].isin(le.classes_)
-                unknown_count = unknown_mask.sum()
-                if unknown_count > 0:
-                    print(f"Warning {col}: {unknown_count} unseen values replaced with {le.classes_[0]}")
-                    df.loc[unknown_mask, col] = le.classes_[0]
-                df[col] = le.transform(df[col])
-            except Exception as e:
-                print(f"Warning: Could not encode {col}: {e}")
-                df[col] = 0
-    
-    # ========================================================================
-    # 14. KEMBALIKAN VEKTOR FITUR FINAL
-    # ========================================================================
-    
-    # Penting: urutkan fitur agar sesuai urutan pelatihan
-    print(f"\nReordering features to match features_list...")
-    print(f"   Features in engineer_features: {len(all_features)}")
-    print(f"   Features in features_list: {len(features_list)}")
-    
-    # Gunakan urutan features_list dari training
-    X = df[features_list].copy()
-    X = X.fillna(0)
-    
-    print(f"   Features reordered successfully")
-    
-    return X
+        refine_pool = ThreadPoolExecutor(max_workers=REFINE_WORKERS, thread_name_prefix='refine')
+        metrics.register_gauge('refine_backlog', lambda: refine_backlog)
+        print(f"[OK] Tiered prediction enabled | fast model: {fast_model_source}")
 
-def predict_duration(truck_data):
+def predict_fast_tier(record):
     """
-    Prediksi durasi pemrosesan truk
+    Tier 1: prediksi model cepat.
     
-    Input: data truk dengan field yang diperlukan
-    Output: durasi prediksi dalam menit
+    Returns:
+        tuple: (prediction, degraded_reason, X) - X dipakai ulang untuk refinement
+               (X None jika prediksi diambil dari cube)
     """
+    started = time.perf_counter()
     try:
-        print("\n" + "="*60)
-        print("DEBUG - PREDICT_DURATION")
-        print("="*60)
-        print(f"Input truck_data: {truck_data}")
+        # Cube berisi prediksi ensemble penuh: tidak perlu refinement
+        cube_prediction = lookup_prediction_cube(record)
+        if cube_prediction is not None:
+            metrics.inc('predictions_total')
+            return cube_prediction, None, None
         
-        # Siapkan data untuk prediksi
-        input_data = {
-            'JOB_TYPE': truck_data.get('job_type', 'DELIVERY'),
-            'CONTAINER_SIZE': str(truck_data.get('container_size', '40')),
-            'CTR_STATUS': truck_data.get('ctr_status', 'FULL'),
-            'CONTAINER_TYPE': truck_data.get('container_type', 'DRY'),
-            'slot': str(truck_data.get('slot', '1')),
-            'tier': str(truck_data.get('tier', '1')),
-            'block': str(truck_data.get('block', '1G')),
-            'row': str(truck_data.get('row', '1')),
-            'gate_in_time': truck_data.get('gate_in_time', datetime.now().isoformat())
-        }
+        X = compute_single_row_features(record)
+        prediction = float(run_cpu(fast_model.predict, X)[0])
+        # Buffer jalur cepat dipakai ulang prediksi berikutnya; refinement butuh salinan
+        if isinstance(X, np.ndarray):
+            X = X.copy()
+    except Exception as e:
+        logger.error(f"Fast tier error for truck {record.truck_id}: {e}", exc_info=True)
+        metrics.inc('predictions_degraded_total')
+        metrics.inc('predictions_degraded_error')
+        return estimate_fallback(record), 'error', None
+    
+    metrics.inc('predictions_total')
+    metrics.inc('tier_fast_total')
+    metrics.observe('tier_fast_ms', (time.perf_counter() - started) * 1000)
+    return prediction, None, X
+
+def _refine_prediction(record, X, fast_prediction):
+    """Tier 2: jalankan ensemble penuh dan kirim PREDICTION_REFINED jika berbeda."""
+    global refine_backlog
+    try:
+        started = time.perf_counter()
+        refined = float(run_cpu(model.predict, X)[0])
+        metrics.observe('tier_ensemble_ms', (time.perf_counter() - started) * 1000)
         
+        delta = refined - fast_prediction
+        metrics.observe('tier_delta_abs_min', abs(delta))
+        metrics.observe('tier_delta_min', delta)
+        
+        if abs(delta) < REFINE_THRESHOLD_MIN:
+            metrics.inc('refined_suppressed')
+            return
+        
+        metrics.inc('refined_emitted')
+        accuracy_monitor.update_prediction(record.truck_id, refined, f'{MODEL_VERSION}:ensemble')
+        socketio.emit('PREDICTION_REFINED', {
+            'truck_id': record.truck_id,
+            'predicted_duration_minutes': refined,
+            'previous_prediction_minutes': fast_prediction,
+            'delta_minutes': round(delta, 2),
+            'block': record.block_id,
+            'tier': 'ensemble',
+            'timestamp': datetime.now().isoformat(),
+            'status': 'refined'
+        })
+    except Exception as e:
+        metrics.inc('refine_errors')
+        logger.error(f"Refinement error for truck {record.truck_id}: {e}", exc_info=True)
+    finally:
+        with refine_lock:
+            refine_backlog -= 1
+
+def schedule_refinement(record, X, fast_prediction):
+    """Antrikan refinement ensemble (dilewati jika backlog penuh)."""
+    global refine_backlog
+    with refine_lock:
+        if refine_backlog >= MAX_REFINE_BACKLOG:
+            metrics.inc('refine_skipped')
+            return False
+        refine_backlog += 1
+    refine_pool.submit(_refine_prediction, record, X, fast_prediction)
+    return True
+
+@profiled('predict_duration')
+def predict_duration(truck_data, return_status=False):
+    """
+    Prediksi durasi pemrosesan truk
+    
+    Input: TruckRecord, atau dict payload mentah (dinormalisasi via payload_normalizer)
+    Output: durasi prediksi dalam menit
+            (jika return_status=True: tuple (durasi, degraded_reason))
+    """
+    print("\n" + "="*60)
+    print("DEBUG - PREDICT_DURATION")
+    print("="*60)
+    print(f"Input truck_data: {truck_data}")
+    
+    # Siapkan data untuk prediksi
+    if isinstance(truck_data, TruckRecord):
+        record = truck_data
+    else:
+        record, _ = payload_normalizer.normalize(truck_data, defaults=REST_DEFAULTS)
+    
+    if record is None:
+        print(f"Invalid truck payload, returning fallback mean: {lookup_tables['metadata']['target_mean']:.2f}")
+        prediction = float(lookup_tables['metadata']['target_mean'])
+        degraded_reason = 'error'
+    else:
         print(f"\nPrepared input_data:")
-        for k, v in input_data.items():
+        for k, v in record.to_feature_input().items():
             print(f"  {k}: {v} (type: {type(v).__name__})")
         
-        # Engineer features
         print("\nEngineering features...")
-        X = engineer_features(input_data)
-        
-        print(f"Features engineered successfully")
-        print(f"   Shape: {X.shape}")
-        print(f"   Columns: {X.shape[1]}")
-        
-        # Periksa nilai NaN/inf
-        nan_count = X.isna().sum().sum()
-        inf_count = np.isinf(X.values).sum()
-        print(f"   NaN values: {nan_count}")
-        print(f"   Inf values: {inf_count}")
-        
-        # Cetak 10 nilai fitur pertama
-        print(f"\nFirst 10 feature values:")
-        for i in range(min(10, X.shape[1])):
-            col_name = X.columns[i]
-            col_value = X.iloc[0, i]
-            print(f"  {i+1}. {col_name:30s} = {col_value}")
-        
-        # Lakukan prediksi
-        print("\nCalling model.predict()...")
-        prediction = model.predict(X)[0]
-        
+        prediction, degraded_reason = predict_with_budget(record, debug=True)
+    
+    if degraded_reason is None:
         print(f"PREDICTION SUCCESS: {prediction:.2f} minutes")
-        print("="*60 + "\n")
-        
-        return round(prediction, 2)
-        
-    except Exception as e:
-        print(f"\nERROR IN PREDICTION")
-        print(f"Error type: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        print(f"\nFull traceback:")
-        print(traceback.format_exc())
-        print(f"\nReturning fallback mean: {lookup_tables['metadata']['target_mean']:.2f}")
-        print("="*60 + "\n")
-        
-        return lookup_tables['metadata']['target_mean']
+    else:
+        print(f"DEGRADED PREDICTION ({degraded_reason}): {prediction:.2f} minutes from fallback estimator")
+    print("="*60 + "\n")
+    
+    prediction = round(prediction, 2)
+    if return_status:
+        return prediction, degraded_reason
+    return prediction
+
+def predict_batch(records):
+    """
+    Prediksi banyak TruckRecord sekaligus: key yang ada di cube dibaca langsung,
+    sisanya satu kali engineer_features + model.predict untuk seluruh batch.
+    
+    Returns:
+        tuple: (np.ndarray prediksi, list degraded_reason per truk)
+    """
+    started = time.perf_counter()
+    predictions = np.empty(len(records), dtype=np.float64)
+    degraded_reasons = [None] * len(records)
+    
+    miss_idx = []
+    for i, record in enumerate(records):
+        cube_prediction = lookup_prediction_cube(record)
+        if cube_prediction is None:
+            miss_idx.append(i)
+        else:
+            predictions[i] = cube_prediction
+    
+    if miss_idx:
+        try:
+            miss_records = [records[i] for i in miss_idx]
+            X = run_cpu(
+                engineer_features, [r.to_feature_input() for r in miss_records],
+                live_congestion_inputs(miss_records),
+            )
+            predictions[miss_idx] = run_cpu(model.predict, X)
+        except Exception as e:
+            logger.error(f"Batch inference error ({len(miss_idx)} trucks): {e}", exc_info=True)
+            for i in miss_idx:
+                predictions[i] = estimate_fallback(records[i])
+                degraded_reasons[i] = 'error'
+            metrics.inc('predictions_degraded_total', len(miss_idx))
+            metrics.inc('predictions_degraded_error', len(miss_idx))
+    
+    metrics.inc('predictions_total', len(records))
+    metrics.observe('batch_predict_ms', (time.perf_counter() - started) * 1000)
+    return predictions, degraded_reasons
+
+def build_prediction_event(record, prediction, degraded_reason, prediction_tier='ensemble'):
+    """Payload event PREDICTION_RESULT untuk klien WebSocket."""
+    return {
+        'truck_id': record.truck_id,
+        'predicted_duration_minutes': float(prediction),
+        'block': record.block_id,
+        'confidence': accuracy_monitor.confidence(record.block_id, DEFAULT_CONFIDENCE),
+        'timestamp': datetime.now().isoformat(),
+        'status': 'success',
+        'prediction_source': 'fallback' if degraded_reason else 'model',
+        'degraded': degraded_reason is not None,
+        'degraded_reason': degraded_reason,
+        'tier': prediction_tier if degraded_reason is None else 'fallback'
+    }
 
 # ============================================================================
 # FUNGSI PERHITUNGAN STATISTIK
@@ -494,7 +960,7 @@ def predict_duration(truck_data):
 
 def calculate_block_stats(block_id):
     """Hitung statistik untuk satu blok."""
-    queue = QUEUES[block_id]
+    queue = QUEUES.snapshot(block_id)
     
     if len(queue) == 0:
         return {
@@ -506,7 +972,7 @@ def calculate_block_stats(block_id):
         }
     
     # Ambil semua durasi prediksi
-    durations = [truck['predicted_duration'] for truck in queue]
+    durations = [truck.predicted_duration for truck in queue]
     
     return {
         'count': len(queue),
@@ -521,11 +987,10 @@ def calculate_global_stats():
     all_durations = []
     blocks_with_trucks = 0
     
-    for block_id in range(1, 8):  # 7 blok
-        queue = QUEUES[block_id]
+    for block_id, queue in QUEUES.snapshot_all().items():  # 7 blok
         if len(queue) > 0:
             blocks_with_trucks += 1
-            durations = [truck['predicted_duration'] for truck in queue]
+            durations = [truck.predicted_duration for truck in queue]
             all_durations.extend(durations)
     
     if len(all_durations) == 0:
@@ -560,17 +1025,53 @@ def home():
         'version': '2.0'
     })
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Counter dan ringkasan latency layanan (prediksi, degraded, dst)."""
+    return jsonify(metrics.snapshot())
+
+@app.route('/congestion', methods=['GET'])
+def get_congestion():
+    """Jumlah kedatangan live per jendela: yard, per blok, per slot."""
+    snapshot = congestion_tracker.snapshot()
+    snapshot['blocks'] = {
+        BLOCK_LABELS.get(block_id, str(block_id)): counts
+        for block_id, counts in snapshot['blocks'].items()
+    }
+    snapshot['feature_window_min'] = LIVE_FEATURE_WINDOW_MIN
+    snapshot['blend_weight'] = LIVE_CONGESTION_WEIGHT
+    return jsonify(snapshot)
+
+@app.route('/accuracy', methods=['GET'])
+def get_accuracy():
+    """Akurasi live per grup (overall, blok, jam, versi model)."""
+    snapshot = accuracy_monitor.snapshot()
+    snapshot['blocks'] = {
+        BLOCK_LABELS.get(int(block_id), block_id): values
+        for block_id, values in snapshot['blocks'].items()
+    }
+    return jsonify(snapshot)
+
+@app.route('/trucks/<truck_id>/complete', methods=['POST'])
+def complete_truck(truck_id):
+    """Laporkan waktu selesai aktual truk: {"actual_minutes": 23.5} atau {"completed_at": ISO}."""
+    result, error_message = record_completion(truck_id, request.get_json(silent=True))
+    if result is None:
+        status = 404 if error_message.startswith('No pending') else 400
+        return jsonify({'error': error_message}), status
+    return jsonify(result)
+
 @app.route('/blocks', methods=['GET'])
 def get_blocks():
     """Mengambil data semua blok beserta antrian dan panjangnya."""
     try:
         blocks_data = {}
         
-        for block_id in range(1, 8):  # 7 blocks
+        for block_id, queue in QUEUES.snapshot_all().items():  # 7 blocks
             blocks_data[str(block_id)] = {
                 'name': BLOCK_LABELS[block_id],
-                'queue': QUEUES[block_id],
-                'queue_length': len(QUEUES[block_id])
+                'queue': [truck.to_dict() for truck in queue],
+                'queue_length': len(queue)
             }
         
         return jsonify(blocks_data)
@@ -610,64 +1111,29 @@ def add_truck(block_id):
         
         data = request.get_json()
         
-        # Validasi field wajib
-        required_fields = ['truck_id', 'lokasi']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Parsing lokasi (format: "slot row tier")
-        lokasi_parts = data['lokasi'].strip().split()
-        if len(lokasi_parts) != 3:
-            return jsonify({'error': 'Invalid lokasi format (expected: "slot row tier")'}), 400
-        
-        slot, row, tier = lokasi_parts
+        # Normalisasi + validasi (field wajib, format lokasi "slot row tier", stack)
+        record, error_message = payload_normalizer.normalize(
+            data, block_id=block_id, required=('truck_id', 'lokasi'), defaults=REST_DEFAULTS
+        )
+        if error_message:
+            return jsonify({'error': error_message}), 400
         
-        # Siapkan data truk untuk prediksi
-        truck_data = {
-            'truck_id': data['truck_id'],
-            'job_type': data.get('job_type', 'DELIVERY'),
-            'container_size': data.get('container_size', '40'),
-            'container_type': data.get('container_type', 'DRY'),
-            'ctr_status': data.get('ctr_status', 'FULL'),
-            'slot': slot,
-            'row': row,
-            'tier': tier,
-            'block': data.get('block', '1G')
-        }
-        
-        # Prediksi durasi menggunakan model ML
-        predicted_duration = predict_duration(truck_data)
+        record_arrival(record)
         
-        # Hitung gate_in_time dan expected_ready_time
-        from datetime import timedelta
-        gate_in_time = datetime.now()
-        expected_ready_time = gate_in_time + timedelta(minutes=predicted_duration)
+        # Prediksi durasi menggunakan model ML (atau fallback jika melewati budget)
+        predicted_duration, degraded_reason = predict_duration(record, return_status=True)
         
         # Bentuk objek truk yang akan disimpan
-        truck = {
-            'truck_id': truck_data['truck_id'],
-            'job_type': truck_data['job_type'],
-            'container_size': truck_data['container_size'],
-            'container_type': truck_data['container_type'],
-            'ctr_status': truck_data['ctr_status'],
-            'lokasi': data['lokasi'],
-            'slot': slot,
-            'row': row,
-            'tier': tier,
-            'block': truck_data['block'],
-            'predicted_duration': predicted_duration,
-            'gate_in_time': gate_in_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'expected_ready_time': expected_ready_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'added_at': gate_in_time.isoformat()
-        }
+        truck = build_queue_entry(record, predicted_duration, degraded_reason)
+        register_prediction(record, predicted_duration, degraded_reason)
         
         # Tambahkan ke antrian
-        QUEUES[block_id].append(truck)
+        QUEUES.append(block_id, truck)
+        schedule_expiry(block_id, (truck,))
         
         return jsonify({
-            'truck': truck,
-            'message': f'Truck {truck["truck_id"]} added successfully to {BLOCK_LABELS[block_id]}'
+            'truck': truck.to_dict(),
+            'message': f'Truck {truck.truck_id} added successfully to {BLOCK_LABELS[block_id]}'
         })
         
     except Exception as e:
@@ -682,16 +1148,15 @@ def remove_truck(block_id, truck_index):
         if block_id < 1 or block_id > 7:
             return jsonify({'error': 'Invalid block ID (must be 1-7)'}), 400
         
-        queue = QUEUES[block_id]
-        
-        if truck_index < 0 or truck_index >= len(queue):
+        # Cek indeks dan hapus dalam satu lock blok
+        removed_truck = QUEUES.pop(block_id, truck_index)
+        if removed_truck is None:
             return jsonify({'error': 'Invalid truck index'}), 400
-        
-        removed_truck = queue.pop(truck_index)
+        archive_trucks((removed_truck,), block_id, 'removed')
         
         return jsonify({
-            'message': f'Truck {removed_truck["truck_id"]} removed successfully',
-            'removed_truck': removed_truck
+            'message': f'Truck {removed_truck.truck_id} removed successfully',
+            'removed_truck': removed_truck.to_dict()
         })
         
     except Exception as e:
@@ -704,12 +1169,12 @@ def clear_block(block_id):
         if block_id < 1 or block_id > 7:
             return jsonify({'error': 'Invalid block ID (must be 1-7)'}), 400
         
-        count = len(QUEUES[block_id])
-        QUEUES[block_id] = []
+        removed = QUEUES.clear(block_id)
+        archive_trucks(removed, block_id, 'cleared')
         
         return jsonify({
             'message': f'{BLOCK_LABELS[block_id]} cleared successfully',
-            'trucks_removed': count
+            'trucks_removed': len(removed)
         })
         
     except Exception as e:
@@ -720,13 +1185,12 @@ def populate_demo_data():
     """Mengisi data demo untuk pengujian cepat."""
     try:
         # Kosongkan data yang ada
-        for block_id in range(1, 8):
-            QUEUES[block_id] = []
+        for block_id in QUEUES.block_ids:
+            QUEUES.clear(block_id)
         
         # Konfigurasi truk demo
         demo_trucks = [
             {
-                'block_id': 1,
                 'truck_id': 'L9088UE',
                 'job_type': 'DELIVERY',
                 'size': '40',
@@ -736,7 +1200,6 @@ def populate_demo_data():
                 'block': '1G'
             },
             {
-                'block_id': 1,
                 'truck_id': 'H1917DW',
                 'job_type': 'DELIVERY',
                 'size': '40',
@@ -746,7 +1209,6 @@ def populate_demo_data():
                 'block': '1E'
             },
             {
-                'block_id': 2,
                 'truck_id': 'G8190OA',
                 'job_type': 'DELIVERY',
                 'size': '20',
@@ -756,7 +1218,6 @@ def populate_demo_data():
                 'block': '2A'
             },
             {
-                'block_id': 2,
                 'truck_id': 'H1647EA',
                 'job_type': 'RECEIVING',
                 'size': '20',
@@ -766,7 +1227,6 @@ def populate_demo_data():
                 'block': '2C'
             },
             {
-                'block_id': 3,
                 'truck_id': 'B9319BEI',
                 'job_type': 'DELIVERY',
                 'size': '40',
@@ -776,7 +1236,6 @@ def populate_demo_data():
                 'block': '3Z'
             },
             {
-                'block_id': 4,
                 'truck_id': 'E9015AD',
                 'job_type': 'DELIVERY',
                 'size': '20',
@@ -786,7 +1245,6 @@ def populate_demo_data():
                 'block': '4B'
             },
             {
-                'block_id': 5,
                 'truck_id': 'H9331OW',
                 'job_type': 'RECEIVING',
                 'size': '20',
@@ -798,53 +1256,36 @@ def populate_demo_data():
             
         ]
         
-        added_count = 0
-        for truck_config in demo_trucks:
-            # Parsing lokasi menjadi slot, row, tier
-            lokasi_parts = truck_config['lokasi'].split()
-            slot = lokasi_parts[0]
-            row = lokasi_parts[1]
-            tier = lokasi_parts[2]
-            
-            truck_data = {
+        payloads = [
+            {
                 'truck_id': truck_config['truck_id'],
                 'job_type': truck_config['job_type'],
                 'container_size': truck_config['size'],
                 'container_type': truck_config['type'],
                 'ctr_status': truck_config['status'],
-                'slot': slot,
-                'row': row,
-                'tier': tier,
+                'lokasi': truck_config['lokasi'],
                 'block': truck_config['block']
             }
+            for truck_config in demo_trucks
+        ]
+        
+        added_count = 0
+        # block_id diambil dari kode block (1G -> CY1, D1 -> D1)
+        for payload, (record, error_message) in zip(
+            payloads, payload_normalizer.normalize_batch(payloads, defaults=REST_DEFAULTS)
+        ):
+            if error_message:
+                print(f"Skipping demo truck {payload['truck_id']}: {error_message}")
+                continue
             
-            print(f"\nAdding demo truck: {truck_config['truck_id']}")
-            predicted_duration = predict_duration(truck_data)
+            print(f"\nAdding demo truck: {record.truck_id}")
+            predicted_duration, degraded_reason = predict_duration(record, return_status=True)
             print(f"   Predicted: {predicted_duration} min")
             
-            # Hitung gate_in_time dan expected_ready_time
-            from datetime import timedelta
-            gate_in_time = datetime.now()
-            expected_ready_time = gate_in_time + timedelta(minutes=predicted_duration)
+            truck = build_queue_entry(record, predicted_duration, degraded_reason)
             
-            truck = {
-                'truck_id': truck_data['truck_id'],
-                'job_type': truck_data['job_type'],
-                'container_size': truck_data['container_size'],
-                'container_type': truck_data['container_type'],
-                'ctr_status': truck_data['ctr_status'],
-                'lokasi': truck_config['lokasi'],
-                'slot': slot,
-                'row': row,
-                'tier': tier,
-                'block': truck_data['block'],
-                'predicted_duration': predicted_duration,
-                'gate_in_time': gate_in_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'expected_ready_time': expected_ready_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'added_at': gate_in_time.isoformat()
-            }
-            
-            QUEUES[truck_config['block_id']].append(truck)
+            QUEUES.append(record.block_id, truck)
+            schedule_expiry(record.block_id, (truck,))
             added_count += 1
         
         print(f"\nDemo data populated: {added_count} trucks added")
@@ -859,6 +1300,330 @@ def populate_demo_data():
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+# ============================================================================
+# DEMO - GENERATOR BEBAN SINTETIS (uji kapasitas antrian/statistik/broadcast)
+# ============================================================================
+
+DEMO_MAX_TRUCKS = int(os.getenv('ARTG_DEMO_MAX_TRUCKS', '50000'))
+synthetic_yard = SyntheticYard(lookup_tables, label_encoders)
+
+@app.route('/demo/load', methods=['POST'])
+def generate_demo_load():
+    """
+    Buat N truk sintetis, skor dalam satu batch, lalu masukkan ke antrian sekaligus.
+    
+    Body (opsional): {"count": 5000, "seed": 42, "clear": false, "broadcast": false}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        count = int(data.get('count', 1000))
+        if count < 1 or count > DEMO_MAX_TRUCKS:
+            return jsonify({'error': f'count must be between 1 and {DEMO_MAX_TRUCKS}'}), 400
+        seed = data.get('seed')
+        seed = int(seed) if seed is not None else None
+        
+        timings = {}
+        
+        started = time.perf_counter()
+        records = synthetic_yard.sample(count, seed=seed)
+        timings['generate_ms'] = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        predictions, degraded_reasons = predict_batch(records)
+        timings['score_ms'] = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        if data.get('clear', False):
+            for block_id in QUEUES.block_ids:
+                QUEUES.clear(block_id)
+        new_entries = defaultdict(list)
+        for record, prediction, degraded_reason in zip(records, predictions, degraded_reasons):
+            new_entries[record.block_id].append(
+                build_queue_entry(record, round(float(prediction), 2), degraded_reason)
+            )
+        for block_id, entries in new_entries.items():
+            QUEUES.extend(block_id, entries)
+            schedule_expiry(block_id, entries)
+        timings['insert_ms'] = (time.perf_counter() - started) * 1000
+        
+        if data.get('broadcast', False):
+            started = time.perf_counter()
+            for record, prediction, degraded_reason in zip(records, predictions, degraded_reasons):
+                socketio.emit('PREDICTION_RESULT', build_prediction_event(
+                    record, prediction, degraded_reason
+                ))
+            timings['broadcast_ms'] = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        stats = calculate_global_stats()
+        timings['stats_ms'] = (time.perf_counter() - started) * 1000
+        
+        return jsonify({
+            'message': f'{count} synthetic trucks added',
+            'trucks_added': count,
+            'degraded': sum(1 for r in degraded_reasons if r is not None),
+            'per_block': {
+                BLOCK_LABELS[block_id]: len(entries)
+                for block_id, entries in sorted(new_entries.items())
+            },
+            'timings_ms': {name: round(value, 2) for name, value in timings.items()},
+            'stats': stats
+        })
+        
+    except Exception as e:
+        print(f"\nERROR generating demo load: {e}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+# ============================================================================
+# OPTIMASI PENUGASAN BLOCK (seluruh yard, read-only terhadap QUEUES)
+# ============================================================================
+
+OPTIMIZER_MAX_TRUCKS = int(os.getenv('ARTG_OPTIMIZER_MAX_TRUCKS', '500'))
+
+# Kode block yang dikenal model per block_id ("2A", "2B", ...) untuk fitur truk yang dipindah
+BLOCK_CODES = defaultdict(list)
+for _code in sorted(str(k) for k in lookup_tables['BLOCK_target_enc'].keys()):
+    _block_id, _ = parse_block(_code)
+    if _block_id is not None:
+        BLOCK_CODES[_block_id].append(_code)
+
+def score_block_candidates(records, block_ids):
+    """
+    Matriks durasi prediksi (truk x block): satu engineer_features + model.predict
+    untuk semua pasangan truk-block yang layak, np.inf untuk pasangan tidak layak.
+
+    Returns:
+        tuple: (np.ndarray durasi, jumlah pasangan yang diprediksi fallback)
+    """
+    column = {block_id: j for j, block_id in enumerate(block_ids)}
+    durations = np.full((len(records), len(block_ids)), np.inf)
+    pairs = []
+    for i, record in enumerate(records):
+        for block_id in candidate_blocks(record, block_ids):
+            if block_id not in column:
+                continue
+            if block_id == record.block_id:
+                candidate = record
+            else:
+                candidate = record._replace(
+                    block_id=block_id,
+                    block_code=alternative_block_code(record.block_code, block_id, BLOCK_CODES),
+                )
+            pairs.append((i, column[block_id], candidate))
+    if not pairs:
+        return durations, 0
+
+    rows = [i for i, _, _ in pairs]
+    cols = [j for _, j, _ in pairs]
+    try:
+        X = run_cpu(engineer_features, [candidate.to_feature_input() for _, _, candidate in pairs])
+        durations[rows, cols] = run_cpu(model.predict, X)
+        return durations, 0
+    except Exception as e:
+        logger.error(f"Optimizer scoring error ({len(pairs)} pairs): {e}", exc_info=True)
+        durations[rows, cols] = [estimate_fallback(candidate) for _, _, candidate in pairs]
+        return durations, len(pairs)
+
+@app.route('/optimize/assignment', methods=['POST'])
+def optimize_assignment():
+    """
+    Penugasan + urutan block untuk truk pending yang meminimalkan total waktu
+    sampai selesai dilayani (backlog antrian saat ini + durasi prediksi model).
+    Tidak mengubah antrian; bandingkan dengan baseline FIFO di TO_BLOCK masing-masing.
+
+    Body: {"trucks": [payload GATE_IN / add_truck, ...], "blocks": [1, 2, 3]}
+    ("blocks" opsional, default semua block; truk D1 selalu tetap di D1)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        payloads = data.get('trucks') or []
+        if not isinstance(payloads, list) or not payloads:
+            return jsonify({'error': 'trucks must be a non-empty list'}), 400
+        if len(payloads) > OPTIMIZER_MAX_TRUCKS:
+            return jsonify({'error': f'at most {OPTIMIZER_MAX_TRUCKS} trucks per request'}), 400
+
+        block_ids = data.get('blocks') or list(BLOCK_LABELS.keys())
+        try:
+            block_ids = sorted({int(b) for b in block_ids})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'blocks must be a list of block IDs'}), 400
+        if any(b not in BLOCK_LABELS for b in block_ids):
+            return jsonify({'error': 'Invalid block ID (must be 1-7)'}), 400
+
+        records, errors = [], []
+        normalized = payload_normalizer.normalize_batch(
+            payloads, required=('truck_id', 'lokasi'), defaults=REST_DEFAULTS
+        )
+        for index, (record, error_message) in enumerate(normalized):
+            if error_message:
+                errors.append({'index': index, 'error': error_message})
+            else:
+                records.append(record)
+        if not records:
+            return jsonify({'error': 'no valid trucks', 'invalid': errors}), 400
+
+        # Truk tanpa block layak di "blocks" (mis. truk D1) tetap di TO_BLOCK-nya
+        stranded = {
+            r.block_id for r in records
+            if not any(b in block_ids for b in candidate_blocks(r, block_ids))
+        }
+        block_ids = sorted(set(block_ids) | stranded)
+
+        timings = {}
+        started = time.perf_counter()
+        durations, fallback_pairs = score_block_candidates(records, block_ids)
+        timings['score_ms'] = (time.perf_counter() - started) * 1000
+
+        snapshot = QUEUES.snapshot_all()
+        backlog = np.array([
+            sum(truck.predicted_duration for truck in snapshot[block_id]) for block_id in block_ids
+        ], dtype=np.float64)
+
+        started = time.perf_counter()
+        assigned, position, start, finish, total = solve_assignment(durations, backlog)
+        timings['solve_ms'] = (time.perf_counter() - started) * 1000
+        metrics.observe('optimizer_solve_ms', timings['solve_ms'])
+
+        column = {block_id: j for j, block_id in enumerate(block_ids)}
+        requested = [column.get(r.block_id, -1) for r in records]
+        baseline = fifo_baseline(requested, durations, backlog)
+
+        assignments = []
+        per_block = defaultdict(list)
+        for i, record in enumerate(records):
+            block_id = block_ids[assigned[i]]
+            assignments.append({
+                'truck_id': record.truck_id,
+                'requested_block': record.block_id,
+                'assigned_block': block_id,
+                'assigned_block_label': BLOCK_LABELS[block_id],
+                'moved': block_id != record.block_id,
+                'position': int(position[i]),
+                'predicted_duration': round(float(durations[i, assigned[i]]), 2),
+                'expected_start_minutes': round(float(start[i]), 2),
+                'expected_completion_minutes': round(float(finish[i]), 2),
+            })
+            per_block[block_id].append((int(position[i]), record.truck_id))
+
+        return jsonify({
+            'assignments': assignments,
+            'blocks': {
+                BLOCK_LABELS[block_id]: {
+                    'backlog_minutes': round(float(backlog[column[block_id]]), 2),
+                    'order': [truck_id for _, truck_id in sorted(per_block.get(block_id, []))],
+                }
+                for block_id in block_ids
+            },
+            'total_completion_minutes': round(total, 2),
+            'baseline_total_completion_minutes': round(baseline, 2) if baseline is not None else None,
+            'trucks_moved': sum(1 for a in assignments if a['moved']),
+            'fallback_pairs': fallback_pairs,
+            'invalid': errors,
+            'timings_ms': {name: round(value, 2) for name, value in timings.items()},
+        })
+
+    except Exception as e:
+        print(f"\nERROR optimizing assignment: {e}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+# ============================================================================
+# ADMIN - MEMORI, TELEMETRI LOOKUP & PROFILING (profiling aktif hanya jika ARTG_PROFILING=1)
+# ============================================================================
+
+@app.route('/admin/memory', methods=['GET'])
+def get_process_memory():
+    """Memori proses ini (RSS/PSS/USS, KiB) dan indeks worker pre-fork."""
+    return jsonify({
+        'pid': os.getpid(),
+        'worker_index': WORKER_INDEX,
+        'memory': read_process_memory(),
+    })
+
+@app.route('/admin/lookup_telemetry', methods=['GET'])
+def get_lookup_telemetry():
+    """Miss lookup tables, fallback encoder dan warm set (?top=N key per tabel) proses ini."""
+    if lookup_telemetry is None:
+        return jsonify({'enabled': False, 'message': 'Start the server with ARTG_LOOKUP_TELEMETRY=1'}), 409
+    top = max(1, min(int(request.args.get('top', 20)), LOOKUP_TELEMETRY_TOP_K))
+    return jsonify({
+        'enabled': True,
+        'pid': os.getpid(),
+        'worker_index': WORKER_INDEX,
+        **lookup_telemetry.snapshot(top=top),
+    })
+
+@app.route('/admin/lookup_telemetry/reset', methods=['POST'])
+def reset_lookup_telemetry():
+    """Mulai ulang jendela telemetri (mis. setelah lookup tables dibangun ulang)."""
+    if lookup_telemetry is None:
+        return jsonify({'enabled': False, 'message': 'Start the server with ARTG_LOOKUP_TELEMETRY=1'}), 409
+    lookup_telemetry.reset()
+    return jsonify({'enabled': True, 'since': lookup_telemetry.since})
+
+@app.route('/admin/profile', methods=['GET'])
+def get_profile_status():
+    """Status profiler: sample rate, window aktif, jumlah sampel."""
+    if profiling_hook.profiler is None:
+        return jsonify({'enabled': False, 'message': 'Start the server with ARTG_PROFILING=1'}), 409
+    return jsonify({'enabled': True, **profiling_hook.profiler.status()})
+
+@app.route('/admin/profile/start', methods=['POST'])
+def start_profile_window():
+    """Profil semua panggilan selama N detik (body: {"seconds": 30})."""
+    if profiling_hook.profiler is None:
+        return jsonify({'enabled': False, 'message': 'Start the server with ARTG_PROFILING=1'}), 409
+    try:
+        data = request.get_json(silent=True) or {}
+        seconds = float(data.get('seconds', 30))
+        window_until = profiling_hook.profiler.start_window(seconds)
+        return jsonify({
+            'message': 'Profiling window started',
+            'window_until': datetime.fromtimestamp(window_until).isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/admin/profile/export', methods=['POST'])
+def export_profile():
+    """Tulis profil teragregasi (.pstats + .collapsed) ke ARTG_PROFILE_DIR."""
+    if profiling_hook.profiler is None:
+        return jsonify({'enabled': False, 'message': 'Start the server with ARTG_PROFILING=1'}), 409
+    try:
+        data = request.get_json(silent=True) or {}
+        files = profiling_hook.profiler.export(reset=bool(data.get('reset', False)))
+        return jsonify({'message': 'Profile exported', 'files': files})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============================================================================
+# ADMISSION CONTROL GATE_IN_DATA (rate limit per klien + antrian ingest berbatas)
+# ============================================================================
+
+# Rate per klien (event/detik, 0 = tanpa batas) dan burst token bucket
+INGEST_RATE = float(os.getenv('ARTG_INGEST_RATE', '20'))
+INGEST_BURST = float(os.getenv('ARTG_INGEST_BURST', '40'))
+# Kapasitas antrian global, policy saat penuh (reject | drop_oldest | coalesce),
+# jumlah worker (0 = proses langsung di handler, tanpa antrian)
+INGEST_QUEUE_SIZE = int(os.getenv('ARTG_INGEST_QUEUE', '256'))
+INGEST_POLICY = os.getenv('ARTG_INGEST_POLICY', 'reject').strip().lower()
+INGEST_WORKERS = int(os.getenv('ARTG_INGEST_WORKERS', '4'))
+
+ingest_rate_limiter = ClientRateLimiter(INGEST_RATE, INGEST_BURST)
+ingest_queue = None
+
+def start_ingest_queue():
+    """Worker antrian ingest (per proses; di pre-fork dimulai per worker)."""
+    global ingest_queue
+    if INGEST_WORKERS <= 0 or ingest_queue is not None:
+        return
+    ingest_queue = IngestQueue(
+        process_gate_in, capacity=INGEST_QUEUE_SIZE, policy=INGEST_POLICY, workers=INGEST_WORKERS
+    )
+    print(f"[OK] Ingest queue: {INGEST_QUEUE_SIZE} slots | policy {INGEST_POLICY} | "
+          f"{INGEST_WORKERS} workers | {INGEST_RATE:g} events/s per client")
+
 # ============================================================================
 # WEBSOCKET EVENTS (Real-time Prediction)
 # ============================================================================
@@ -873,30 +1638,95 @@ def handle_connect():
         'status': 'connected',
         'message': 'Connected to Flask SocketIO backend',
         'model': 'Stacking Ensemble (LightGBM+XGBoost+CatBoost)',
-        'blocks': len(BLOCK_LABELS)
+        'blocks': len(BLOCK_LABELS),
+        # True: backend berlangganan GATE_IN sendiri, dashboard tidak perlu relay GATE_IN_DATA
+        'gate_feed': bool(GATE_FEED_URL)
     })
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Tangani pemutusan koneksi klien."""
     logger.info(f'Client disconnected: {request.sid}')
+    ingest_rate_limiter.forget(request.sid)
+
+def emit_ingest_rejection(record, sid, reason, message):
+    """PREDICTION_REJECTED ke klien pengirim (rate limit / antrian ingest); sid None = broadcast (gate feed)."""
+    socketio.emit('PREDICTION_REJECTED', {
+        'truck_id': record.truck_id,
+        'block': record.block_id,
+        'stack': record.tier,
+        'reason': reason,
+        'timestamp': datetime.now().isoformat(),
+        'status': 'rejected',
+        'message': f"Truck {record.truck_id} DITOLAK: {message}"
+    }, to=sid)
 
 @socketio.on('GATE_IN_DATA')
 def handle_gate_in(data):
-    """Menerima data truk real-time dari WebSocket (via React)."""
+    """
+    Menerima data truk real-time dari WebSocket (via React).
+    Hanya admission control di sini; prediksi dijalankan worker antrian ingest.
+    """
     
     try:
-        logger.info(f"Received GATE_IN_DATA: {data}")
+        # Normalisasi payload (alias field, parsing TO_BLOCK, validasi stack)
+        record, validation_error = payload_normalizer.normalize(data, defaults=SOCKET_DEFAULTS)
+        if record is None:
+            logger.error(f"Invalid GATE_IN_DATA payload: {validation_error}")
+            return
+        
+        sid = request.sid
+        if not ingest_rate_limiter.allow(sid):
+            metrics.inc('ingest_rate_limited')
+            emit_ingest_rejection(
+                record, sid, 'rate_limited',
+                f"rate limit {INGEST_RATE:g} event/detik per klien terlampaui"
+            )
+            return
+        
+        submit_gate_in(record, validation_error, sid)
         
+    except Exception as e:
+        logger.error(f"Error in GATE_IN_DATA: {str(e)}", exc_info=True)
+
+def submit_gate_in(record, validation_error, sid):
+    """
+    Masukkan satu truk ke antrian ingest (atau proses inline jika antrian nonaktif).
+    
+    Returns:
+        str: hasil IngestQueue.offer ('queued', 'coalesced', 'dropped_oldest',
+             'rejected'), atau 'processed' jika diproses inline
+    """
+    if ingest_queue is None:
+        process_gate_in((record, validation_error, sid))
+        return 'processed'
+    
+    outcome, displaced = ingest_queue.offer(record.truck_id, (record, validation_error, sid))
+    if outcome == 'rejected':
+        emit_ingest_rejection(record, sid, 'overloaded', 'antrian ingest penuh, kirim ulang nanti')
+    elif outcome == 'dropped_oldest':
+        dropped, _, dropped_sid = displaced
+        emit_ingest_rejection(dropped, dropped_sid, 'dropped', 'dibuang dari antrian ingest (server sibuk)')
+        # Truk feed yang dibuang harus diteruskan lagi saat replay setelah reconnect
+        if dropped_sid is None and gate_feed is not None:
+            gate_feed.forget(dropped.truck_id, dropped.gate_in_time)
+    return outcome
+
+@profiled('handle_gate_in')
+def process_gate_in(item):
+    """Dedup, validasi stack, prediksi dan broadcast satu event GATE_IN_DATA."""
+    record, validation_error, sid = item
+    
+    try:
         # Ambil truck_id dan gate_in_time untuk deduplikasi
-        truck_id = data.get('truck_id') or data.get('TRUCK_ID', 'UNKNOWN')
-        gate_in_time = data.get('GATE_IN_TIME') or data.get('gate_in_time') or datetime.now().isoformat()
+        truck_id = record.truck_id
+        gate_in_time = record.gate_in_time
+        block_id = record.block_id
+        tier_val = record.tier
         
         # Bentuk kunci deduplikasi
         dedup_key = f"{truck_id}_{gate_in_time}"
         
-        logger.info(f"Checking cache | Key: {dedup_key} | Cache size: {len(processed_trucks_cache)}")
-        
         # Cek apakah sudah pernah diproses
         with cache_lock:
             if dedup_key in processed_trucks_cache:
@@ -904,42 +1734,17 @@ def handle_gate_in(data):
                 return
             # Mark as processed
             processed_trucks_cache[dedup_key] = time.time()
-            logger.info(f"New truck registered: {truck_id} | Cache size: {len(processed_trucks_cache)}")
-
-        # Ambil block dari payload
-        raw_block = data.get('to_block') or data.get('TO_BLOCK')
-        raw_block_str = None
-        block_num = None
-        if raw_block:
-            raw_block_str = str(raw_block).strip()
-            # Jika format D1 maka blok = 7 (D1)
-            if raw_block_str.upper().startswith('D'):
-                block_num = '7'
-            # Jika format "5A" ambil digit pertama
-            elif raw_block_str and raw_block_str[0].isdigit():
-                block_num = raw_block_str[0]
-
-        block_num = block_num or str(data.get('block') or data.get('BLOCK') or '1')
-        raw_block_str = (raw_block_str or str(data.get('block') or data.get('BLOCK') or block_num)).strip()
-        block_id = int(block_num)
-
-        # Pakai field asli dari payload websocket (trim spasi)
-        slot_val = str(data.get('X') or data.get('slot') or data.get('SLOT') or 1).strip()
-        row_val = str(data.get('Y') or data.get('row') or data.get('ROW') or 1).strip()
-        tier_val = str(data.get('Z') or data.get('tier') or data.get('TIER') or 1).strip()
+            logger.debug(f"New truck registered: {truck_id} | Cache size: {len(processed_trucks_cache)}")
 
         # ===================================================================
-        # VALIDASI STACK/TIER UNTUK BLOCK
+        # VALIDASI STACK/TIER UNTUK BLOCK (hasil payload_normalizer)
         # ===================================================================
-        is_valid_stack, validation_error = validate_stack_for_block(tier_val, block_id)
-        
-        if not is_valid_stack:
-            logger.error(f"VALIDATION FAILED for truck {truck_id}: {validation_error}")
-            logger.error(f"   Requested block: {BLOCK_LABELS.get(block_id, 'UNKNOWN')}")
-            logger.error(f"   Stack received: {tier_val}")
+        if validation_error:
+            logger.error(f"VALIDATION FAILED for truck {truck_id}: {validation_error} "
+                         f"(block {BLOCK_LABELS.get(block_id, 'UNKNOWN')}, stack {tier_val})")
             
             # Emit rejection event ke klien
-            emit('PREDICTION_REJECTED', {
+            socketio.emit('PREDICTION_REJECTED', {
                 'truck_id': truck_id,
                 'block': block_id,
                 'stack': tier_val,
@@ -947,62 +1752,152 @@ def handle_gate_in(data):
                 'timestamp': datetime.now().isoformat(),
                 'status': 'rejected',
                 'message': f"Truck {truck_id} DITOLAK: {validation_error}"
-            }, broadcast=True)
+            })
             
             return  # REJECT truck ini, jangan lanjutkan prediksi
 
-        logger.info(f"Stack validation passed for truck {truck_id}")
-        logger.info(f"   Block: {BLOCK_LABELS[block_id]} | Stack: {tier_val}")
-
-        # Informasi kontainer (fallback ke default jika kosong)
-        container_size = str(data.get('CTR_SIZE') or data.get('container_size') or data.get('CONTAINER_SIZE') or 40).strip()
-        container_type = (data.get('CTR_TYPE') or data.get('container_type') or data.get('CONTAINER_TYPE') or 'DRY').strip()
-        ctr_status = (data.get('CTR_STATUS') or data.get('ctr_status') or 'FCL').strip()
-
-        # Aktivitas / tipe pekerjaan
-        activity = (data.get('activity') or data.get('ACTIVITY') or '').strip().upper()
-        job_type = data.get('job_type') or ('EXPORT' if activity == 'DELIVERY' else 'IMPORT')
-
-        # Gunakan label blok yang sesuai dataset untuk fitur
-        # Untuk D1 selalu pakai "D1"; untuk CY gunakan kode asli (mis. 1G/2C) agar variasi fitur tidak hilang
-        block_for_features = 'D1' if block_id == 7 else (raw_block_str or str(block_id))
-
-        # Siapkan truck_data untuk engineer_features
-        truck_data = {
-            'JOB_TYPE': job_type,
-            'CONTAINER_SIZE': container_size,
-            'CTR_STATUS': ctr_status,
-            'CONTAINER_TYPE': container_type,
-            'slot': slot_val,
-            'row': row_val,
-            'tier': tier_val,
-            'block': block_for_features,
-            'gate_in_time': gate_in_time
-        }
-        
-        logger.info(f"Prepared truck_data for {truck_id}:")
-        logger.info(f"   Location: slot={slot_val}, row={row_val}, tier={tier_val}")
-        logger.info(f"   Block: {block_num}, Job: {truck_data['JOB_TYPE']}, Size: {container_size}, Status: {ctr_status}")
+        record_arrival(record)
+        logger.debug(f"Prepared truck_data for {truck_id}: slot={record.slot}, row={record.row}, "
+                     f"tier={tier_val}, block={block_id}, job={record.job_type}, "
+                     f"size={record.container_size}, status={record.ctr_status}")
         
-        # Rekayasa fitur menggunakan fungsi yang sudah diuji
-        X_input = engineer_features(truck_data)
+        # Rekayasa fitur + prediksi
+        if fast_model is not None:
+            # Mode bertingkat: jawab dari model cepat, ensemble menyusul
+            prediction, degraded_reason, X_input = predict_fast_tier(record)
+            # Hit cube = hasil ensemble penuh (X_input None, tanpa refinement)
+            prediction_tier = 'fast' if X_input is not None else 'ensemble'
+        else:
+            # Ensemble langsung (dengan latency budget & fallback estimator)
+            prediction, degraded_reason = predict_with_budget(record)
+            X_input = None
+            prediction_tier = 'ensemble'
+        logger.info(f"Prediction: {prediction:.2f} min for truck {truck_id} ({BLOCK_LABELS[block_id]})")
         
-        # Prediksi
-        prediction = model.predict(X_input)[0]
-        logger.info(f"Prediction: {prediction:.2f} min for truck {truck_id}")
+        # Kirim hasil prediksi (broadcast ke semua klien)
+        socketio.emit('PREDICTION_RESULT', build_prediction_event(
+            record, prediction, degraded_reason, prediction_tier
+        ))
+        register_prediction(record, prediction, degraded_reason, prediction_tier)
         
-        # Kirim hasil prediksi
-        emit('PREDICTION_RESULT', {
-            'truck_id': truck_id,
-            'predicted_duration_minutes': float(prediction),
-            'block': block_id,
-            'confidence': 0.85,
-            'timestamp': datetime.now().isoformat(),
-            'status': 'success'
-        }, broadcast=True)
+        if X_input is not None:
+            schedule_refinement(record, X_input, prediction)
         
     except Exception as e:
-        logger.error(f"Error in GATE_IN_DATA: {str(e)}", exc_info=True)
+        logger.error(f"Error processing GATE_IN_DATA: {str(e)}", exc_info=True)
+
+if not PREFORK_PARENT:
+    start_ingest_queue()
+
+@socketio.on('TRUCK_COMPLETED')
+def handle_truck_completed(data):
+    """Completion truk dari WebSocket: {truck_id, actual_minutes | completed_at}."""
+    try:
+        truck_id = str((data or {}).get('truck_id') or (data or {}).get('TRUCK_ID') or '').strip()
+        if not truck_id:
+            logger.error(f"Invalid TRUCK_COMPLETED payload: {data}")
+            return
+        result, error_message = record_completion(truck_id, data)
+        if result is None:
+            logger.warning(f"TRUCK_COMPLETED ignored: {error_message}")
+            return
+        emit('COMPLETION_RECORDED', result)
+    except Exception as e:
+        logger.error(f"Error in TRUCK_COMPLETED: {str(e)}", exc_info=True)
+
+# ============================================================================
+# GATE FEED EKSTERNAL (backend berlangganan GATE_IN langsung, tanpa relay dashboard)
+# ============================================================================
+
+# URL server WebSocket eksternal ('' = nonaktif, dashboard tetap me-relay GATE_IN_DATA),
+# event yang diminta, dan ukuran memori key truk yang sudah diteruskan (skip replay)
+GATE_FEED_URL = os.getenv('ARTG_GATE_FEED_URL', '').strip()
+GATE_FEED_EVENTS = [e.strip() for e in os.getenv('ARTG_GATE_FEED_EVENTS', 'GATE_IN').split(',') if e.strip()]
+GATE_FEED_SEEN = int(os.getenv('ARTG_GATE_FEED_SEEN', '50000'))
+
+gate_feed = None
+
+def ingest_feed_payload(payload):
+    """
+    Satu truk dari gate feed -> normalizer + antrian ingest (jalur yang sama dengan GATE_IN_DATA).
+    
+    Returns:
+        bool: False jika antrian ingest menolak truk (feed mengulangnya saat replay)
+    """
+    # Seperti dashboard: truk tanpa lokasi lengkap (X/Y/Z) tidak diprediksi
+    record, validation_error = payload_normalizer.normalize(
+        payload, required=('slot', 'row', 'tier'), defaults=SOCKET_DEFAULTS
+    )
+    if record is None:
+        metrics.inc('gate_feed_invalid')
+        logger.warning(f"Invalid gate feed payload: {validation_error}")
+        return True
+    return submit_gate_in(record, validation_error, None) != 'rejected'
+
+def start_gate_feed():
+    """Start subscriber gate feed (satu per deployment: hanya worker 0 saat prefork)."""
+    global gate_feed
+    if not GATE_FEED_URL or gate_feed is not None:
+        return
+    # Tanpa dashboard terhubung, cache dedup tetap harus dibersihkan
+    initialize_cache_cleanup()
+    gate_feed = GateFeedSubscriber(
+        GATE_FEED_URL, ingest_feed_payload,
+        event_names=GATE_FEED_EVENTS, seen_size=GATE_FEED_SEEN,
+    ).start()
+    logger.info(f"Gate feed subscriber started: {GATE_FEED_URL} {GATE_FEED_EVENTS}")
+
+if not PREFORK_PARENT:
+    start_gate_feed()
+
+@app.route('/admin/gate_feed', methods=['GET'])
+def gate_feed_status():
+    """Status subscriber gate feed."""
+    if gate_feed is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **gate_feed.status()}), 200
+
+# ============================================================================
+# PRE-FORK (prefork.py: artefak dimuat sekali di parent, worker berbagi copy-on-write)
+# ============================================================================
+
+WORKER_INDEX = None
+
+def warm_up():
+    """
+    Jalankan jalur prediksi sekali (fitur + model, single dan batch) agar semua
+    cache/lazy init terjadi di parent sebelum fork. Tidak memakai thread pool
+    dan tidak menulis metrics.
+    
+    Returns:
+        float: durasi warm-up (ms)
+    """
+    started = time.perf_counter()
+    records = synthetic_yard.sample(8, seed=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        X = engineer_features([r.to_feature_input() for r in records])
+        model.predict(X)
+        X = single_row_features(records[0])
+        model.predict(X)
+        if fast_model is not None:
+            fast_model.predict(X)
+    estimate_fallback(records[0])
+    # Truk sintetis warm-up bukan traffic produksi
+    if lookup_telemetry is not None:
+        lookup_telemetry.reset()
+    return (time.perf_counter() - started) * 1000
+
+def init_worker(worker_index):
+    """Inisialisasi per worker setelah fork: thread background milik proses ini."""
+    global WORKER_INDEX
+    WORKER_INDEX = worker_index
+    initialize_cache_cleanup()
+    start_truck_archive()
+    start_ingest_queue()
+    start_expiry_sweeper()
+    # Feed eksternal cukup satu subscriber; broadcast hasil lewat message queue
+    if worker_index == 0:
+        start_gate_feed()
 
 # ============================================================================
 # MAIN
@@ -1017,9 +1912,9 @@ if __name__ == '__main__':
     print(f"Performance: MAE 6.25 min | R2 0.26 | 82% within 10min")
     print(f"Shift type: {lookup_tables['metadata']['shift_type']}")
     print(f"Blocks: {len(BLOCK_LABELS)}")
-    print(f"WebSocket: Enabled")
+    print(f"WebSocket: Enabled ({ASYNC_MODE} mode)")
     print(f"Ready to serve real-time predictions!")
     print("="*80 + "\n")
     
     # Jalankan dengan dukungan SocketIO
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, debug=True, host='0.0.0.0', port=5000, **server_kwargs())
\ No newline at end of file
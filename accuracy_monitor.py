@@ -0,0 +1,259 @@
+"""
+ACCURACY MONITOR
+================
+Akurasi live dari waktu selesai aktual (POST /trucks/<truck_id>/complete atau
+event WebSocket TRUCK_COMPLETED).
+
+Prediksi yang dikirim disimpan sementara di peta pending berbatas
+(truck_id -> prediksi, block, jam, versi model, waktu gate-in). Saat completion
+dilaporkan, entri diambil lalu dibuang, dan error (prediksi - aktual, menit)
+masuk ke agregator streaming O(1) per grup:
+  - overall, block:<id>, hour:<jam>, model:<versi>
+  - MAE, bias, rasio |error| <= 10 menit (kumulatif + EWMA "rolling")
+  - kuantil error dari t-digest (memori tetap per grup, tanpa histori per truk)
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+WITHIN_MINUTES = 10.0
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning) untuk kuantil streaming dengan memori tetap.
+    Nilai masuk buffer; buffer digabung ke centroid (skala k1) saat penuh.
+    """
+
+    __slots__ = ('compression', 'buffer_size', 'means', 'weights', 'buffer',
+                 'count', 'min', 'max')
+
+    def __init__(self, compression=100, buffer_size=512):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.buffer.append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.buffer) >= self.buffer_size:
+            self._merge()
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inv(self, k):
+        angle = min(max(k * 2 * math.pi / self.compression, -math.pi / 2), math.pi / 2)
+        return (math.sin(angle) + 1) / 2
+
+    def _merge(self):
+        if not self.buffer:
+            return
+        means = np.concatenate([self.means, np.asarray(self.buffer, dtype=np.float64)])
+        weights = np.concatenate([self.weights, np.ones(len(self.buffer))])
+        self.buffer = []
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        new_means, new_weights = [], []
+        cur_mean, cur_weight = means[0], weights[0]
+        q_before = 0.0
+        q_limit = self._k_inv(self._k(0.0) + 1)
+        for mean, weight in zip(means[1:], weights[1:]):
+            proposed = cur_weight + weight
+            if (q_before + proposed) / total <= q_limit:
+                cur_mean += (mean - cur_mean) * weight / proposed
+                cur_weight = proposed
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                q_before += cur_weight
+                q_limit = self._k_inv(self._k(q_before / total) + 1)
+                cur_mean, cur_weight = mean, weight
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+        self.means = np.asarray(new_means)
+        self.weights = np.asarray(new_weights)
+
+    def quantiles(self, qs):
+        """Kuantil (list q di [0, 1]); None jika kosong."""
+        self._merge()
+        if self.count == 0:
+            return [None] * len(qs)
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centers, [total]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return [float(np.interp(q * total, xs, ys)) for q in qs]
+
+    def __len__(self):
+        return len(self.means) + len(self.buffer)
+
+
+class StreamingAccuracy:
+    """Agregat error satu grup: kumulatif + EWMA + t-digest."""
+
+    __slots__ = ('alpha', 'count', 'abs_total', 'err_total', 'within_total',
+                 'ewm_abs', 'ewm_err', 'ewm_within', 'digest')
+
+    def __init__(self, halflife=500):
+        # Bobot EWMA: kontribusi sampel turun separuh setiap `halflife` sampel
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.count = 0
+        self.abs_total = 0.0
+        self.err_total = 0.0
+        self.within_total = 0
+        self.ewm_abs = 0.0
+        self.ewm_err = 0.0
+        self.ewm_within = 0.0
+        self.digest = TDigest()
+
+    def add(self, error):
+        abs_error = abs(error)
+        within = 1.0 if abs_error <= WITHIN_MINUTES else 0.0
+        self.count += 1
+        self.abs_total += abs_error
+        self.err_total += error
+        self.within_total += within
+        # Rata-rata biasa selama sampel masih sedikit, lalu EWMA
+        a = max(self.alpha, 1.0 / self.count)
+        self.ewm_abs += a * (abs_error - self.ewm_abs)
+        self.ewm_err += a * (error - self.ewm_err)
+        self.ewm_within += a * (within - self.ewm_within)
+        self.digest.add(error)
+
+    def snapshot(self):
+        if self.count == 0:
+            return {'count': 0}
+        p05, p25, p50, p75, p95 = self.digest.quantiles([0.05, 0.25, 0.5, 0.75, 0.95])
+        return {
+            'count': self.count,
+            'mae': round(self.abs_total / self.count, 3),
+            'bias': round(self.err_total / self.count, 3),
+            'within_10min': round(self.within_total / self.count, 4),
+            'rolling_mae': round(self.ewm_abs, 3),
+            'rolling_bias': round(self.ewm_err, 3),
+            'rolling_within_10min': round(self.ewm_within, 4),
+            'error_p05': round(p05, 3),
+            'error_p25': round(p25, 3),
+            'error_p50': round(p50, 3),
+            'error_p75': round(p75, 3),
+            'error_p95': round(p95, 3),
+        }
+
+
+class AccuracyMonitor:
+    """Peta pending berbatas + agregator per grup (overall/block/hour/model)."""
+
+    def __init__(self, max_pending=50_000, halflife=500, min_samples=50):
+        self.max_pending = max_pending
+        self.halflife = halflife
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.groups = {}
+        self.evicted = 0
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = StreamingAccuracy(self.halflife)
+        return group
+
+    def register(self, truck_id, prediction, block_id, hour, model_version, gate_in_ts):
+        """Simpan prediksi yang dikirim sampai completion-nya dilaporkan."""
+        with self.lock:
+            self.pending.pop(truck_id, None)
+            self.pending[truck_id] = (float(prediction), block_id, hour, model_version, gate_in_ts)
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.evicted += 1
+
+    def update_prediction(self, truck_id, prediction, model_version):
+        """Ganti prediksi pending (mis. setelah PREDICTION_REFINED)."""
+        with self.lock:
+            entry = self.pending.get(truck_id)
+            if entry is not None:
+                self.pending[truck_id] = (float(prediction), entry[1], entry[2], model_version, entry[4])
+
+    def complete(self, truck_id, actual_minutes=None, completed_ts=None):
+        """
+        Catat waktu selesai aktual.
+
+        actual_minutes langsung, atau dihitung dari completed_ts - waktu gate-in.
+
+        Returns:
+            dict hasil (prediksi, aktual, error, grup) atau None jika truk tidak pending
+
+        Raises:
+            ValueError: durasi aktual negatif (completed_ts sebelum gate-in);
+                truk tetap pending
+        """
+        with self.lock:
+            entry = self.pending.get(truck_id)
+            if entry is None:
+                return None
+            prediction, block_id, hour, model_version, gate_in_ts = entry
+            if actual_minutes is None:
+                actual_minutes = (completed_ts - gate_in_ts) / 60.0
+            if actual_minutes < 0:
+                raise ValueError('completed_at is before gate-in time')
+            del self.pending[truck_id]
+            error = prediction - actual_minutes
+            for key in ('overall', f'block:{block_id}', f'hour:{hour}', f'model:{model_version}'):
+                self._group(key).add(error)
+        return {
+            'truck_id': truck_id,
+            'predicted_minutes': round(prediction, 2),
+            'actual_minutes': round(actual_minutes, 2),
+            'error_minutes': round(error, 2),
+            'block': block_id,
+            'hour': hour,
+            'model_version': model_version,
+        }
+
+    def confidence(self, block_id, default):
+        """Rasio rolling |error| <= 10 menit untuk block (default jika sampel kurang)."""
+        with self.lock:
+            group = self.groups.get(f'block:{block_id}')
+            if group is None or group.count < self.min_samples:
+                return default
+            return round(group.ewm_within, 4)
+
+    def summary(self):
+        """Ringkasan overall (untuk GET /metrics)."""
+        with self.lock:
+            overall = self.groups.get('overall')
+            return {
+                'overall': overall.snapshot() if overall else {'count': 0},
+                'pending': len(self.pending),
+                'pending_evicted': self.evicted,
+            }
+
+    def snapshot(self):
+        """Semua grup: overall, per block, per jam, per versi model."""
+        with self.lock:
+            result = {'overall': {}, 'blocks': {}, 'hours': {}, 'models': {}}
+            sections = {'block': 'blocks', 'hour': 'hours', 'model': 'models'}
+            for key, group in self.groups.items():
+                if key == 'overall':
+                    result['overall'] = group.snapshot()
+                    continue
+                kind, name = key.split(':', 1)
+                result[sections[kind]][name] = group.snapshot()
+            result['pending'] = len(self.pending)
+            result['pending_evicted'] = self.evicted
+            return result
@@ -6,6 +6,7 @@ class WebSocketService {
     this.externalSocket = null;  // Koneksi ke server WebSocket eksternal
     this.flaskSocket = null;     // Koneksi ke backend Flask
     this.isConnected = false;
+    this.serverSideFeed = false; // true jika backend berlangganan GATE_IN sendiri (ARTG_GATE_FEED_URL)
   }
 
   /**
@@ -97,6 +98,7 @@ class WebSocketService {
 
     this.flaskSocket.on('connection_response', (data) => {
       console.log('Flask backend info:', data);
+      this.serverSideFeed = Boolean(data && data.gate_feed);
     });
 
     this.flaskSocket.on('disconnect', (reason) => {
@@ -178,6 +180,11 @@ class WebSocketService {
    * @param {Object} truckData - Detail truk (truck_id, container_size, dll.)
    */
   sendToPrediction(truckData) {
+    // Backend sudah menerima GATE_IN langsung dari feed; relay akan jadi duplikat
+    if (this.serverSideFeed) {
+      return;
+    }
+
     if (!this.flaskSocket) {
       console.error('Flask socket belum diinisialisasi. Panggil connect() dahulu.');
       return;
@@ -0,0 +1,80 @@
+"""
+ASYNC RUNTIME
+=============
+Mode server Socket.IO: threading (default), eventlet, atau gevent.
+
+    ARTG_ASYNC_MODE=threading  -> satu thread OS per koneksi (werkzeug)
+    ARTG_ASYNC_MODE=eventlet   -> I/O kooperatif (greenlet), butuh `pip install eventlet`
+    ARTG_ASYNC_MODE=gevent     -> I/O kooperatif (greenlet), butuh `pip install gevent gevent-websocket`
+
+Pada mode eventlet/gevent semua socket dan HTTP berjalan di satu event loop,
+jadi kerja CPU (engineer_features, model.predict) harus keluar dari loop.
+run_cpu() menjalankannya di thread OS sungguhan:
+  - eventlet : eventlet.tpool (ukuran: ARTG_CPU_THREADS)
+  - gevent   : threadpool hub gevent (ukuran: ARTG_CPU_THREADS)
+  - threading: dipanggil langsung (sudah di thread sendiri)
+
+Fungsi yang dioper ke run_cpu harus murni CPU: jangan emit socket, jangan
+ambil lock aplikasi, jangan menulis metrics di dalamnya (lakukan setelah kembali).
+
+patch() wajib dipanggil sebelum modul lain diimpor (baris pertama App.py).
+"""
+
+import os
+
+ASYNC_MODE = os.getenv('ARTG_ASYNC_MODE', 'threading').strip().lower()
+# Thread OS untuk kerja CPU pada mode eventlet/gevent
+CPU_THREADS = int(os.getenv('ARTG_CPU_THREADS', '4'))
+
+SUPPORTED_MODES = ('threading', 'eventlet', 'gevent')
+
+_patched = False
+
+
+def patch():
+    """Monkey patch stdlib untuk mode eventlet/gevent (no-op untuk threading)."""
+    global _patched
+    if _patched:
+        return ASYNC_MODE
+    if ASYNC_MODE not in SUPPORTED_MODES:
+        raise ValueError(
+            f"ARTG_ASYNC_MODE={ASYNC_MODE!r} not supported, use one of {SUPPORTED_MODES}"
+        )
+
+    if ASYNC_MODE == 'eventlet':
+        # tpool membaca ukuran pool dari env saat pertama dipakai
+        os.environ.setdefault('EVENTLET_THREADPOOL_SIZE', str(CPU_THREADS))
+        import eventlet
+        eventlet.monkey_patch()
+    elif ASYNC_MODE == 'gevent':
+        os.environ.setdefault('GEVENT_THREADPOOL_SIZE', str(CPU_THREADS))
+        from gevent import monkey
+        monkey.patch_all()
+
+    _patched = True
+    return ASYNC_MODE
+
+
+def is_cooperative():
+    """True jika server berjalan di event loop (eventlet/gevent)."""
+    return ASYNC_MODE in ('eventlet', 'gevent')
+
+
+def run_cpu(func, *args, **kwargs):
+    """Jalankan fungsi CPU-bound di thread OS tanpa memblokir event loop."""
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args, **kwargs)
+    if ASYNC_MODE == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(func, args, kwargs)
+    return func(*args, **kwargs)
+
+
+def server_kwargs():
+    """Argumen tambahan socketio.run() sesuai mode."""
+    if ASYNC_MODE == 'threading':
+        # Werkzeug dev server (perilaku lama)
+        return {'allow_unsafe_werkzeug': True}
+    # eventlet.wsgi / gevent pywsgi: reloader tidak cocok dengan monkey patch
+    return {'use_reloader': False}
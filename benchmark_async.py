@@ -0,0 +1,206 @@
+"""
+BENCHMARK MODE ASYNC
+====================
+Bandingkan kapasitas klien bersamaan dan tail latency antara mode server
+threading, eventlet dan gevent (ARTG_ASYNC_MODE, lihat async_runtime.py).
+
+Skenario (meniru produksi):
+  - --clients dashboard idle yang tetap terhubung dan menerima broadcast
+  - --senders klien yang mengirim GATE_IN_DATA (--rate truk/detik per klien);
+    latency = kirim GATE_IN_DATA -> terima PREDICTION_RESULT dengan truck_id sama
+  - --pollers klien HTTP yang terus memanggil GET /stats
+
+Jalankan server pada tiap mode, lalu benchmark dengan argumen yang sama:
+    ARTG_ASYNC_MODE=threading python App.py
+    python benchmark_async.py --label threading --clients 500 --out bench_threading.json
+
+    ARTG_ASYNC_MODE=eventlet python App.py
+    python benchmark_async.py --label eventlet --clients 500 --out bench_eventlet.json
+
+Butuh klien asyncio: pip install "python-socketio[asyncio_client]"
+(jalankan dari mesin/proses terpisah agar tidak berebut CPU dengan server).
+
+Usage:
+    python benchmark_async.py [--url http://localhost:5000] [--clients 200]
+                              [--senders 10] [--rate 2] [--pollers 10]
+                              [--duration 30] [--label threading] [--out hasil.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import aiohttp
+import numpy as np
+import socketio
+
+# Payload GATE_IN_DATA minimal (block 1G / CY1, stack 1)
+BASE_PAYLOAD = {
+    'TO_BLOCK': '1G',
+    'X': '10',
+    'Y': '3',
+    'Z': '1',
+    'CTR_SIZE': '40',
+    'CTR_TYPE': 'DRY',
+    'CTR_STATUS': 'FCL',
+    'JOB_TYPE': 'Delivery',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent clients per async mode')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=200,
+                        help='Jumlah dashboard idle yang terhubung')
+    parser.add_argument('--senders', type=int, default=10,
+                        help='Jumlah klien pengirim GATE_IN_DATA')
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help='Truk per detik per sender')
+    parser.add_argument('--pollers', type=int, default=10,
+                        help='Jumlah klien HTTP GET /stats bersamaan')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Lama fase beban (detik)')
+    parser.add_argument('--connect-timeout', type=float, default=10.0)
+    parser.add_argument('--label', default='',
+                        help='Nama mode server (hanya untuk laporan)')
+    parser.add_argument('--out', default=None, help='Simpan hasil sebagai JSON')
+    return parser.parse_args()
+
+
+def summarize(samples_ms):
+    """Ringkasan latency (ms)."""
+    if not samples_ms:
+        return {'count': 0}
+    values = np.asarray(samples_ms)
+    return {
+        'count': int(values.size),
+        'p50': round(float(np.percentile(values, 50)), 2),
+        'p95': round(float(np.percentile(values, 95)), 2),
+        'p99': round(float(np.percentile(values, 99)), 2),
+        'max': round(float(values.max()), 2),
+    }
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.clients = []
+        self.connect_ms = []
+        self.connect_failed = 0
+        self.disconnects = 0
+        self.pending = {}
+        self.prediction_ms = []
+        self.broadcasts_received = 0
+        self.http_ms = []
+        self.http_errors = 0
+        self.sent = 0
+        self.running = True
+
+    async def connect_client(self, index):
+        client = socketio.AsyncClient(reconnection=False)
+
+        @client.on('PREDICTION_RESULT')
+        async def on_result(data):
+            self.broadcasts_received += 1
+            sent_at = self.pending.pop(data.get('truck_id'), None)
+            if sent_at is not None:
+                self.prediction_ms.append((time.perf_counter() - sent_at) * 1000)
+
+        @client.on('disconnect')
+        async def on_disconnect():
+            if self.running:
+                self.disconnects += 1
+
+        started = time.perf_counter()
+        try:
+            await client.connect(self.args.url, wait_timeout=self.args.connect_timeout)
+        except Exception:
+            self.connect_failed += 1
+            return None
+        self.connect_ms.append((time.perf_counter() - started) * 1000)
+        self.clients.append(client)
+        return client
+
+    async def sender(self, client, index):
+        interval = 1.0 / self.args.rate
+        deadline = time.perf_counter() + self.args.duration
+        seq = 0
+        while time.perf_counter() < deadline and client.connected:
+            truck_id = f'BENCH{index:03d}-{seq:06d}'
+            payload = dict(BASE_PAYLOAD, truck_id=truck_id,
+                           GATE_IN_TIME=datetime.now().isoformat())
+            self.pending[truck_id] = time.perf_counter()
+            await client.emit('GATE_IN_DATA', payload)
+            self.sent += 1
+            seq += 1
+            await asyncio.sleep(interval)
+
+    async def poller(self, session):
+        deadline = time.perf_counter() + self.args.duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with session.get(f'{self.args.url}/stats') as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        self.http_errors += 1
+                        continue
+                self.http_ms.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                self.http_errors += 1
+                await asyncio.sleep(0.1)
+
+    async def run(self):
+        args = self.args
+        total = args.clients + args.senders
+        print(f"Connecting {total} Socket.IO clients to {args.url} ...")
+        connected = await asyncio.gather(*(self.connect_client(i) for i in range(total)))
+        connected = [c for c in connected if c is not None]
+        print(f"   connected: {len(connected)} | failed: {self.connect_failed}")
+
+        senders = connected[:args.senders]
+        print(f"Load phase: {len(senders)} senders x {args.rate}/s, "
+              f"{args.pollers} HTTP pollers, {args.duration:.0f}s ...")
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(
+                *(self.sender(c, i) for i, c in enumerate(senders)),
+                *(self.poller(session) for _ in range(args.pollers)),
+            )
+        # Tunggu prediksi yang masih di jalan
+        await asyncio.sleep(2.0)
+        self.running = False
+        await asyncio.gather(*(c.disconnect() for c in self.clients), return_exceptions=True)
+
+        return {
+            'label': args.label,
+            'url': args.url,
+            'clients_requested': total,
+            'clients_connected': len(connected),
+            'connect_failed': self.connect_failed,
+            'disconnects_during_load': self.disconnects,
+            'connect_ms': summarize(self.connect_ms),
+            'gate_in_sent': self.sent,
+            'predictions_received': len(self.prediction_ms),
+            'predictions_lost': len(self.pending),
+            'prediction_ms': summarize(self.prediction_ms),
+            'broadcasts_received': self.broadcasts_received,
+            'http_stats_ms': summarize(self.http_ms),
+            'http_errors': self.http_errors,
+            'duration_s': args.duration,
+        }
+
+
+def main():
+    args = parse_args()
+    result = asyncio.run(Bench(args).run())
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved: {args.out}")
+
+
+if __name__ == '__main__':
+    main()
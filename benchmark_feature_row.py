@@ -0,0 +1,192 @@
+"""
+BENCHMARK JALUR CEPAT SATU TRUK
+===============================
+Bandingkan jalur DataFrame (build_serving_frame + finalize_features) dengan
+FeatureRowBuilder (buffer fitur prealokasi, feature_row.py) untuk satu truk:
+
+  1. Parity: fitur kedua jalur identik (statis dan dengan kepadatan live),
+     prediksi model sama
+  2. Alokasi (tracemalloc): puncak memori per prediksi di atas baseline, dan
+     pertumbuhan memori tersisa pada paruh kedua --iterations prediksi (harus datar)
+  3. Waktu per prediksi tanpa tracing (fitur saja, fitur + model.predict)
+
+Exit code 1 jika parity gagal atau memori tersisa jalur cepat tumbuh lebih dari
+--max-growth byte per prediksi.
+
+Usage:
+    python benchmark_feature_row.py [--model-dir models] [--count 2000]
+                                    [--iterations 2000] [--seed 42] [--max-growth 1.0]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import joblib
+import numpy as np
+
+from calendar_features import build_calendar_table
+from feature_pipeline import build_serving_frame, finalize_features, serving_stages
+from feature_row import FeatureRowBuilder
+from load_generator import SyntheticYard
+from lookup_store import has_lookup_store, load_lookup_store
+
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+LIVE_WEIGHT = 0.3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Single-row feature path: parity, allocations, latency')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--count', type=int, default=2000, help='Truk untuk parity')
+    parser.add_argument('--iterations', type=int, default=2000, help='Prediksi per pengukuran alokasi')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-growth', type=float, default=1.0,
+                        help='Batas pertumbuhan memori tersisa jalur cepat (byte/prediksi)')
+    return parser.parse_args()
+
+
+def load_artifacts(model_dir):
+    model = joblib.load(os.path.join(model_dir, 'best_model_2_bulan.pkl'))
+    label_encoders = joblib.load(os.path.join(model_dir, 'label_encoders_2_bulan.pkl'))
+    features_list = joblib.load(os.path.join(model_dir, 'features_list_2_bulan.pkl'))
+    lookup_store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(lookup_store_dir):
+        lookup_tables = load_lookup_store(lookup_store_dir)
+    else:
+        lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
+    return model, label_encoders, features_list, lookup_tables
+
+
+def live_inputs(records):
+    """Kepadatan live tiruan: sebagian slot terisi, sebagian tidak (default 0)."""
+    slots = sorted({r.slot for r in records})
+    slot_congestion = {slot: float(i * 7 % 40) for i, slot in enumerate(slots[::2])}
+    return slot_congestion, 55.0, LIVE_WEIGHT
+
+
+def check_parity(records, model, dataframe_path, fast_path, live_congestion):
+    """Jumlah truk dengan fitur berbeda, selisih prediksi maksimum (200 truk pertama)."""
+    mismatched = 0
+    first = None
+    max_delta = 0.0
+    for i, record in enumerate(records):
+        X_df = dataframe_path(record, live_congestion)
+        X_fast = fast_path(record, live_congestion)
+        expected = X_df.to_numpy(dtype=np.float64)
+        if not np.allclose(expected, X_fast, rtol=0, atol=1e-9, equal_nan=True):
+            mismatched += 1
+            if first is None:
+                columns = np.flatnonzero(~np.isclose(expected[0], X_fast[0], rtol=0, atol=1e-9))
+                first = (record, [(X_df.columns[c], expected[0, c], X_fast[0, c]) for c in columns])
+        if i < 200:
+            delta = abs(float(model.predict(X_df)[0]) - float(model.predict(X_fast)[0]))
+            max_delta = max(max_delta, delta)
+    return mismatched, first, max_delta
+
+
+def measure_allocations(records, run, iterations):
+    """
+    Pertumbuhan tersisa = memori setelah paruh kedua dikurangi setelah paruh
+    pertama, sehingga alokasi sekali jalan (cache, buffer per thread) tidak ikut.
+
+    Returns:
+        tuple: (rata-rata puncak per prediksi, puncak maksimum, pertumbuhan tersisa/prediksi) dalam byte
+    """
+    for record in records[:50]:
+        run(record)
+    half = iterations // 2
+    peaks = np.empty(iterations, dtype=np.float64)
+    gc.collect()
+    tracemalloc.start()
+    for i in range(iterations):
+        if i == half:
+            gc.collect()
+            midpoint, _ = tracemalloc.get_traced_memory()
+        record = records[i % len(records)]
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        run(record)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[i] = peak - before
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(peaks.mean()), float(peaks.max()), (retained - midpoint) / (iterations - half)
+
+
+def measure_latency(records, run, iterations):
+    for record in records[:50]:
+        run(record)
+    started = time.perf_counter()
+    for i in range(iterations):
+        run(records[i % len(records)])
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    args = parse_args()
+    model, label_encoders, features_list, lookup_tables = load_artifacts(args.model_dir)
+    calendar_table = build_calendar_table(lookup_tables)
+    stages = serving_stages(features_list)
+    builder = FeatureRowBuilder(lookup_tables, calendar_table, label_encoders, features_list, stages)
+    records = SyntheticYard(lookup_tables, label_encoders).sample(args.count, seed=args.seed)
+    quiet = lambda *_args, **_kwargs: None
+
+    def dataframe_features(record, live_congestion=None):
+        df = build_serving_frame(record.to_feature_input(), lookup_tables, calendar_table,
+                                 live_congestion=live_congestion, stages=stages)
+        return finalize_features(df, label_encoders, features_list, log=quiet)
+
+    def fast_features(record, live_congestion=None):
+        return builder.fill(record.to_feature_input(), live_congestion)
+
+    print(f"Features: {len(features_list)} | trucks: {len(records):,} (SyntheticYard, seed {args.seed})")
+
+    # 1. Parity
+    failed = False
+    for label, live_congestion in (('static', None), (f'live {LIVE_WEIGHT:g}', live_inputs(records))):
+        with contextlib.redirect_stdout(io.StringIO()):
+            mismatched, first, max_delta = check_parity(
+                records, model, dataframe_features, fast_features, live_congestion
+            )
+        print(f"Parity {label:9s} | feature mismatches {mismatched} | max prediction delta {max_delta:.2e} min")
+        if mismatched:
+            failed = True
+            record, columns = first
+            print(f"   first mismatch {record.truck_id}: {columns[:5]}")
+
+    # 2. Alokasi dan 3. waktu (fitur saja, fitur + predict)
+    paths = {
+        'DataFrame': dataframe_features,
+        'fast row': fast_features,
+    }
+    print(f"\n{'path':24s} | {'peak/pred':>10s} | {'max peak':>10s} | {'retained/pred':>13s} | {'latency':>10s}")
+    growth = {}
+    for name, features in paths.items():
+        for suffix, run in (('features', features),
+                            ('+ predict', lambda r, f=features: model.predict(f(r)))):
+            with contextlib.redirect_stdout(io.StringIO()):
+                mean_peak, max_peak, retained = measure_allocations(records, run, args.iterations)
+                latency_us = measure_latency(records, run, args.iterations)
+            growth[(name, suffix)] = retained
+            print(f"{name + ' ' + suffix:24s} | {mean_peak / 1024:7.1f} KiB | {max_peak / 1024:7.1f} KiB | "
+                  f"{retained:9.2f} B | {latency_us:7.1f} us")
+
+    fast_growth = growth[('fast row', 'features')]
+    if fast_growth > args.max_growth:
+        failed = True
+        print(f"\n[FAIL] fast row retained memory grows {fast_growth:.2f} B/prediction "
+              f"(limit {args.max_growth:g})")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+BENCHMARK MEMORI ENTRI ANTRIAN
+==============================
+Ukur memori per 100k truk di QUEUES: dict 16 field (format lama) vs
+QueuedTruck (__slots__, string kategori di-intern, timestamp epoch).
+
+Memori diukur dengan tracemalloc sebagai memori yang TERSISA setelah
+TruckRecord sumber dibuang (seperti di server: record hanya hidup selama
+request), jadi string yang dipegang entri ikut terhitung.
+
+Truk diambil dari SyntheticYard (vocabulary lookup tables + label encoder).
+
+Usage:
+    python benchmark_truck_memory.py [--count 100000] [--seed 42] [--model-dir models]
+"""
+
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import joblib
+
+from load_generator import SyntheticYard
+from lookup_store import has_lookup_store, load_lookup_store
+from truck_entry import QueuedTruck
+
+
+def legacy_queue_entry(record, predicted_duration, degraded_reason=None):
+    """Format entri antrian sebelum QueuedTruck (dict per truk) sebagai baseline."""
+    gate_in_time = datetime.now()
+    expected_ready_time = gate_in_time + timedelta(minutes=predicted_duration)
+    return {
+        'truck_id': record.truck_id,
+        'job_type': record.job_type,
+        'container_size': record.container_size,
+        'container_type': record.container_type,
+        'ctr_status': record.ctr_status,
+        'lokasi': record.lokasi,
+        'slot': record.slot,
+        'row': record.row,
+        'tier': record.tier,
+        'block': record.block_code,
+        'predicted_duration': predicted_duration,
+        'prediction_source': 'fallback' if degraded_reason else 'model',
+        'degraded': degraded_reason is not None,
+        'gate_in_time': gate_in_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'expected_ready_time': expected_ready_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'added_at': gate_in_time.isoformat()
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure queue entry memory per 100k trucks')
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--model-dir', default='models')
+    return parser.parse_args()
+
+
+def load_yard(model_dir):
+    label_encoders = joblib.load(os.path.join(model_dir, 'label_encoders_2_bulan.pkl'))
+    lookup_store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(lookup_store_dir):
+        lookup_tables = load_lookup_store(lookup_store_dir)
+    else:
+        lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
+    return SyntheticYard(lookup_tables, label_encoders)
+
+
+def measure(name, yard, build, args):
+    """Memori tersisa (byte) + waktu build/statistik/serialisasi untuk satu format."""
+    # Pass 1: memori (tracemalloc memperlambat alokasi, waktu diukur terpisah)
+    gc.collect()
+    tracemalloc.start()
+    records = yard.sample(args.count, seed=args.seed)
+    entries = tuple(build(record, 20.0 + (i % 40)) for i, record in enumerate(records))
+    del records
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    gc.collect()
+
+    # Pass 2: waktu tanpa tracing
+    records = yard.sample(args.count, seed=args.seed)
+    started = time.perf_counter()
+    entries = tuple(build(record, 20.0 + (i % 40)) for i, record in enumerate(records))
+    build_ms = (time.perf_counter() - started) * 1000
+    del records
+
+    if isinstance(entries[0], dict):
+        durations = lambda: [t['predicted_duration'] for t in entries]
+        serialize = lambda: [t for t in entries]
+    else:
+        durations = lambda: [t.predicted_duration for t in entries]
+        serialize = lambda: [t.to_dict() for t in entries]
+
+    started = time.perf_counter()
+    values = durations()
+    mean, low, high = sum(values) / len(values), min(values), max(values)
+    stats_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    serialize()
+    serialize_ms = (time.perf_counter() - started) * 1000
+
+    per_100k = retained * 100_000 / args.count
+    print(f"{name:12s} | {retained / args.count:7.1f} B/truck | "
+          f"{per_100k / 2**20:7.2f} MiB per 100k | build {build_ms:7.1f} ms | "
+          f"stats {stats_ms:6.1f} ms (mean {mean:.1f}, min {low:.1f}, max {high:.1f}) | "
+          f"to JSON shape {serialize_ms:7.1f} ms")
+    return retained
+
+
+def main():
+    args = parse_args()
+    yard = load_yard(args.model_dir)
+    print(f"Trucks: {args.count:,} (SyntheticYard, seed {args.seed})")
+    legacy = measure('dict', yard, legacy_queue_entry, args)
+    slotted = measure('QueuedTruck', yard, QueuedTruck.from_record, args)
+    print(f"Reduction: {(1 - slotted / legacy) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
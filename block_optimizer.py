@@ -0,0 +1,131 @@
+"""
+BLOCK ASSIGNMENT OPTIMIZER
+==========================
+Penugasan truk pending ke block + urutan layanan yang meminimalkan total
+waktu tunggu (sampai truk selesai dilayani) di seluruh yard.
+
+Model biaya (per block, layanan berurutan setelah backlog QUEUES saat ini):
+    selesai(truk) = backlog_block + durasi truk-truk sebelumnya + durasi truk itu
+
+Jika truk j berada di posisi ke-k DARI BELAKANG pada block b, durasinya ikut
+ditunggu oleh k truk (dirinya + k-1 di belakangnya), sehingga
+
+    total = sum_j [ backlog_b + k * durasi(j, b) ]
+
+adalah masalah assignment linear truk x (block, k) yang diselesaikan eksak
+dengan scipy.optimize.linear_sum_assignment (Horn 1973; urutan di dalam block
+otomatis shortest-processing-time-first).
+
+Jumlah slot k per block dibatasi (perkiraan greedy + margin) agar matriks
+kecil; jika ada block yang memakai semua slotnya, batas block itu digandakan
+dan diselesaikan ulang. Biaya naik dengan k, jadi jika tidak ada batas yang
+mengikat, hasil juga optimal untuk masalah tanpa batas.
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from payload_normalizer import D1_BLOCK_ID
+
+# Block CY yang saling bisa menggantikan (validate_stack_for_block relaks untuk CY1-CY6)
+CY_BLOCK_IDS = (1, 2, 3, 4, 5, 6)
+
+
+def candidate_blocks(record, allowed_blocks=CY_BLOCK_IDS):
+    """Block yang boleh melayani truk: truk D1 tetap di D1, lainnya CY yang diizinkan."""
+    if record.block_id == D1_BLOCK_ID:
+        return (D1_BLOCK_ID,)
+    blocks = tuple(b for b in allowed_blocks if b != D1_BLOCK_ID)
+    return blocks or (record.block_id,)
+
+
+def alternative_block_code(block_code, block_id, codes_by_block):
+    """
+    Kode block (fitur model) jika truk dipindah ke block_id: ganti digit block
+    pada kode asli ("1G" -> "2G") bila dikenal lookup, jika tidak kode pertama block itu.
+    """
+    if block_code and block_code[0].isdigit():
+        candidate = f'{block_id}{block_code[1:]}'
+        if candidate in codes_by_block.get(block_id, ()):
+            return candidate
+    codes = codes_by_block.get(block_id)
+    if codes:
+        return codes[0]
+    return str(block_id)
+
+
+def greedy_slot_caps(durations, backlog):
+    """
+    Perkiraan jumlah truk per block dari heuristik greedy (truk terpendek dulu ke
+    block yang paling cepat selesai); dipakai sebagai batas slot awal.
+    """
+    num_trucks, num_blocks = durations.shape
+    elapsed = backlog.astype(np.float64).copy()
+    counts = np.zeros(num_blocks, dtype=np.int64)
+    for truck in np.argsort(durations.min(axis=1), kind='stable'):
+        b = int(np.argmin(elapsed + durations[truck]))
+        elapsed[b] += durations[truck, b]
+        counts[b] += 1
+    return counts
+
+
+def solve_assignment(durations, backlog, slot_margin=1.25):
+    """
+    Penugasan optimal.
+
+    Args:
+        durations: array (truk, block) durasi prediksi (menit), np.inf = tidak layak
+        backlog: array (block,) total durasi antrian saat ini per block (menit)
+
+    Returns:
+        tuple: (indeks block per truk, posisi 1-based dari depan per truk,
+                waktu mulai per truk, waktu selesai per truk, total waktu selesai)
+    """
+    num_trucks, num_blocks = durations.shape
+    feasible_per_block = np.isfinite(durations).sum(axis=0)
+    caps = np.ceil(greedy_slot_caps(durations, backlog) * slot_margin).astype(np.int64) + 2
+    caps = np.minimum(caps, feasible_per_block)
+
+    while True:
+        columns_block = np.repeat(np.arange(num_blocks), caps)
+        columns_k = np.concatenate([np.arange(1, c + 1) for c in caps])
+        cost = backlog[columns_block][None, :] + durations[:, columns_block] * columns_k[None, :]
+        rows, cols = linear_sum_assignment(cost)
+        used = np.bincount(columns_block[cols], minlength=num_blocks)
+        # Batas slot tidak mengikat di block mana pun -> optimal tanpa batas
+        binding = (used >= caps) & (caps < feasible_per_block)
+        if not binding.any():
+            break
+        caps[binding] = np.minimum(caps[binding] * 2, feasible_per_block[binding])
+
+    assigned_block = np.empty(num_trucks, dtype=np.int64)
+    slot_k = np.empty(num_trucks, dtype=np.int64)
+    assigned_block[rows] = columns_block[cols]
+    slot_k[rows] = columns_k[cols]
+    assigned_duration = durations[np.arange(num_trucks), assigned_block]
+
+    # Urutan di block: k terbesar di depan
+    position = np.empty(num_trucks, dtype=np.int64)
+    start = np.empty(num_trucks, dtype=np.float64)
+    for b in range(num_blocks):
+        members = np.flatnonzero(assigned_block == b)
+        if members.size == 0:
+            continue
+        ordered = members[np.argsort(-slot_k[members], kind='stable')]
+        position[ordered] = np.arange(1, ordered.size + 1)
+        starts = backlog[b] + np.concatenate([[0.0], np.cumsum(assigned_duration[ordered])[:-1]])
+        start[ordered] = starts
+    finish = start + assigned_duration
+    return assigned_block, position, start, finish, float(finish.sum())
+
+
+def fifo_baseline(requested_block_idx, durations, backlog):
+    """Total waktu selesai jika tiap truk tetap di TO_BLOCK dengan urutan kedatangan."""
+    elapsed = backlog.astype(np.float64).copy()
+    total = 0.0
+    for truck, b in enumerate(requested_block_idx):
+        if b < 0 or not np.isfinite(durations[truck, b]):
+            return None
+        elapsed[b] += durations[truck, b]
+        total += elapsed[b]
+    return total
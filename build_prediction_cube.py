@@ -0,0 +1,144 @@
+"""
+BUILD PREDICTION CUBE
+=====================
+Skor seluruh grid key yard yang dikenal dengan model yang sedang di-deploy,
+simpan sebagai array padat (lihat prediction_cube.py).
+
+Grid: tanggal x LOKASI (lookup lokasi_historical_avg) x block (BLOCK_target_enc)
+      x 24 jam x profil kontainer (DEFAULT_PROFILES)
+
+Fitur dihitung dengan engineer_features dari App.py (mode batch) sehingga hasil
+cube identik dengan inferensi live. WAJIB dijalankan ulang setiap model atau
+lookup tables berubah (App.py menolak cube dengan fingerprint berbeda), dan
+tiap hari untuk menggeser rentang tanggal, misalnya via cron:
+    python build_prediction_cube.py --days 2
+
+Usage:
+    python build_prediction_cube.py [--date 2026-01-05] [--days 2]
+                                    [--out models/prediction_cube]
+                                    [--chunk-rows 200000] [--max-lokasi N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from prediction_cube import (
+    CUBE_FILE, DEFAULT_PROFILES, MANIFEST_FILE, compute_fingerprint, model_artifact_paths,
+    save_cube_manifest,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build precomputed prediction cube')
+    parser.add_argument('--date', default=None,
+                        help='Tanggal awal (YYYY-MM-DD), default hari ini')
+    parser.add_argument('--days', type=int, default=2,
+                        help='Jumlah hari yang dicakup (default 2)')
+    parser.add_argument('--out', default=os.path.join('models', 'prediction_cube'),
+                        help='Direktori output cube')
+    parser.add_argument('--chunk-rows', type=int, default=200000,
+                        help='Jumlah baris fitur per batch model.predict')
+    parser.add_argument('--max-lokasi', type=int, default=None,
+                        help='Batasi jumlah LOKASI (untuk uji cepat)')
+    return parser.parse_args()
+
+
+def split_lokasi(lokasi):
+    """'42 6 1' -> (slot, row, tier)"""
+    slot, row, tier = lokasi.split(' ')
+    return slot, row, tier
+
+
+def build_chunk_input(lokasi_chunk, blocks, day, profiles):
+    """DataFrame input engineer_features untuk satu potongan LOKASI (urutan C)."""
+    grid = pd.MultiIndex.from_product(
+        [range(len(lokasi_chunk)), range(len(blocks)), range(24), range(len(profiles))],
+        names=['lokasi', 'block', 'hour', 'profile'],
+    ).to_frame(index=False)
+
+    parts = np.array([split_lokasi(l) for l in lokasi_chunk], dtype=object)
+    profile_arr = np.array(profiles, dtype=object)
+    day_start = datetime(day.year, day.month, day.day)
+    gate_in = [day_start + timedelta(hours=h) for h in range(24)]
+
+    lokasi_idx = grid['lokasi'].to_numpy()
+    profile_idx = grid['profile'].to_numpy()
+    return pd.DataFrame({
+        'JOB_TYPE': profile_arr[profile_idx, 0],
+        'CONTAINER_SIZE': profile_arr[profile_idx, 1],
+        'CTR_STATUS': profile_arr[profile_idx, 2],
+        'CONTAINER_TYPE': profile_arr[profile_idx, 3],
+        'slot': parts[lokasi_idx, 0],
+        'row': parts[lokasi_idx, 1],
+        'tier': parts[lokasi_idx, 2],
+        'block': np.asarray(blocks, dtype=object)[grid['block'].to_numpy()],
+        'gate_in_time': np.asarray(gate_in, dtype=object)[grid['hour'].to_numpy()],
+    })
+
+
+def main():
+    args = parse_args()
+    start_date = date.fromisoformat(args.date) if args.date else date.today()
+
+    print("=" * 80)
+    print("BUILD PREDICTION CUBE")
+    print("=" * 80)
+
+    # Import App memuat model, encoder dan lookup tables yang sama dengan server
+    import App
+
+    lokasi = sorted(str(k) for k in App.lookup_tables['lokasi_historical_avg'].keys())
+    if args.max_lokasi:
+        lokasi = lokasi[:args.max_lokasi]
+    blocks = sorted(str(k) for k in App.lookup_tables['BLOCK_target_enc'].keys())
+    profiles = DEFAULT_PROFILES
+
+    rows_per_lokasi = len(blocks) * 24 * len(profiles)
+    lokasi_per_chunk = max(1, args.chunk_rows // rows_per_lokasi)
+    shape = (args.days, len(lokasi), len(blocks), 24, len(profiles))
+    print(f"Start date: {start_date} | days: {args.days}")
+    print(f"Axes: lokasi={len(lokasi)} blocks={len(blocks)} hours=24 profiles={len(profiles)}")
+    print(f"Cube shape: {shape} ({np.prod(shape) * 4 / 1e6:.1f} MB float32)")
+
+    os.makedirs(args.out, exist_ok=True)
+    tmp_path = os.path.join(args.out, CUBE_FILE + '.tmp')
+    cube = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape)
+
+    started = time.time()
+    for d in range(args.days):
+        day = start_date + timedelta(days=d)
+        for start in range(0, len(lokasi), lokasi_per_chunk):
+            lokasi_chunk = lokasi[start:start + lokasi_per_chunk]
+            chunk_input = build_chunk_input(lokasi_chunk, blocks, day, profiles)
+            # engineer_features mencetak log debug per panggilan, diredam di sini
+            with contextlib.redirect_stdout(io.StringIO()):
+                X = App.engineer_features(chunk_input)
+            predictions = App.model.predict(X).astype(np.float32)
+            cube[d, start:start + len(lokasi_chunk)] = predictions.reshape(
+                len(lokasi_chunk), len(blocks), 24, len(profiles)
+            )
+        print(f"[OK] {day} scored ({time.time() - started:.1f}s elapsed)")
+
+    cube.flush()
+    del cube
+    # Hapus manifest lama dulu agar cube baru tidak dibaca dengan sumbu lama
+    manifest_path = os.path.join(args.out, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    os.replace(tmp_path, os.path.join(args.out, CUBE_FILE))
+
+    fingerprint = compute_fingerprint(model_artifact_paths(App.model_dir))
+    save_cube_manifest(args.out, start_date, lokasi, blocks, profiles, fingerprint)
+    print(f"[OK] Cube saved to {args.out} | fingerprint {fingerprint[:12]}")
+    print(f"Total time: {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
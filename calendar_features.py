@@ -0,0 +1,209 @@
+"""
+CALENDAR FEATURES
+=================
+Parsing timestamp gate-in yang cepat + tabel fitur waktu yang sudah dihitung
+sebelumnya, dengan key (tanggal, jam).
+
+Semua fitur waktu di engineer_features (jam, hari, bulan, shift, weekend,
+peak/rush flag, hourly_volume, hour_historical_avg) diambil dari satu baris
+tabel, sehingga per truk cukup satu lookup, dan per batch cukup satu gather
+vektor.
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Jam sibuk 14:00-21:59, sama dengan dataset training (notebook EDA)
+PEAK_HOURS = tuple(range(14, 22))
+MORNING_RUSH_HOURS = (8, 9, 10)
+AFTERNOON_RUSH_HOURS = (13, 14, 15)
+
+# Fitur waktu bertipe integer (urutan kolom pada tabel int)
+INT_TIME_FEATURES = (
+    'gate_in_hour', 'gate_in_dayofweek', 'gate_in_day', 'gate_in_month',
+    'gate_in_is_weekend', 'gate_in_is_peak',
+    'is_morning_rush', 'is_afternoon_rush', 'is_rush_hour',
+)
+
+# Fitur waktu dari lookup tables (urutan kolom pada tabel float)
+FLOAT_TIME_FEATURES = ('hourly_volume', 'hour_historical_avg')
+
+# Satu hari = 8 shift @ 3 jam; satu-satunya definisi aturan shift
+SHIFT_HOURS = 3
+SHIFT_LABELS = tuple(f'shift_{i + 1}' for i in range(24 // SHIFT_HOURS))
+
+DEFAULT_HOURLY_VOLUME = 50
+
+# Rentang tabel default relatif terhadap hari ini
+DEFAULT_DAYS_BACK = 31
+DEFAULT_DAYS_AHEAD = 400
+
+
+def calculate_shift(hour):
+    """Hitung shift (8 shift, interval 3 jam)"""
+    return SHIFT_LABELS[hour // SHIFT_HOURS]
+
+
+def calculate_shifts(hours):
+    """Versi vektor calculate_shift (array jam -> array label)."""
+    return np.asarray(SHIFT_LABELS)[np.asarray(hours) // SHIFT_HOURS]
+
+
+def parse_gate_in_time(raw_value, strict=False):
+    """
+    Parsing timestamp gate-in dengan jalur cepat ISO-8601.
+
+    Format yang dikenal ("2026-01-05 10:11:12", "2026-01-05T10:11:12.123",
+    dengan/tanpa offset zona waktu) diparsing via datetime.fromisoformat.
+    Format lain jatuh ke pd.to_datetime. Jika tetap gagal, pakai waktu sekarang
+    (strict=True: ValueError, mis. untuk completed_at).
+    """
+    if isinstance(raw_value, datetime):
+        return raw_value
+    if not raw_value:
+        if strict:
+            raise ValueError('Empty timestamp')
+        return datetime.now()
+
+    if isinstance(raw_value, str):
+        text = raw_value.strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass
+
+    try:
+        parsed = pd.to_datetime(raw_value)
+        if not pd.isna(parsed):
+            return parsed.to_pydatetime()
+    except Exception:
+        pass
+    if strict:
+        raise ValueError(f'Invalid timestamp: {raw_value!r}')
+    return datetime.now()
+
+
+class CalendarTable:
+    """Tabel fitur waktu per (tanggal, jam) untuk rentang tanggal tertentu."""
+
+    def __init__(self, hourly_volume, hour_historical_avg, overall_avg,
+                 start_date=None, num_days=None):
+        today = date.today()
+        self.start_date = start_date or (today - timedelta(days=DEFAULT_DAYS_BACK))
+        self.num_days = num_days or (DEFAULT_DAYS_BACK + DEFAULT_DAYS_AHEAD)
+        self.start_ordinal = self.start_date.toordinal()
+
+        # Nilai per jam dari lookup tables (24 entri)
+        self.hour_float = np.array([
+            [
+                hourly_volume.get(h, DEFAULT_HOURLY_VOLUME),
+                hour_historical_avg.get(h, overall_avg),
+            ]
+            for h in range(24)
+        ], dtype=np.float64)
+
+        hours = np.tile(np.arange(24), self.num_days)
+        days = [self.start_date + timedelta(days=i) for i in range(self.num_days)]
+        dayofweek = np.repeat([d.weekday() for d in days], 24)
+        day = np.repeat([d.day for d in days], 24)
+        month = np.repeat([d.month for d in days], 24)
+
+        is_morning = np.isin(hours, MORNING_RUSH_HOURS).astype(np.int64)
+        is_afternoon = np.isin(hours, AFTERNOON_RUSH_HOURS).astype(np.int64)
+
+        self.int_table = np.column_stack([
+            hours,
+            dayofweek,
+            day,
+            month,
+            (dayofweek >= 5).astype(np.int64),
+            np.isin(hours, PEAK_HOURS).astype(np.int64),
+            is_morning,
+            is_afternoon,
+            is_morning | is_afternoon,
+        ]).astype(np.int64)
+        self.float_table = self.hour_float[hours]
+
+    def _row_index(self, dt):
+        idx = (dt.toordinal() - self.start_ordinal) * 24 + dt.hour
+        if 0 <= idx < len(self.int_table):
+            return idx
+        return -1
+
+    def _compute_row(self, dt):
+        """Hitung fitur untuk tanggal di luar rentang tabel."""
+        hour = dt.hour
+        dayofweek = dt.weekday()
+        is_morning = int(hour in MORNING_RUSH_HOURS)
+        is_afternoon = int(hour in AFTERNOON_RUSH_HOURS)
+        ints = [
+            hour, dayofweek, dt.day, dt.month,
+            int(dayofweek >= 5), int(hour in PEAK_HOURS),
+            is_morning, is_afternoon, is_morning | is_afternoon,
+        ]
+        return ints, self.hour_float[hour].tolist()
+
+    def lookup(self, dt):
+        """Semua fitur waktu untuk satu timestamp (dict nama fitur -> nilai)."""
+        idx = self._row_index(dt)
+        if idx >= 0:
+            ints = self.int_table[idx].tolist()
+            floats = self.float_table[idx].tolist()
+        else:
+            ints, floats = self._compute_row(dt)
+
+        features = dict(zip(INT_TIME_FEATURES, ints))
+        features.update(zip(FLOAT_TIME_FEATURES, floats))
+        features['gate_in_shift'] = calculate_shift(features['gate_in_hour'])
+        return features
+
+    def row(self, dt):
+        """
+        Fitur waktu satu timestamp tanpa membentuk dict (dipakai feature_row.py).
+
+        Returns:
+            tuple: (ints, floats) urut INT_TIME_FEATURES / FLOAT_TIME_FEATURES
+        """
+        idx = self._row_index(dt)
+        if idx >= 0:
+            return self.int_table[idx], self.float_table[idx]
+        return self._compute_row(dt)
+
+    def gather(self, datetimes):
+        """
+        Fitur waktu untuk banyak timestamp sekaligus (satu gather vektor).
+
+        Returns:
+            dict: nama fitur -> np.ndarray (gate_in_shift berupa array string)
+        """
+        ordinals = np.fromiter((dt.toordinal() for dt in datetimes), dtype=np.int64)
+        hours = np.fromiter((dt.hour for dt in datetimes), dtype=np.int64)
+        idx = (ordinals - self.start_ordinal) * 24 + hours
+        in_range = (idx >= 0) & (idx < len(self.int_table))
+
+        ints = self.int_table[np.where(in_range, idx, 0)]
+        floats = self.float_table[np.where(in_range, idx, 0)]
+        for i in np.flatnonzero(~in_range):
+            row_ints, row_floats = self._compute_row(datetimes[i])
+            ints[i] = row_ints
+            floats[i] = row_floats
+
+        features = {name: ints[:, i] for i, name in enumerate(INT_TIME_FEATURES)}
+        features.update({name: floats[:, i] for i, name in enumerate(FLOAT_TIME_FEATURES)})
+        features['gate_in_shift'] = calculate_shifts(ints[:, 0])
+        return features
+
+
+def build_calendar_table(lookup_tables, start_date=None, num_days=None):
+    """Bangun CalendarTable dari lookup tables hasil generate_lookups.py."""
+    return CalendarTable(
+        lookup_tables['hourly_volume'],
+        lookup_tables['hour_historical_avg'],
+        lookup_tables['overall_avg'],
+        start_date=start_date,
+        num_days=num_days,
+    )
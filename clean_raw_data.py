@@ -0,0 +1,356 @@
+"""
+CLEAN RAW DATA (STREAMING)
+==========================
+Versi command-line dari notebook/cleaning_raw_data2bulan_NEW.ipynb untuk export
+gate mentah (CSV titik koma, mis. Data/src/gatein_out_2bulan.csv):
+
+  - Dibaca per chunk (--chunksize baris), semua kolom sebagai string
+  - Buang blok 7 (STACK diawali "7"), parsing SLOT/ROW/TIER vektor (atau dari
+    kolom LOKASI "slot row tier" jika kolom terpisah tidak ada), buang nilai
+    non-numerik dan di luar rentang (SLOT 0-200, ROW 0-50, TIER 0-9)
+  - Buang duplikat persis (hash baris, juga terhadap data yang sudah ada di
+    bulan yang sama)
+  - Output kolom per bulan GATE_IN: <out>/month=YYYY-MM/part-<sumber>-<nnnnn>.npz
+  - manifest.json mencatat export yang sudah diproses (hash isi file): export
+    baru cukup ditambahkan, export lama dilewati tanpa diproses ulang
+
+Usage:
+    python clean_raw_data.py Data/src/gatein_out_2bulan.csv Data/src/gatein_out_2026-01.csv \\
+        [--out Data/processed/gate_history] [--chunksize 200000] [--force]
+    python clean_raw_data.py --out Data/processed/gate_history --export-csv Data/processed/dataset_rapi_2bulan.csv
+
+Baca hasil:
+    from clean_raw_data import load_gate_history
+    df = load_gate_history('Data/processed/gate_history', months=['2025-10', '2025-11'])
+
+    python feature_pipeline.py build Data/processed/gate_history out.csv
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_OUT_DIR = os.path.join('Data', 'processed', 'gate_history')
+MANIFEST_FILE = 'manifest.json'
+PARTITION_PREFIX = 'month='
+PART_PREFIX = 'part-'
+PART_SUFFIX = '.npz'
+ROW_HASH_COL = '_row_hash'
+
+LOCATION_COLUMNS = ('SLOT', 'ROW', 'TIER')
+# Rentang valid (sama dengan notebook; SLOT 102-103 di blok 3Z valid)
+LOCATION_RANGES = {'SLOT': (0, 200), 'ROW': (0, 50), 'TIER': (0, 9)}
+DURATION_COLUMNS = ('GATE_IN_STACK', 'GATE_IN_OUT', 'PARK_IN_OUT', 'GATE_IN_PARK_OUT')
+EXCLUDED_BLOCK_PREFIX = '7'
+
+
+# ============================================================================
+# CLEANING SATU CHUNK (vektor)
+# ============================================================================
+
+def parse_location(chunk, stats):
+    """SLOT/ROW/TIER numerik + cek rentang; baris tidak valid dibuang."""
+    if not all(col in chunk.columns for col in LOCATION_COLUMNS) and 'LOKASI' in chunk.columns:
+        parts = chunk['LOKASI'].str.split(n=2, expand=True).reindex(columns=range(3))
+        for index, col in enumerate(LOCATION_COLUMNS):
+            chunk[col] = parts[index]
+
+    numeric = {col: pd.to_numeric(chunk[col], errors='coerce') for col in LOCATION_COLUMNS}
+    non_numeric = np.zeros(len(chunk), dtype=bool)
+    for values in numeric.values():
+        non_numeric |= values.isna().to_numpy()
+    stats['non_numeric_location'] += int(non_numeric.sum())
+
+    invalid = non_numeric.copy()
+    for col, (low, high) in LOCATION_RANGES.items():
+        out_of_range = ((numeric[col] < low) | (numeric[col] > high)).to_numpy() & ~non_numeric
+        stats[f'invalid_{col.lower()}'] += int(out_of_range.sum())
+        invalid |= out_of_range
+
+    keep = ~invalid
+    chunk = chunk[keep].copy()
+    for col in LOCATION_COLUMNS:
+        chunk[col] = numeric[col][keep].astype(np.int16)
+    return chunk
+
+
+def clean_chunk(chunk, stats):
+    """
+    Bersihkan satu chunk (semua kolom string dari read_csv dtype=str).
+
+    Returns:
+        DataFrame bersih + kolom GATE_IN (datetime64) dan _row_hash (uint64)
+    """
+    stats['rows_read'] += len(chunk)
+    chunk.columns = [str(c).strip() for c in chunk.columns]
+    for col in chunk.columns:
+        chunk[col] = chunk[col].str.strip()
+
+    block_col = 'STACK' if 'STACK' in chunk.columns else 'BLOCK'
+    block7 = chunk[block_col].fillna('').str.startswith(EXCLUDED_BLOCK_PREFIX).to_numpy()
+    stats['block_7'] += int(block7.sum())
+    chunk = chunk[~block7]
+
+    chunk = parse_location(chunk, stats)
+
+    gate_in = pd.to_datetime(chunk['GATE_IN'], errors='coerce')
+    bad_gate_in = gate_in.isna().to_numpy()
+    stats['invalid_gate_in'] += int(bad_gate_in.sum())
+    chunk = chunk[~bad_gate_in].copy()
+    chunk['GATE_IN'] = gate_in[~bad_gate_in].astype('datetime64[ms]')
+
+    for col in DURATION_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+    chunk[ROW_HASH_COL] = pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64)
+    duplicated = chunk[ROW_HASH_COL].duplicated().to_numpy()
+    stats['duplicates'] += int(duplicated.sum())
+    return chunk[~duplicated]
+
+
+# ============================================================================
+# PARTISI BULANAN
+# ============================================================================
+
+def partition_dir(out_dir, month):
+    return os.path.join(out_dir, f'{PARTITION_PREFIX}{month}')
+
+
+def list_parts(out_dir, months=None, source_key=None):
+    """File partisi (opsional: hanya bulan tertentu / dari satu sumber)."""
+    if months is None:
+        dirs = glob.glob(os.path.join(out_dir, PARTITION_PREFIX + '*'))
+    else:
+        dirs = [partition_dir(out_dir, month) for month in months]
+    pattern = PART_PREFIX + (f'{source_key}-*' if source_key else '*') + PART_SUFFIX
+    parts = []
+    for directory in sorted(dirs):
+        parts.extend(
+            p for p in sorted(glob.glob(os.path.join(directory, pattern)))
+            if not p.endswith('.tmp' + PART_SUFFIX)
+        )
+    return parts
+
+
+def to_columns(frame):
+    """DataFrame -> dict array numpy (string: unicode, tanpa pickle)."""
+    columns = {}
+    for col in frame.columns:
+        values = frame[col]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            columns[col] = values.to_numpy()
+        else:
+            columns[col] = values.fillna('').to_numpy(dtype=str)
+    return columns
+
+
+def write_part(out_dir, month, source_key, sequence, frame):
+    directory = partition_dir(out_dir, month)
+    os.makedirs(directory, exist_ok=True)
+    name = f'{PART_PREFIX}{source_key}-{sequence:05d}'
+    tmp_path = os.path.join(directory, name + '.tmp' + PART_SUFFIX)
+    np.savez_compressed(tmp_path, **to_columns(frame))
+    os.replace(tmp_path, os.path.join(directory, name + PART_SUFFIX))
+
+
+class MonthlyDedup:
+    """Hash baris per bulan, dimuat dari partisi yang ada saat bulan pertama kali disentuh."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.seen = {}
+
+    def filter(self, month, frame):
+        seen = self.seen.get(month)
+        if seen is None:
+            seen = set()
+            for path in list_parts(self.out_dir, months=[month]):
+                with np.load(path, allow_pickle=False) as part:
+                    seen.update(part[ROW_HASH_COL].tolist())
+            self.seen[month] = seen
+        hashes = frame[ROW_HASH_COL].to_numpy()
+        fresh = np.fromiter((h not in seen for h in hashes.tolist()), dtype=bool, count=len(hashes))
+        seen.update(hashes[fresh].tolist())
+        return frame[fresh]
+
+
+# ============================================================================
+# MANIFEST (export yang sudah diproses)
+# ============================================================================
+
+def file_digest(path, block_size=2**20):
+    """Hash isi file (export yang sama dengan nama lain tetap terdeteksi)."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'sources': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+# ============================================================================
+# PROSES SATU EXPORT
+# ============================================================================
+
+def clean_export(path, out_dir, chunksize, dedup, source_key):
+    """Stream satu export mentah ke partisi bulanan. Returns: dict statistik."""
+    # Sisa run yang terputus (belum masuk manifest) dibuang dulu
+    for stale in list_parts(out_dir, source_key=source_key):
+        os.remove(stale)
+
+    stats = dict.fromkeys((
+        'rows_read', 'block_7', 'non_numeric_location', 'invalid_slot', 'invalid_row',
+        'invalid_tier', 'invalid_gate_in', 'duplicates', 'rows_written',
+    ), 0)
+    months = set()
+    sequence = 0
+    # Buffer per bulan: satu file partisi per ~chunksize baris, bukan per chunk x bulan
+    buffers = {}
+
+    def flush(month):
+        nonlocal sequence
+        frames = buffers.pop(month)
+        sequence += 1
+        write_part(out_dir, month, source_key, sequence, pd.concat(frames, ignore_index=True))
+
+    reader = pd.read_csv(path, sep=';', dtype=str, chunksize=chunksize)
+    for chunk_index, chunk in enumerate(reader, 1):
+        cleaned = clean_chunk(chunk, stats)
+        month_keys = cleaned['GATE_IN'].dt.strftime('%Y-%m')
+        for month, frame in cleaned.groupby(month_keys, sort=True):
+            before = len(frame)
+            frame = dedup.filter(month, frame)
+            stats['duplicates'] += before - len(frame)
+            if frame.empty:
+                continue
+            buffers.setdefault(month, []).append(frame)
+            stats['rows_written'] += len(frame)
+            months.add(month)
+            if sum(len(f) for f in buffers[month]) >= chunksize:
+                flush(month)
+        print(f"   chunk {chunk_index}: {stats['rows_read']:,} rows read | "
+              f"{stats['rows_written']:,} kept", flush=True)
+    for month in sorted(buffers):
+        flush(month)
+    stats['months'] = sorted(months)
+    return stats
+
+
+def print_stats(stats):
+    read = max(stats['rows_read'], 1)
+    for name in ('block_7', 'non_numeric_location', 'invalid_slot', 'invalid_row',
+                 'invalid_tier', 'invalid_gate_in', 'duplicates'):
+        if stats[name]:
+            print(f"   removed {name:22s} {stats[name]:>10,} ({stats[name] / read * 100:.2f}%)")
+    print(f"   rows written {stats['rows_written']:,} / {stats['rows_read']:,} | "
+          f"months {', '.join(stats['months']) or '-'}")
+
+
+# ============================================================================
+# BACA HASIL
+# ============================================================================
+
+def load_gate_history(out_dir, months=None, columns=None):
+    """
+    Gabungkan partisi menjadi satu DataFrame (urutan bulan, lalu urutan tulis).
+    months: list 'YYYY-MM' (None = semua); columns: subset kolom (None = semua kecuali hash).
+    """
+    frames = []
+    for path in list_parts(out_dir, months=months):
+        with np.load(path, allow_pickle=False) as part:
+            names = [c for c in part.files if c != ROW_HASH_COL] if columns is None else columns
+            frames.append(pd.DataFrame({name: part[name] for name in names}))
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_clean_dataset(path):
+    """Data bersih dari CSV (output notebook) atau direktori partisi clean_raw_data.py."""
+    if os.path.isdir(path):
+        return load_gate_history(path)
+    return pd.read_csv(path)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Stream-clean raw gate exports into monthly partitions')
+    parser.add_argument('exports', nargs='*', help='CSV export mentah (delimiter ;)')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='Direktori partisi bulanan')
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    parser.add_argument('--force', action='store_true',
+                        help='Proses ulang export yang sudah ada di manifest')
+    parser.add_argument('--export-csv', default=None,
+                        help='Tulis seluruh data bersih ke satu CSV (format dataset_rapi_2bulan.csv)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    manifest = load_manifest(args.out)
+    dedup = MonthlyDedup(args.out)
+
+    for path in args.exports:
+        started = time.perf_counter()
+        source_key = file_digest(path)
+        if source_key in manifest['sources'] and not args.force:
+            print(f"[SKIP] {path} already processed "
+                  f"({manifest['sources'][source_key]['processed_at']})")
+            continue
+        if source_key in manifest['sources']:
+            # --force: baris export ini dibuang dulu agar tidak dianggap duplikat
+            for stale in list_parts(args.out, source_key=source_key):
+                os.remove(stale)
+            del manifest['sources'][source_key]
+            save_manifest(args.out, manifest)
+            dedup = MonthlyDedup(args.out)
+
+        print(f"\n[CLEAN] {path} (source {source_key})")
+        stats = clean_export(path, args.out, args.chunksize, dedup, source_key)
+        print_stats(stats)
+        manifest['sources'][source_key] = {
+            'path': os.path.abspath(path),
+            'size': os.path.getsize(path),
+            'processed_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - started, 2),
+            **stats,
+        }
+        save_manifest(args.out, manifest)
+        print(f"[OK] {path} done in {time.perf_counter() - started:.1f} s")
+
+    if args.export_csv:
+        df = load_gate_history(args.out)
+        df.to_csv(args.export_csv, index=False)
+        print(f"[OK] {len(df):,} clean rows -> {args.export_csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
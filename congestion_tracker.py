@@ -0,0 +1,157 @@
+"""
+CONGESTION TRACKER
+==================
+Kepadatan live dari kedatangan truk yang benar-benar diterima (GATE_IN_DATA
+dan add_truck), per slot dan per block, dalam beberapa jendela geser
+(default 15 dan 60 menit).
+
+Tiap jendela adalah ring buffer bucket per menit dengan total berjalan:
+update dan query O(1) (bucket kedaluwarsa dikosongkan saat jarum digeser,
+paling banyak sekali per bucket).
+
+Key slot/block berasal dari klien, jadi jumlah counter dibatasi: hanya slot/
+block di `known_slots` / `known_blocks` (kosakata lookup tables) yang punya
+counter sendiri (yang lain tetap masuk total yard), dan counter yang idle
+sepanjang jendela terpanjang dibuang saat sweep (sekali per jendela terpanjang).
+
+Fitur model `congestion_count` (per jam-slot) dan `hourly_volume` (per jam)
+dihitung dari histori 2 bulan, jadi nilai live per jam diskalakan dengan
+jumlah hari histori (ARTG_LIVE_HISTORY_DAYS) agar satuannya sama sebelum
+dicampur di feature_pipeline.add_live_congestion.
+"""
+
+import threading
+import time
+
+BUCKET_SECONDS = 60
+
+
+class SlidingWindowCounter:
+    """Jumlah kejadian dalam `window_s` detik terakhir (resolusi BUCKET_SECONDS)."""
+
+    __slots__ = ('bucket_s', 'buckets', 'total', 'head')
+
+    def __init__(self, window_s, bucket_s=BUCKET_SECONDS):
+        self.bucket_s = bucket_s
+        self.buckets = [0] * max(1, int(window_s // bucket_s))
+        self.total = 0
+        self.head = None  # nomor bucket terbaru (waktu // bucket_s)
+
+    def _advance(self, now):
+        tick = int(now // self.bucket_s)
+        if self.head is None:
+            self.head = tick
+            return
+        gap = tick - self.head
+        if gap <= 0:
+            return
+        size = len(self.buckets)
+        if gap >= size:
+            self.buckets[:] = [0] * size
+            self.total = 0
+        else:
+            for step in range(1, gap + 1):
+                idx = (self.head + step) % size
+                self.total -= self.buckets[idx]
+                self.buckets[idx] = 0
+        self.head = tick
+
+    def add(self, now, count=1):
+        self._advance(now)
+        self.buckets[self.head % len(self.buckets)] += count
+        self.total += count
+
+    def count(self, now):
+        self._advance(now)
+        return self.total
+
+
+class CongestionTracker:
+    """Counter jendela geser per slot, per block dan seluruh yard."""
+
+    def __init__(self, windows_min=(15, 60), feature_window_min=60, history_days=60,
+                 known_slots=None, known_blocks=None):
+        self.windows_min = tuple(int(w) for w in windows_min)
+        if feature_window_min not in self.windows_min:
+            self.windows_min += (int(feature_window_min),)
+        self.feature_window_min = int(feature_window_min)
+        self.history_days = float(history_days)
+        self.known_slots = None if known_slots is None else frozenset(known_slots)
+        self.known_blocks = None if known_blocks is None else frozenset(known_blocks)
+        self.sweep_s = max(self.windows_min) * 60
+        self.next_sweep = None
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.blocks = {}
+        self.yard = self._new_counters()
+        # Kedatangan dengan slot/block di luar kosakata (hanya masuk yard)
+        self.untracked = 0
+
+    def _new_counters(self):
+        return {w: SlidingWindowCounter(w * 60) for w in self.windows_min}
+
+    def _counters(self, table, key, known):
+        counters = table.get(key)
+        if counters is None:
+            if known is not None and key not in known:
+                return None
+            counters = table[key] = self._new_counters()
+        return counters
+
+    def _sweep(self, now):
+        """Buang counter slot/block yang kosong di semua jendela."""
+        longest = max(self.windows_min)
+        for table in (self.slots, self.blocks):
+            idle = [key for key, counters in table.items() if not counters[longest].count(now)]
+            for key in idle:
+                del table[key]
+        self.next_sweep = now + self.sweep_s
+
+    def record(self, slot, block_id, now=None):
+        """Catat satu kedatangan truk (slot sudah dibersihkan seperti di pipeline)."""
+        now = time.time() if now is None else now
+        with self.lock:
+            if self.next_sweep is None:
+                self.next_sweep = now + self.sweep_s
+            elif now >= self.next_sweep:
+                self._sweep(now)
+            slot_counters = self._counters(self.slots, slot, self.known_slots)
+            block_counters = self._counters(self.blocks, block_id, self.known_blocks)
+            if slot_counters is None or block_counters is None:
+                self.untracked += 1
+            for counters in (slot_counters, block_counters, self.yard):
+                if counters is not None:
+                    for counter in counters.values():
+                        counter.add(now)
+
+    def _read(self, counters, now):
+        return {f'{w}m': counters[w].count(now) for w in self.windows_min}
+
+    def snapshot(self, now=None):
+        """Jumlah kedatangan per jendela: yard, per block, per slot."""
+        now = time.time() if now is None else now
+        with self.lock:
+            return {
+                'windows_min': list(self.windows_min),
+                'yard': self._read(self.yard, now),
+                'blocks': {b: self._read(c, now) for b, c in self.blocks.items()},
+                'slots': {s: self._read(c, now) for s, c in self.slots.items()},
+                'untracked_arrivals': self.untracked,
+            }
+
+    def feature_inputs(self, slot, now=None):
+        """
+        Nilai live satu slot dalam skala lookup tables (jendela fitur, per jam x
+        hari histori). Hanya membaca counter slot tersebut dan counter yard.
+
+        Returns:
+            tuple: (congestion_count live slot, hourly_volume live)
+        """
+        now = time.time() if now is None else now
+        scale = (60.0 / self.feature_window_min) * self.history_days
+        w = self.feature_window_min
+        with self.lock:
+            counters = self.slots.get(slot)
+            slot_count = counters[w].count(now) if counters is not None else 0
+            hourly_volume = self.yard[w].count(now) * scale
+        return slot_count * scale, hourly_volume
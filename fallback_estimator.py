@@ -0,0 +1,60 @@
+"""
+FALLBACK ESTIMATOR
+==================
+Estimator durasi murah dari lookup tables, dipakai saat inferensi model
+melebihi latency budget, pool inferensi penuh, atau model error.
+
+Estimasi = rata-rata berbobot dari komponen yang tersedia:
+  - LOKASI_target_enc   (rata-rata historis lokasi)
+  - rolling_mean_3      (3 durasi terakhir di lokasi yang sama)
+  - BLOCK_target_enc    (rata-rata historis blok)
+  - hour_historical_avg (rata-rata historis jam gate-in)
+Komponen yang tidak ada di lookup dilewati; jika semua kosong pakai overall_avg.
+"""
+
+import pandas as pd
+
+from feature_pipeline import clean_categorical_value, lokasi_key
+
+COMPONENT_WEIGHTS = (
+    ('LOKASI_target_enc', 0.35),
+    ('rolling_mean_3', 0.25),
+    ('BLOCK_target_enc', 0.25),
+    ('hour_historical_avg', 0.15),
+)
+
+
+class FallbackEstimator:
+    """Estimasi durasi dari lookup tables tanpa menyentuh model."""
+
+    def __init__(self, lookup_tables):
+        self.lookup_tables = lookup_tables
+        self.overall_avg = float(lookup_tables['overall_avg'])
+
+    def components(self, slot, row, tier, block, hour):
+        """Nilai tiap komponen (None jika key tidak ada di lookup)."""
+        lokasi = lokasi_key(slot, row, tier)
+        location_hist = self.lookup_tables['location_history'].get(lokasi, None)
+        return {
+            'LOKASI_target_enc': self.lookup_tables['LOKASI_target_enc'].get(lokasi, None),
+            'rolling_mean_3': location_hist['rolling_mean_3'] if location_hist else None,
+            'BLOCK_target_enc': self.lookup_tables['BLOCK_target_enc'].get(
+                clean_categorical_value(block), None
+            ),
+            'hour_historical_avg': self.lookup_tables['hour_historical_avg'].get(hour, None),
+        }
+
+    def estimate(self, slot, row, tier, block, hour):
+        """Durasi estimasi (menit)."""
+        values = self.components(slot, row, tier, block, hour)
+        total = 0.0
+        weight_sum = 0.0
+        for name, weight in COMPONENT_WEIGHTS:
+            value = values[name]
+            if value is None or pd.isna(value):
+                continue
+            total += float(value) * weight
+            weight_sum += weight
+        if weight_sum == 0:
+            return self.overall_avg
+        return total / weight_sum
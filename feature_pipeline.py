@@ -0,0 +1,649 @@
+"""
+FEATURE PIPELINE
+================
+Satu implementasi (vektor, berbasis pandas/numpy) untuk 45 fitur model, dipakai oleh:
+  - App.py                 -> build_serving_frame + finalize_features (fitur dari lookup tables)
+  - generate_lookups.py    -> clean_categorical, build_lokasi (key lookup tables)
+  - notebook EDA/modeling  -> build_training_features (fitur dari data historis + target)
+  - feature_pruning.py     -> build_serving_frame per tahap (SERVING_STAGES) untuk biaya per fitur
+  - feature_row.py         -> versi skalar serving untuk satu truk (ikut diubah jika definisi
+                              fitur berubah; cek dengan benchmark_feature_row.py)
+
+Definisi fitur mengikuti dataset training (notebook eda_feature_engineering2bulan):
+  - gate_in_is_peak   : jam 14:00-21:59
+  - is_special        : CONTAINER_TYPE selain DRY/STANDARD
+  - LOKASI            : "slot row_numeric tier"
+  - gate_in_shift     : shift_1 .. shift_8 (interval 3 jam)
+
+Cek parity fitur serving terhadap dataset training (exit code 1 jika ada selisih
+di luar fitur lag yang memang berbeda by design):
+    python feature_pipeline.py check Data/processed/dataset_final2bulan_45FEATURES_PROPER.csv
+
+Bangun ulang dataset fitur training dari data bersih (CSV atau partisi bulanan
+clean_raw_data.py):
+    python feature_pipeline.py build Data/processed/dataset_rapi_2bulan.csv out.csv
+    python feature_pipeline.py build Data/processed/gate_history out.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from calendar_features import (
+    AFTERNOON_RUSH_HOURS, MORNING_RUSH_HOURS, PEAK_HOURS, calculate_shifts, parse_gate_in_time,
+)
+
+# Naikkan setiap definisi fitur berubah (ikut fingerprint prediction cube)
+FEATURE_VERSION = 2
+
+TARGET_COL = 'GATE_IN_STACK'
+
+CATEGORICAL_FEATURES = [
+    'JOB_TYPE', 'CONTAINER_SIZE', 'CTR_STATUS', 'CONTAINER_TYPE',
+    'slot', 'tier', 'block', 'gate_in_shift'
+]
+
+NUMERICAL_FEATURES = [
+    'gate_in_hour', 'gate_in_dayofweek', 'gate_in_day', 'gate_in_month',
+    'gate_in_is_weekend', 'gate_in_is_peak',
+    'slot_numeric', 'row_numeric', 'tier_numeric', 'block_numeric',
+    'distance_from_gate', 'vertical_distance',
+    'hourly_volume', 'congestion_count',
+    'slot_historical_avg', 'tier_historical_avg',
+    'lokasi_historical_avg', 'hour_historical_avg',
+    'container_size_numeric', 'is_empty', 'is_full', 'is_reefer', 'is_special',
+    'is_morning_rush', 'is_afternoon_rush', 'is_rush_hour',
+    'slot_tier_interaction', 'size_tier_interaction',
+    'congestion_tier', 'rush_hour_congestion',
+    'slot_duration_std', 'slot_duration_min', 'slot_duration_max',
+    'prev_duration_same_location', 'rolling_mean_3',
+    'BLOCK_target_enc', 'LOKASI_target_enc'
+]
+
+MODEL_FEATURES = CATEGORICAL_FEATURES + NUMERICAL_FEATURES
+
+# Training memakai histori per baris (shift + rolling), serving memakai histori
+# terakhir per LOKASI dari lookup tables -> selisih wajar, tidak dianggap gagal
+LAG_FEATURES = ('prev_duration_same_location', 'rolling_mean_3')
+
+NON_SPECIAL_CONTAINER_TYPES = ('DRY', 'STANDARD')
+
+# Tahap serving yang bisa dilewati (urutan = urutan di build_serving_frame):
+# nama -> (fitur yang dihasilkan, tahap prasyarat). Tahap 'location' dan
+# 'calendar' selalu jalan (key lookup, jam, shift, flag waktu).
+SERVING_STAGES = {
+    'congestion': (('congestion_count',), ()),
+    'historical': (('slot_historical_avg', 'tier_historical_avg',
+                    'lokasi_historical_avg', 'LOKASI_target_enc'), ()),
+    'slot_stats': (('slot_duration_std', 'slot_duration_min', 'slot_duration_max'), ()),
+    'location_history': (('prev_duration_same_location', 'rolling_mean_3'), ('historical',)),
+    'block_encoding': (('BLOCK_target_enc',), ()),
+    'live': (('congestion_count', 'hourly_volume'), ()),
+    'container': (('container_size_numeric', 'is_empty', 'is_full', 'is_reefer', 'is_special'), ()),
+    'interaction': (('slot_tier_interaction', 'size_tier_interaction'), ('container',)),
+    'congestion_interaction': (('congestion_tier', 'rush_hour_congestion'), ('congestion', 'live')),
+}
+
+# Default jika key tidak ada di lookup tables
+DEFAULT_CONGESTION = 10
+DEFAULT_SLOT_STD = 0
+DEFAULT_SLOT_MIN = 7.35
+DEFAULT_SLOT_MAX = 42.47
+
+
+# ============================================================================
+# HELPER DASAR
+# ============================================================================
+
+def clean_categorical_value(value):
+    """Bersihkan nilai kategorikal untuk konsistensi"""
+    s = str(value).strip()
+    if s.endswith('.0'):
+        s = s[:-2]
+    return s
+
+
+def clean_categorical(series):
+    """Versi vektor clean_categorical_value untuk satu kolom."""
+    s = series.astype(str).str.strip()
+    return s.str.replace(r'\.0$', '', regex=True)
+
+
+def to_int(series):
+    """Konversi ke int (nilai non-numerik -> 0)."""
+    return pd.to_numeric(series, errors='coerce').fillna(0).astype(int)
+
+
+def build_lokasi(slot, row_numeric, tier):
+    """Key LOKASI "slot row_numeric tier" (dipakai lookup tables)."""
+    return slot + ' ' + row_numeric.astype(str) + ' ' + tier
+
+
+def lokasi_key(slot, row, tier):
+    """Versi skalar build_lokasi untuk satu truk."""
+    row_numeric = pd.to_numeric(clean_categorical_value(row), errors='coerce')
+    row_numeric = 0 if pd.isna(row_numeric) else int(row_numeric)
+    return f'{clean_categorical_value(slot)} {row_numeric} {clean_categorical_value(tier)}'
+
+
+def shift_labels(hours):
+    """Label shift (8 shift, interval 3 jam) untuk array jam."""
+    return pd.Series(calculate_shifts(hours))
+
+
+def map_lookup(series, table, default):
+    """
+    Ambil nilai lookup untuk satu kolom: satu .get per nilai unik, lalu
+    disebar lagi ke semua baris (cepat untuk batch besar).
+    """
+    codes, uniques = pd.factorize(series)
+    values = np.array([table.get(u, default) for u in uniques], dtype=np.float64)
+    if len(values) == 0:
+        return np.full(len(series), default, dtype=np.float64)
+    return values[codes]
+
+
+# ============================================================================
+# TAHAP FITUR (dipakai serving dan training)
+# ============================================================================
+
+def add_location_features(df):
+    """Bersihkan slot/row/tier/block, buat LOKASI dan fitur jarak."""
+    df['slot'] = clean_categorical(df['slot'])
+    df['tier'] = clean_categorical(df['tier'])
+    df['block'] = clean_categorical(df['block'])
+
+    if 'row' in df.columns:
+        df['row'] = clean_categorical(df['row'])
+        df['row_numeric'] = to_int(df['row'])
+    elif 'row_numeric' not in df.columns:
+        df['row_numeric'] = 0
+
+    df['LOKASI'] = build_lokasi(df['slot'], df['row_numeric'], df['tier'])
+
+    df['slot_numeric'] = to_int(df['slot'])
+    df['tier_numeric'] = to_int(df['tier'])
+    df['block_numeric'] = df['block'].str.extract(r'(\d+)')[0].astype(float).fillna(0).astype(int)
+
+    df['distance_from_gate'] = (
+        df['slot_numeric'] * 10 +
+        df['row_numeric'] * 2 +
+        df['tier_numeric'] * 3
+    )
+    df['vertical_distance'] = df['tier_numeric'] ** 2
+    return df
+
+
+def add_time_features(df, timestamps):
+    """Fitur waktu dari kolom timestamp (jalur training / vektor penuh)."""
+    ts = pd.to_datetime(timestamps)
+    hours = ts.dt.hour.to_numpy()
+    df['gate_in_hour'] = hours
+    df['gate_in_dayofweek'] = ts.dt.dayofweek.to_numpy()
+    df['gate_in_day'] = ts.dt.day.to_numpy()
+    df['gate_in_month'] = ts.dt.month.to_numpy()
+    df['gate_in_is_weekend'] = (df['gate_in_dayofweek'] >= 5).astype(int)
+    df['gate_in_is_peak'] = np.isin(hours, PEAK_HOURS).astype(int)
+    df['gate_in_shift'] = shift_labels(hours).to_numpy()
+    df['is_morning_rush'] = np.isin(hours, MORNING_RUSH_HOURS).astype(int)
+    df['is_afternoon_rush'] = np.isin(hours, AFTERNOON_RUSH_HOURS).astype(int)
+    df['is_rush_hour'] = (df['is_morning_rush'] | df['is_afternoon_rush']).astype(int)
+    return df
+
+
+def add_calendar_features(df, calendar_table):
+    """Fitur waktu dari CalendarTable (jalur serving: satu lookup / gather)."""
+    if 'gate_in_time' in df.columns:
+        raw_values = df['gate_in_time'].tolist()
+    elif 'gate_in' in df.columns:
+        raw_values = df['gate_in'].tolist()
+    else:
+        raw_values = [None] * len(df)
+
+    if len(df) == 1:
+        time_features = calendar_table.lookup(parse_gate_in_time(raw_values[0]))
+    else:
+        time_features = calendar_table.gather([parse_gate_in_time(v) for v in raw_values])
+    for name, value in time_features.items():
+        df[name] = value
+    return df
+
+
+def add_container_features(df):
+    """Ukuran numerik, status kosong/penuh, reefer dan special."""
+    df['container_size_numeric'] = pd.to_numeric(
+        df['CONTAINER_SIZE'].astype(str).str.extract(r'(\d+)')[0],
+        errors='coerce'
+    ).fillna(20).astype(int)
+
+    container_type = df['CONTAINER_TYPE'].astype(str).str.strip().str.upper()
+    df['is_empty'] = (df['CTR_STATUS'] == 'MTY').astype(int)
+    df['is_full'] = (df['CTR_STATUS'] == 'FCL').astype(int)
+    df['is_reefer'] = container_type.str.contains('RF|REEFER|RH', na=False).astype(int)
+    df['is_special'] = (~container_type.isin(NON_SPECIAL_CONTAINER_TYPES)).astype(int)
+    return df
+
+
+def add_interaction_features(df):
+    """Interaksi numerik (butuh lokasi, kontainer, kepadatan dan rush hour)."""
+    add_static_interactions(df)
+    add_congestion_interactions(df)
+    return df
+
+
+def add_static_interactions(df):
+    """Interaksi lokasi x tier dan ukuran kontainer x tier."""
+    df['slot_tier_interaction'] = df['slot_numeric'] * df['tier_numeric']
+    df['size_tier_interaction'] = df['container_size_numeric'] * df['tier_numeric']
+    return df
+
+
+def add_congestion_interactions(df):
+    """Interaksi kepadatan (setelah add_live_congestion jika dipakai)."""
+    df['congestion_tier'] = df['congestion_count'] * df['tier_numeric']
+    df['rush_hour_congestion'] = df['is_rush_hour'] * df['congestion_count']
+    return df
+
+
+def add_lookup_features(df, lookup_tables):
+    """Kepadatan, historis, statistik, lag dan target encoding dari lookup tables."""
+    add_congestion_lookup(df, lookup_tables)
+    add_historical_lookup(df, lookup_tables)
+    add_slot_stats_lookup(df, lookup_tables)
+    add_location_history(df, lookup_tables)
+    add_block_encoding(df, lookup_tables)
+    return df
+
+
+def add_congestion_lookup(df, lookup_tables):
+    """Kepadatan statis per (jam, slot)."""
+    df['hour_slot_key'] = df['gate_in_hour'].astype(str) + '_' + df['slot']
+    df['congestion_count'] = map_lookup(
+        df['hour_slot_key'], lookup_tables['congestion_by_hour_slot'], DEFAULT_CONGESTION
+    )
+    return df
+
+
+def add_historical_lookup(df, lookup_tables):
+    """Rata-rata durasi historis per slot, tier dan LOKASI."""
+    overall_avg = lookup_tables['overall_avg']
+    df['slot_historical_avg'] = map_lookup(
+        df['slot'], lookup_tables['slot_historical_avg'], overall_avg
+    )
+    df['tier_historical_avg'] = map_lookup(
+        df['tier'], lookup_tables['tier_historical_avg'], overall_avg
+    )
+    df['lokasi_historical_avg'] = map_lookup(
+        df['LOKASI'], lookup_tables['lokasi_historical_avg'], overall_avg
+    )
+    df['LOKASI_target_enc'] = df['lokasi_historical_avg']
+    return df
+
+
+def add_slot_stats_lookup(df, lookup_tables):
+    """Statistik durasi per slot (std, min, max)."""
+    df['slot_duration_std'] = map_lookup(
+        df['slot'], lookup_tables['slot_duration_std'], DEFAULT_SLOT_STD
+    )
+    df['slot_duration_min'] = map_lookup(
+        df['slot'], lookup_tables['slot_duration_min'], DEFAULT_SLOT_MIN
+    )
+    df['slot_duration_max'] = map_lookup(
+        df['slot'], lookup_tables['slot_duration_max'], DEFAULT_SLOT_MAX
+    )
+    return df
+
+
+def add_location_history(df, lookup_tables):
+    """Histori terakhir per LOKASI (fallback ke rata-rata lokasi)."""
+    codes, uniques = pd.factorize(df['LOKASI'])
+    history = [lookup_tables['location_history'].get(u, None) for u in uniques]
+    last = np.array([h['last_duration'] if h else np.nan for h in history], dtype=np.float64)
+    rolling = np.array([h['rolling_mean_3'] if h else np.nan for h in history], dtype=np.float64)
+    lokasi_avg = df['lokasi_historical_avg'].to_numpy()
+    if len(uniques):
+        df['prev_duration_same_location'] = np.where(np.isnan(last[codes]), lokasi_avg, last[codes])
+        df['rolling_mean_3'] = np.where(np.isnan(rolling[codes]), lokasi_avg, rolling[codes])
+    else:
+        df['prev_duration_same_location'] = lokasi_avg
+        df['rolling_mean_3'] = lokasi_avg
+    return df
+
+
+def add_block_encoding(df, lookup_tables):
+    """Target encoding block."""
+    df['BLOCK_target_enc'] = map_lookup(
+        df['block'], lookup_tables['BLOCK_target_enc'], lookup_tables['overall_avg']
+    )
+    return df
+
+
+def add_live_congestion(df, slot_congestion, hourly_volume, weight):
+    """
+    Campur kepadatan statis (lookup tables) dengan kepadatan live dari
+    congestion_tracker (sudah dalam skala lookup). weight 0 = statis saja,
+    1 = live saja. Dipanggil sebelum add_interaction_features.
+    congestion_count hanya dicampur jika tahap congestion dijalankan.
+    """
+    if 'congestion_count' in df.columns:
+        live_slot = map_lookup(df['slot'], slot_congestion, 0.0)
+        df['congestion_count'] = (1 - weight) * df['congestion_count'] + weight * live_slot
+    df['hourly_volume'] = (1 - weight) * df['hourly_volume'] + weight * hourly_volume
+    return df
+
+
+def add_training_aggregates(df, target_col=TARGET_COL):
+    """
+    Versi training dari add_lookup_features: agregat dihitung langsung dari data
+    (urutan baris harus kronologis untuk fitur lag).
+    """
+    target = df[target_col]
+
+    df['hourly_volume'] = df.groupby('gate_in_hour')[target_col].transform('size')
+    df['hour_slot_key'] = df['gate_in_hour'].astype(str) + '_' + df['slot']
+    df['congestion_count'] = df.groupby('hour_slot_key')[target_col].transform('size')
+
+    df['slot_historical_avg'] = df.groupby('slot')[target_col].transform('mean')
+    df['tier_historical_avg'] = df.groupby('tier')[target_col].transform('mean')
+    df['lokasi_historical_avg'] = df.groupby('LOKASI')[target_col].transform('mean')
+    df['hour_historical_avg'] = df.groupby('gate_in_hour')[target_col].transform('mean')
+
+    df['slot_duration_std'] = df.groupby('slot')[target_col].transform('std').fillna(0)
+    df['slot_duration_min'] = df.groupby('slot')[target_col].transform('min')
+    df['slot_duration_max'] = df.groupby('slot')[target_col].transform('max')
+
+    # Lag: hanya data masa lalu di lokasi yang sama
+    shifted = df.groupby('LOKASI')[target_col].shift(1)
+    global_mean = target.mean()
+    df['prev_duration_same_location'] = shifted.fillna(global_mean)
+    df['rolling_mean_3'] = (
+        shifted.groupby(df['LOKASI'])
+        .rolling(window=3, min_periods=1).mean()
+        .reset_index(level=0, drop=True)
+        .reindex(df.index)
+        .fillna(global_mean)
+    )
+
+    df['BLOCK_target_enc'] = df.groupby('block')[target_col].transform('mean')
+    df['LOKASI_target_enc'] = df['lokasi_historical_avg']
+    return df
+
+
+# ============================================================================
+# PIPELINE SERVING
+# ============================================================================
+
+def serving_stages(features):
+    """
+    Tahap opsional SERVING_STAGES yang dibutuhkan untuk menghasilkan `features`
+    (termasuk prasyarat). Dipakai App.py agar features_list hasil pruning
+    (feature_pruning.py) juga melewati lookup yang tidak dipakai model.
+    """
+    features = set(features)
+    needed = {name for name, (outputs, _) in SERVING_STAGES.items() if features.intersection(outputs)}
+    pending = list(needed)
+    while pending:
+        for required in SERVING_STAGES[pending.pop()][1]:
+            if required not in needed:
+                needed.add(required)
+                pending.append(required)
+    return frozenset(needed)
+
+
+def build_serving_frame(input_data, lookup_tables, calendar_table, live_congestion=None,
+                        stages=None, timings=None):
+    """
+    Semua fitur (sebelum label encoding) dari input mentah.
+
+    input_data: dict satu truk, list dict, atau DataFrame dengan kolom
+    JOB_TYPE, CONTAINER_SIZE, CTR_STATUS, CONTAINER_TYPE, slot, row, tier,
+    block, gate_in_time.
+    live_congestion: None, atau (slot_congestion, hourly_volume, weight)
+    untuk add_live_congestion.
+    stages: None (semua tahap), atau hasil serving_stages(features_list).
+    timings: dict opsional, diisi detik per tahap (diakumulasi).
+    """
+    if isinstance(input_data, pd.DataFrame):
+        df = input_data.reset_index(drop=True).copy()
+    elif isinstance(input_data, dict):
+        df = pd.DataFrame([input_data])
+    else:
+        df = pd.DataFrame(list(input_data))
+
+    steps = [
+        ('location', add_location_features, (df,)),
+        # Termasuk shift, weekend/peak/rush flag, hourly_volume dan hour_historical_avg
+        ('calendar', add_calendar_features, (df, calendar_table)),
+        ('congestion', add_congestion_lookup, (df, lookup_tables)),
+        ('historical', add_historical_lookup, (df, lookup_tables)),
+        ('slot_stats', add_slot_stats_lookup, (df, lookup_tables)),
+        ('location_history', add_location_history, (df, lookup_tables)),
+        ('block_encoding', add_block_encoding, (df, lookup_tables)),
+    ]
+    if live_congestion is not None:
+        steps.append(('live', add_live_congestion, (df, *live_congestion)))
+    steps += [
+        ('container', add_container_features, (df,)),
+        ('interaction', add_static_interactions, (df,)),
+        ('congestion_interaction', add_congestion_interactions, (df,)),
+    ]
+
+    for name, func, args in steps:
+        if stages is not None and name in SERVING_STAGES and name not in stages:
+            continue
+        if timings is None:
+            func(*args)
+            continue
+        started = time.perf_counter()
+        func(*args)
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+    return df
+
+
+def encode_categoricals(df, label_encoders, log=print, telemetry=None):
+    """
+    Label encode fitur kategori (nilai asing -> classes_[0]).
+    telemetry: LookupTelemetry opsional, mencatat nilai per kolom dan fallback.
+    """
+    for col in CATEGORICAL_FEATURES:
+        if col in df.columns and col in label_encoders:
+            le = label_encoders[col]
+            try:
+                values = df[col].astype(str)
+                unknown_mask = ~values.isin(le.classes_)
+                if telemetry is not None:
+                    for value, unknown in zip(values.tolist(), unknown_mask.tolist()):
+                        telemetry.record('encoders', col, value, not unknown)
+                unknown_count = int(unknown_mask.sum())
+                if unknown_count > 0:
+                    log(f"Warning {col}: {unknown_count} unseen values replaced with {le.classes_[0]}")
+                    values = values.where(~unknown_mask, le.classes_[0])
+                df[col] = le.transform(values)
+            except Exception as e:
+                log(f"Warning: Could not encode {col}: {e}")
+                df[col] = 0
+    return df
+
+
+def finalize_features(df, label_encoders, features_list, log=print, telemetry=None):
+    """Label encoding + urutkan kolom sesuai features_list training."""
+    encode_categoricals(df, label_encoders, log=log, telemetry=telemetry)
+    return df[features_list].fillna(0)
+
+
+# ============================================================================
+# PIPELINE TRAINING
+# ============================================================================
+
+def build_training_features(raw_df, target_col=TARGET_COL):
+    """
+    Dataset fitur training dari data bersih (kolom SLOT, ROW, TIER, STACK,
+    GATE_IN, JOB_TYPE, CONTAINER_SIZE, CTR_STATUS, CONTAINER_TYPE, target).
+
+    Returns:
+        DataFrame: MODEL_FEATURES + target_col
+    """
+    df = pd.DataFrame({
+        'slot': raw_df['SLOT'], 'row': raw_df['ROW'],
+        'tier': raw_df['TIER'], 'block': raw_df['STACK'],
+        'JOB_TYPE': raw_df['JOB_TYPE'], 'CONTAINER_SIZE': raw_df['CONTAINER_SIZE'],
+        'CTR_STATUS': raw_df['CTR_STATUS'], 'CONTAINER_TYPE': raw_df['CONTAINER_TYPE'],
+        'GATE_IN': pd.to_datetime(raw_df['GATE_IN'], errors='coerce'),
+        target_col: raw_df[target_col],
+    })
+
+    add_location_features(df)
+    df = df.sort_values(['LOKASI', 'GATE_IN'], kind='stable').reset_index(drop=True)
+    add_time_features(df, df['GATE_IN'])
+    add_container_features(df)
+    add_training_aggregates(df, target_col)
+    add_interaction_features(df)
+    return df[MODEL_FEATURES + [target_col]]
+
+
+def filter_training_target(raw_df, target_col=TARGET_COL):
+    """Filter sama dengan notebook EDA: target valid + outlier Q5-Q99."""
+    raw_df = raw_df[raw_df[target_col].notna() & (raw_df[target_col] >= 0)]
+    q05, q99 = raw_df[target_col].quantile([0.05, 0.99])
+    return raw_df[(raw_df[target_col] >= q05) & (raw_df[target_col] <= q99)]
+
+
+# ============================================================================
+# CLI: CEK PARITY & BUILD DATASET
+# ============================================================================
+
+def _load_serving_artifacts(model_dir):
+    import joblib
+    from calendar_features import build_calendar_table
+    from lookup_store import has_lookup_store, load_lookup_store
+
+    store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(store_dir):
+        lookup_tables = load_lookup_store(store_dir)
+    else:
+        lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
+    features_list = joblib.load(os.path.join(model_dir, 'features_list_2_bulan.pkl'))
+    return lookup_tables, build_calendar_table(lookup_tables), features_list
+
+
+def _infer_gate_in(dataset):
+    """
+    Dataset fitur tidak menyimpan timestamp: rekonstruksi tanggal dari
+    (bulan, tanggal, hari dalam minggu) dengan tahun terbaru yang cocok.
+    """
+    years = range(date.today().year, date.today().year - 15, -1)
+    cache = {}
+
+    def resolve(month, day, dayofweek, hour):
+        key = (month, day, dayofweek)
+        if key not in cache:
+            cache[key] = None
+            for year in years:
+                try:
+                    candidate = date(year, month, day)
+                except ValueError:
+                    continue
+                if candidate.weekday() == dayofweek:
+                    cache[key] = candidate
+                    break
+        found = cache[key]
+        if found is None:
+            return None
+        return datetime(found.year, found.month, found.day, hour)
+
+    return [
+        resolve(int(m), int(d), int(w), int(h))
+        for m, d, w, h in zip(dataset['gate_in_month'], dataset['gate_in_day'],
+                              dataset['gate_in_dayofweek'], dataset['gate_in_hour'])
+    ]
+
+
+def serving_input_from_dataset(dataset):
+    """Input mentah serving (kolom build_serving_frame) dari baris dataset fitur."""
+    return pd.DataFrame({
+        'JOB_TYPE': dataset['JOB_TYPE'].astype(str).to_numpy(),
+        'CONTAINER_SIZE': dataset['CONTAINER_SIZE'].astype(str).to_numpy(),
+        'CTR_STATUS': dataset['CTR_STATUS'].astype(str).to_numpy(),
+        'CONTAINER_TYPE': dataset['CONTAINER_TYPE'].astype(str).to_numpy(),
+        'slot': dataset['slot'].to_numpy(), 'tier': dataset['tier'].to_numpy(),
+        'block': dataset['block'].to_numpy(), 'row': dataset['row_numeric'].to_numpy(),
+        'gate_in_time': _infer_gate_in(dataset),
+    })
+
+
+def check_parity(dataset_path, model_dir='models', rows=None, tolerance=1e-6):
+    """
+    Bandingkan fitur serving (lookup tables) dengan kolom dataset training.
+
+    Returns:
+        int: 0 jika semua fitur (kecuali LAG_FEATURES) identik, 1 jika tidak
+    """
+    lookup_tables, calendar_table, features_list = _load_serving_artifacts(model_dir)
+    dataset = pd.read_csv(dataset_path, nrows=rows)
+    print(f"Dataset: {dataset_path} ({len(dataset):,} rows)")
+
+    frame = build_serving_frame(serving_input_from_dataset(dataset), lookup_tables, calendar_table)
+
+    failed = []
+    print(f"\n{'feature':32s} {'mismatch':>10s} {'max_abs_diff':>14s}")
+    for col in features_list:
+        if col in CATEGORICAL_FEATURES:
+            expected = clean_categorical(dataset[col])
+            mismatch = (frame[col].astype(str) != expected).to_numpy()
+            max_diff = float('nan')
+        else:
+            expected = pd.to_numeric(dataset[col], errors='coerce').to_numpy(dtype=np.float64)
+            actual = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64)
+            diff = np.abs(actual - expected)
+            mismatch = ~np.isclose(actual, expected, rtol=tolerance, atol=tolerance, equal_nan=True)
+            max_diff = float(np.nanmax(diff)) if len(diff) else 0.0
+
+        rate = float(mismatch.mean()) if len(mismatch) else 0.0
+        note = ''
+        if rate > 0:
+            if col in LAG_FEATURES:
+                note = '(expected: lag history differs by design)'
+            else:
+                failed.append(col)
+                note = '<-- MISMATCH'
+        print(f"{col:32s} {rate:>9.2%} {max_diff:>14.6f} {note}")
+
+    if failed:
+        print(f"\n[FAIL] {len(failed)} feature(s) differ from training: {', '.join(failed)}")
+        return 1
+    print(f"\n[OK] Serving features match training dataset ({len(features_list)} features)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Shared feature pipeline tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    check = sub.add_parser('check', help='Parity fitur serving vs dataset training')
+    check.add_argument('dataset', help='CSV dataset fitur training (45 fitur + target)')
+    check.add_argument('--model-dir', default='models')
+    check.add_argument('--rows', type=int, default=None, help='Batasi jumlah baris')
+
+    build = sub.add_parser('build', help='Bangun dataset fitur training dari data bersih')
+    build.add_argument('raw_dataset', help='CSV data bersih (output notebook cleaning) atau direktori clean_raw_data.py')
+    build.add_argument('output', help='CSV output')
+
+    args = parser.parse_args(argv)
+    if args.command == 'check':
+        return check_parity(args.dataset, model_dir=args.model_dir, rows=args.rows)
+
+    from clean_raw_data import read_clean_dataset
+    raw_df = filter_training_target(read_clean_dataset(args.raw_dataset))
+    features = build_training_features(raw_df).dropna()
+    features.to_csv(args.output, index=False)
+    print(f"[OK] {len(features):,} rows x {len(MODEL_FEATURES)} features -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,532 @@
+"""
+FEATURE PRUNING (COST vs AKURASI)
+=================================
+Ukur biaya serving per fitur dan kontribusinya ke akurasi, latih ulang kandidat
+feature set yang lebih kecil, lalu laporkan frontier Pareto MAE vs p99 latency:
+
+  1. cost        : waktu per tahap build_serving_frame (request satu truk, seperti
+                   GATE_IN_DATA) dari sampel dataset; fitur mewarisi biaya tahap
+                   yang menghasilkannya (dibagi rata antar fitur di tahap itu)
+  2. importance  : model baseline (semua fitur features_list) dilatih ulang pada
+                   split cache train_pipeline.py, lalu permutation importance
+                   (kenaikan MAE di test split) + gain importance base model
+  3. candidates  : buang fitur dengan importance <= --min-importance, lalu buang
+                   tahap serving opsional (SERVING_STAGES) satu per satu, mulai
+                   dari importance per mikrodetik terendah
+  4. evaluate    : tiap kandidat dilatih ulang (--model), MAE di test split dan
+                   p50/p99 end-to-end (fitur + model.predict) per request
+  5. report      : JSON + tabel; kandidat terpilih = p99 terendah dengan MAE
+                   <= MAE baseline x (1 + --mae-tolerance)
+
+Kandidat terpilih bisa disimpan sebagai versi artefak (--save, format sama dengan
+train_pipeline.py) dan diaktifkan dengan --promote: App.py membaca
+features_list_2_bulan.pkl yang lebih pendek dan melewati tahap lookup yang
+tidak dipakai (feature_pipeline.serving_stages). Bangun ulang prediction cube
+setelah promote.
+
+Catatan:
+  - Latency diukur tanpa kepadatan live (ARTG_LIVE_CONGESTION_WEIGHT): tahap
+    'live' hanya ikut jika congestion_count / hourly_volume dipertahankan
+  - Fitur dari tahap 'location' / 'calendar' / input tidak menghemat latency
+    jika dibuang (tahap tetap jalan), hanya menyederhanakan model
+
+Usage:
+    python feature_pruning.py Data/processed/dataset_final2bulan_45FEATURES_PROPER.csv \\
+        [--model lgbm] [--requests 500] [--mae-tolerance 0.01] [--save] [--promote]
+    python feature_pruning.py Data/processed/gate_history --clean-input --model stacking --save
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import (
+    FEATURE_VERSION, MODEL_FEATURES, SERVING_STAGES, build_serving_frame, finalize_features,
+    serving_input_from_dataset, serving_stages,
+)
+from train_pipeline import (
+    BASE_MODELS, ENCODERS_FILE, FEATURES_FILE, METADATA_FILE, MODEL_FILE, MODEL_NAMES, RANDOM_STATE,
+    StageTimer, build_estimator, load_split, prepare_matrix, promote, regression_report,
+)
+
+# Tahap yang bisa dibuang kandidat ('live' tidak diukur, ikut congestion)
+PRUNABLE_STAGES = tuple(name for name in SERVING_STAGES if name != 'live')
+WARMUP_REQUESTS = 20
+
+INPUT_FEATURES = ('JOB_TYPE', 'CONTAINER_SIZE', 'CTR_STATUS', 'CONTAINER_TYPE')
+LOCATION_FEATURES = (
+    'slot', 'tier', 'block', 'slot_numeric', 'row_numeric', 'tier_numeric', 'block_numeric',
+    'distance_from_gate', 'vertical_distance',
+)
+
+
+def quiet(*_args, **_kwargs):
+    pass
+
+
+# ============================================================================
+# SAMPEL REQUEST SERVING
+# ============================================================================
+
+def sample_requests(dataset_path, clean_input, n):
+    """List dict input satu truk (kolom build_serving_frame) dari sampel dataset."""
+    if clean_input:
+        from clean_raw_data import read_clean_dataset
+        raw = read_clean_dataset(dataset_path)
+        raw = raw.sample(min(n, len(raw)), random_state=RANDOM_STATE)
+        frame = pd.DataFrame({
+            'JOB_TYPE': raw['JOB_TYPE'].astype(str).to_numpy(),
+            'CONTAINER_SIZE': raw['CONTAINER_SIZE'].astype(str).to_numpy(),
+            'CTR_STATUS': raw['CTR_STATUS'].astype(str).to_numpy(),
+            'CONTAINER_TYPE': raw['CONTAINER_TYPE'].astype(str).to_numpy(),
+            'slot': raw['SLOT'].to_numpy(), 'row': raw['ROW'].to_numpy(),
+            'tier': raw['TIER'].to_numpy(), 'block': raw['STACK'].to_numpy(),
+            'gate_in_time': pd.to_datetime(raw['GATE_IN'], errors='coerce').to_numpy(),
+        })
+    else:
+        dataset = pd.read_csv(dataset_path, usecols=[
+            'JOB_TYPE', 'CONTAINER_SIZE', 'CTR_STATUS', 'CONTAINER_TYPE', 'slot', 'tier', 'block',
+            'row_numeric', 'gate_in_month', 'gate_in_day', 'gate_in_dayofweek', 'gate_in_hour',
+        ])
+        frame = serving_input_from_dataset(dataset.sample(min(n, len(dataset)), random_state=RANDOM_STATE))
+    return frame.to_dict('records')
+
+
+def load_serving_tables(model_dir):
+    from calendar_features import build_calendar_table
+    from lookup_store import has_lookup_store, load_lookup_store
+
+    store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(store_dir):
+        lookup_tables = load_lookup_store(store_dir)
+    else:
+        lookup_tables = joblib.load(os.path.join(model_dir, 'lookup_tables_2bulan.pkl'))
+    return lookup_tables, build_calendar_table(lookup_tables)
+
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q) * 1000) if len(values) else 0.0
+
+
+# ============================================================================
+# BIAYA SERVING PER TAHAP / FITUR
+# ============================================================================
+
+def feature_stage(feature):
+    """Tahap build_serving_frame yang menghasilkan fitur ('live' tidak dihitung)."""
+    for name in PRUNABLE_STAGES:
+        if feature in SERVING_STAGES[name][0]:
+            return name
+    if feature in INPUT_FEATURES:
+        return 'input'
+    return 'location' if feature in LOCATION_FEATURES else 'calendar'
+
+
+def measure_stage_costs(requests, lookup_tables, calendar_table):
+    """
+    Waktu per tahap untuk request satu truk.
+
+    Returns:
+        dict: tahap -> {'mean_us', 'p99_us'}
+    """
+    samples = {}
+    for index, request in enumerate(requests):
+        timings = {}
+        build_serving_frame(request, lookup_tables, calendar_table, timings=timings)
+        if index < WARMUP_REQUESTS:
+            continue
+        for name, seconds in timings.items():
+            samples.setdefault(name, []).append(seconds)
+    return {
+        name: {
+            'mean_us': round(float(np.mean(values)) * 1e6, 1),
+            'p99_us': round(float(np.percentile(values, 99)) * 1e6, 1),
+        }
+        for name, values in samples.items()
+    }
+
+
+def feature_costs(features, stage_costs):
+    """Biaya per fitur: biaya tahap dibagi jumlah fitur model di tahap itu."""
+    stage_of = {feature: feature_stage(feature) for feature in features}
+    shared = {}
+    for stage in stage_of.values():
+        shared[stage] = shared.get(stage, 0) + 1
+    costs = {}
+    for feature, stage in stage_of.items():
+        # Lokasi + kalender selalu jalan: biaya dicatat tapi tidak bisa dihemat
+        stage_us = stage_costs.get(stage, {}).get('mean_us', 0.0)
+        costs[feature] = {
+            'stage': stage,
+            'stage_us': stage_us,
+            'attributed_us': round(stage_us / shared[stage], 1),
+            'skippable': stage in PRUNABLE_STAGES,
+        }
+    return costs
+
+
+def measure_latency(requests, lookup_tables, calendar_table, label_encoders, model, features):
+    """p50/p99 (ms) fitur saja dan end-to-end (fitur + predict) untuk feature set."""
+    stages = serving_stages(features)
+    feature_times, total_times = [], []
+    for index, request in enumerate(requests):
+        started = time.perf_counter()
+        df = build_serving_frame(request, lookup_tables, calendar_table, stages=stages)
+        X = finalize_features(df, label_encoders, features, log=quiet)
+        built = time.perf_counter()
+        model.predict(X)
+        finished = time.perf_counter()
+        if index >= WARMUP_REQUESTS:
+            feature_times.append(built - started)
+            total_times.append(finished - started)
+    return {
+        'features_p50_ms': round(percentile_ms(feature_times, 50), 3),
+        'features_p99_ms': round(percentile_ms(feature_times, 99), 3),
+        'p50_ms': round(percentile_ms(total_times, 50), 3),
+        'p99_ms': round(percentile_ms(total_times, 99), 3),
+        'stages': sorted(stages),
+    }
+
+
+# ============================================================================
+# TRAINING KANDIDAT & IMPORTANCE
+# ============================================================================
+
+def load_tuned_params(model_dir):
+    """Hyperparameter hasil train_pipeline.py (metadata), {} jika tidak ada."""
+    path = os.path.join(model_dir, METADATA_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('hyperparameters') or {}
+
+
+def fit_candidate(model_name, params, split, features, jobs):
+    """Latih model pada kolom `features` dari split cache (DataFrame berkolom nama fitur)."""
+    X_train, y_train, X_test, y_test = split
+    columns = [MODEL_FEATURES.index(feature) for feature in features]
+    X_train = pd.DataFrame(X_train[:, columns], columns=features)
+    X_test = pd.DataFrame(X_test[:, columns], columns=features)
+    threads = max(1, os.cpu_count() or 1)
+
+    if model_name != 'stacking':
+        model, fit_kwargs = build_estimator(model_name, params.get(model_name, {}), threads)
+        model.fit(X_train, y_train, **fit_kwargs(X_test, y_test))
+    else:
+        from sklearn.ensemble import StackingRegressor
+        from sklearn.linear_model import Ridge
+        model = StackingRegressor(
+            estimators=[(name, build_estimator(name, params.get(name, {}), 1)[0]) for name in BASE_MODELS],
+            final_estimator=Ridge(alpha=1.0), cv=3, n_jobs=jobs,
+        )
+        model.fit(X_train, y_train)
+    return model, X_test
+
+
+def permutation_importance_mae(model, X_test, y_test, rows, repeats):
+    """Kenaikan MAE rata-rata saat satu kolom diacak (per fitur)."""
+    rng = np.random.default_rng(RANDOM_STATE)
+    if len(X_test) > rows:
+        picked = np.sort(rng.choice(len(X_test), rows, replace=False))
+        X_test, y_test = X_test.iloc[picked].reset_index(drop=True), y_test[picked]
+    base_mae = float(np.mean(np.abs(y_test - model.predict(X_test))))
+    importance = {}
+    for feature in X_test.columns:
+        original = X_test[feature].to_numpy().copy()
+        increases = []
+        for _ in range(repeats):
+            X_test[feature] = rng.permutation(original)
+            increases.append(float(np.mean(np.abs(y_test - model.predict(X_test)))) - base_mae)
+        X_test[feature] = original
+        importance[feature] = round(float(np.mean(increases)), 6)
+    return importance
+
+
+def gain_importance(model, features):
+    """Rata-rata feature_importances_ (dinormalisasi) dari base model, None jika tidak ada."""
+    estimators = getattr(model, 'estimators_', None) or [model]
+    shares = []
+    for estimator in estimators:
+        values = getattr(estimator, 'feature_importances_', None)
+        if values is None or len(values) != len(features) or float(np.sum(values)) <= 0:
+            continue
+        shares.append(np.asarray(values, dtype=np.float64) / float(np.sum(values)))
+    if not shares:
+        return None
+    return {feature: round(float(value), 6) for feature, value in zip(features, np.mean(shares, axis=0))}
+
+
+# ============================================================================
+# KANDIDAT & PARETO
+# ============================================================================
+
+def stage_dependents(stage):
+    """`stage` + tahap yang membutuhkannya (transitif, tanpa 'live')."""
+    dropped = {stage}
+    changed = True
+    while changed:
+        changed = False
+        for name in PRUNABLE_STAGES:
+            if name not in dropped and dropped.intersection(SERVING_STAGES[name][1]):
+                dropped.add(name)
+                changed = True
+    return dropped
+
+
+def drop_stage(features, stage):
+    """Feature set tanpa fitur dari tahap `stage` dan tahap yang bergantung padanya."""
+    dropped = stage_dependents(stage)
+    return [f for f in features if feature_stage(f) not in dropped]
+
+
+def candidate_sets(features, importance, stage_costs, min_importance):
+    """
+    Kandidat bersarang: baseline, tanpa fitur importance rendah, lalu buang tahap
+    serving satu per satu (importance per mikrodetik terendah dulu).
+
+    Returns:
+        list: (nama kandidat, list fitur)
+    """
+    candidates = [('baseline', list(features))]
+    current = [f for f in features if importance.get(f, 0.0) > min_importance]
+    if len(current) < len(features):
+        candidates.append(('low_importance', current))
+
+    removed = []
+    while True:
+        scores = []
+        for stage in PRUNABLE_STAGES:
+            if stage not in serving_stages(current):
+                continue
+            dropped = set(current) - set(drop_stage(current, stage))
+            gain = sum(max(importance.get(f, 0.0), 0.0) for f in dropped)
+            cost_us = max(stage_costs.get(stage, {}).get('mean_us', 0.0), 1e-3)
+            scores.append((gain / cost_us, stage))
+        if not scores:
+            break
+        _, stage = min(scores)
+        current = drop_stage(current, stage)
+        removed.append(stage)
+        if not current:
+            break
+        candidates.append(('-' + '-'.join(removed), current))
+    return candidates
+
+
+def pareto_front(results):
+    """Nama kandidat yang tidak didominasi (MAE dan p99 lebih kecil = lebih baik)."""
+    front = set()
+    for a in results:
+        dominated = any(
+            b['MAE'] <= a['MAE'] and b['p99_ms'] <= a['p99_ms']
+            and (b['MAE'] < a['MAE'] or b['p99_ms'] < a['p99_ms'])
+            for b in results
+        )
+        if not dominated:
+            front.add(a['name'])
+    return front
+
+
+def choose_candidate(results, tolerance):
+    """p99 terendah dengan MAE <= MAE baseline x (1 + tolerance); seri -> fitur lebih sedikit."""
+    limit = results[0]['MAE'] * (1 + tolerance)
+    eligible = [r for r in results if r['MAE'] <= limit and r['pareto']]
+    return min(eligible, key=lambda r: (r['p99_ms'], r['features_count']))
+
+
+# ============================================================================
+# ARTEFAK
+# ============================================================================
+
+def save_pruned(out_dir, chosen, model, label_encoders, report, args):
+    """Tulis versi artefak (nama file sama dengan train_pipeline.py) untuk kandidat terpilih."""
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-pruned{chosen['features_count']}"
+    run_dir = os.path.join(out_dir, 'versions', version)
+    os.makedirs(run_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(run_dir, MODEL_FILE))
+    joblib.dump(label_encoders, os.path.join(run_dir, ENCODERS_FILE))
+    joblib.dump(list(chosen['features']), os.path.join(run_dir, FEATURES_FILE))
+
+    performance = {k: chosen[k] for k in ('MAE', 'RMSE', 'R2', 'within_5min_pct', 'within_10min_pct')}
+    metadata = {
+        'version': version,
+        'model_name': MODEL_NAMES.get(args.model, args.model),
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'feature_version': FEATURE_VERSION,
+        'features_count': chosen['features_count'],
+        'features_list': list(chosen['features']),
+        'performance': performance,
+        'hyperparameters': report['hyperparameters'],
+        'pruning': {
+            'candidate': chosen['name'],
+            'baseline_MAE': report['candidates'][0]['MAE'],
+            'baseline_p99_ms': report['candidates'][0]['p99_ms'],
+            'p99_ms': chosen['p99_ms'],
+            'serving_stages': chosen['stages'],
+            'mae_tolerance': args.mae_tolerance,
+        },
+        'data_info': report['data_info'],
+    }
+    with open(os.path.join(run_dir, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=4, default=str)
+    return version, run_dir
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def print_feature_table(features, costs, importance, gain):
+    print(f"\n{'feature':30s} {'stage':24s} {'cost_us':>9s} {'skip':>5s} {'perm_dMAE':>10s} {'gain':>7s}")
+    for feature in sorted(features, key=lambda f: importance.get(f, 0.0)):
+        cost = costs[feature]
+        gain_value = f"{gain[feature]:.3f}" if gain else '-'
+        print(f"{feature:30s} {cost['stage']:24s} {cost['attributed_us']:>9.1f} "
+              f"{'yes' if cost['skippable'] else 'no':>5s} {importance[feature]:>10.4f} {gain_value:>7s}")
+
+
+def print_candidates(results):
+    print(f"\n{'candidate':48s} {'feat':>5s} {'MAE':>8s} {'feat_p99':>9s} {'p99_ms':>8s}  pareto")
+    for r in results:
+        marker = '*' if r['pareto'] else ''
+        chosen = '  <- chosen' if r.get('chosen') else ''
+        print(f"{r['name'][:48]:48s} {r['features_count']:>5d} {r['MAE']:>8.4f} "
+              f"{r['features_p99_ms']:>9.3f} {r['p99_ms']:>8.3f}  {marker}{chosen}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Feature cost/accuracy pruning report')
+    parser.add_argument('dataset', help='CSV dataset fitur (45 fitur + GATE_IN_STACK)')
+    parser.add_argument('--clean-input', action='store_true',
+                        help='Dataset adalah data bersih (CSV atau direktori partisi clean_raw_data.py)')
+    parser.add_argument('--model', default='lgbm', choices=BASE_MODELS + ('stacking',),
+                        help='Model yang dilatih ulang per kandidat')
+    parser.add_argument('--model-dir', default='models',
+                        help='Lookup tables, features_list baseline dan hyperparameter (metadata)')
+    parser.add_argument('--requests', type=int, default=500, help='Jumlah request untuk ukur latency')
+    parser.add_argument('--importance-rows', type=int, default=5000)
+    parser.add_argument('--repeats', type=int, default=3, help='Pengulangan permutation importance')
+    parser.add_argument('--min-importance', type=float, default=0.0,
+                        help='Fitur dengan kenaikan MAE <= nilai ini dibuang di kandidat low_importance')
+    parser.add_argument('--mae-tolerance', type=float, default=0.01,
+                        help='Kenaikan MAE relatif maksimum untuk kandidat terpilih')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache-dir', default=os.path.join('models', 'feature_cache'))
+    parser.add_argument('--rebuild-cache', action='store_true')
+    parser.add_argument('--lokasi-blend', type=float, default=0.3)
+    parser.add_argument('--report', default=None, help='Path laporan JSON (default: models/pruning/<waktu>.json)')
+    parser.add_argument('--save', action='store_true',
+                        help='Simpan kandidat terpilih sebagai versi artefak di <model-dir>/versions/')
+    parser.add_argument('--promote', action='store_true', help='--save lalu salin ke --model-dir')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timer = StageTimer()
+
+    print("=" * 80)
+    print("ARTG FEATURE PRUNING")
+    print("=" * 80)
+
+    cache_dir, label_encoders, cache_info = prepare_matrix(args, timer)
+    split = load_split(cache_dir)
+    features_path = os.path.join(args.model_dir, FEATURES_FILE)
+    baseline = list(joblib.load(features_path)) if os.path.exists(features_path) else list(MODEL_FEATURES)
+    params = load_tuned_params(args.model_dir)
+    lookup_tables, calendar_table = load_serving_tables(args.model_dir)
+
+    with timer.stage('cost'):
+        requests = sample_requests(args.dataset, args.clean_input, args.requests + WARMUP_REQUESTS)
+        stage_costs = measure_stage_costs(requests, lookup_tables, calendar_table)
+        costs = feature_costs(baseline, stage_costs)
+        for name, cost in stage_costs.items():
+            print(f"   {name:24s} mean {cost['mean_us']:8.1f} us | p99 {cost['p99_us']:8.1f} us")
+
+    with timer.stage('importance'):
+        baseline_fit = fit_candidate(args.model, params, split, baseline, args.jobs)
+        importance = permutation_importance_mae(
+            baseline_fit[0], baseline_fit[1].copy(), np.asarray(split[3]),
+            args.importance_rows, args.repeats,
+        )
+        gain = gain_importance(baseline_fit[0], baseline)
+    print_feature_table(baseline, costs, importance, gain)
+
+    results, models = [], {}
+    with timer.stage('candidates'):
+        for name, features in candidate_sets(baseline, importance, stage_costs, args.min_importance):
+            started = time.perf_counter()
+            if name == 'baseline':
+                model, X_test = baseline_fit
+            else:
+                model, X_test = fit_candidate(args.model, params, split, features, args.jobs)
+            result = {'name': name, 'features_count': len(features), 'features': features}
+            result.update(regression_report(np.asarray(split[3]), model.predict(X_test)))
+            result.update(measure_latency(requests, lookup_tables, calendar_table,
+                                          label_encoders, model, features))
+            result['fit_seconds'] = round(time.perf_counter() - started, 2)
+            results.append(result)
+            models[name] = model
+            print(f"   {name[:40]:40s} {len(features):>3d} features | MAE {result['MAE']:.4f} "
+                  f"| p99 {result['p99_ms']:.3f} ms")
+
+    front = pareto_front(results)
+    for result in results:
+        result['pareto'] = result['name'] in front
+    chosen = choose_candidate(results, args.mae_tolerance)
+    chosen['chosen'] = True
+    print_candidates(results)
+
+    report = {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'model': args.model,
+        'hyperparameters': params,
+        'baseline_features': baseline,
+        'stage_costs': stage_costs,
+        'feature_costs': costs,
+        'permutation_importance': importance,
+        'gain_importance': gain,
+        'candidates': results,
+        'chosen': chosen['name'],
+        'mae_tolerance': args.mae_tolerance,
+        'data_info': {
+            'dataset': os.path.abspath(args.dataset),
+            'clean_input': args.clean_input,
+            'lokasi_blend': args.lokasi_blend,
+            'cache_key': cache_info['key'],
+            'requests': len(requests) - WARMUP_REQUESTS,
+        },
+        'stage_seconds': timer.seconds,
+    }
+    report_path = args.report or os.path.join(
+        args.model_dir, 'pruning', f"{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4, default=str)
+
+    print("\n" + "=" * 80)
+    print(f"Chosen: {chosen['name']} | {chosen['features_count']} features | MAE {chosen['MAE']:.4f} "
+          f"| p99 {chosen['p99_ms']:.3f} ms (baseline {results[0]['p99_ms']:.3f} ms)")
+    print(f"[OK] Report -> {report_path}")
+    if args.save or args.promote:
+        version, run_dir = save_pruned(args.model_dir, chosen, models[chosen['name']],
+                                       label_encoders, report, args)
+        if args.promote:
+            promote(run_dir, args.model_dir)
+            print(f"[OK] Promoted {version} -> {args.model_dir}/ (rebuild prediction cube before restart)")
+        else:
+            print(f"[OK] Artifacts in {run_dir} (use --promote to activate)")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
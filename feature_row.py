@@ -0,0 +1,227 @@
+"""
+FEATURE ROW (jalur cepat satu truk)
+===================================
+Versi skalar build_serving_frame + finalize_features untuk SATU truk: fitur
+ditulis langsung ke buffer float64 (1, len(features_list)) yang dialokasikan
+sekali per thread, lalu dipakai sebagai input model.predict tanpa DataFrame.
+
+  - Tabel lookup, kode label encoder, kode shift per jam dan posisi kolom
+    dikompilasi sekali di __init__
+  - Per prediksi tidak ada DataFrame/Series, .apply, .copy(), fillna atau
+    pass diagnostik; hanya objek skalar sementara (string key, float)
+  - Semantik sama dengan feature_pipeline (nilai asing -> classes_[0], NaN -> 0,
+    tahap SERVING_STAGES yang tidak dipakai features_list dilewati)
+  - Buffer dipakai ulang oleh prediksi berikutnya di thread yang sama: salin
+    (.copy()) jika X perlu hidup lebih lama (mis. refinement ensemble)
+  - Telemetri miss (lookup_telemetry.py): lookup_tables hasil
+    LookupTelemetry.instrument + argumen telemetry untuk fallback encoder
+
+Batch (cube, demo, optimizer) tetap memakai build_serving_frame.
+
+Parity + alokasi per prediksi (tracemalloc):
+    python benchmark_feature_row.py --model-dir models
+"""
+
+import math
+import re
+import threading
+
+import numpy as np
+
+from calendar_features import FLOAT_TIME_FEATURES, INT_TIME_FEATURES, calculate_shift, parse_gate_in_time
+from feature_pipeline import (
+    CATEGORICAL_FEATURES, DEFAULT_CONGESTION, DEFAULT_SLOT_MAX, DEFAULT_SLOT_MIN,
+    DEFAULT_SLOT_STD, MODEL_FEATURES, NON_SPECIAL_CONTAINER_TYPES, clean_categorical_value,
+)
+
+# Posisi tiap fitur di buffer kerja (urutan MODEL_FEATURES)
+FEATURE_INDEX = {name: i for i, name in enumerate(MODEL_FEATURES)}
+
+DIGITS = re.compile(r'(\d+)')
+REEFER_MARKERS = ('RF', 'REEFER', 'RH')
+
+
+def to_int_value(value):
+    """Versi skalar feature_pipeline.to_int (nilai non-numerik -> 0)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if math.isfinite(number) else 0
+
+
+def first_int(text, default):
+    """Angka pertama di string (regex (\\d+) seperti str.extract), default jika tidak ada."""
+    match = DIGITS.search(text)
+    return int(match.group(1)) if match else default
+
+
+class FeatureRowBuilder:
+    """Fitur satu truk ke buffer prealokasi, urut features_list."""
+
+    def __init__(self, lookup_tables, calendar_table, label_encoders, features_list, stages=None,
+                 telemetry=None):
+        unknown = [f for f in features_list if f not in FEATURE_INDEX]
+        if unknown:
+            raise ValueError(f"Unsupported features for single-row path: {unknown}")
+        missing = [f for f in features_list if f in CATEGORICAL_FEATURES and f not in label_encoders]
+        if missing:
+            raise ValueError(f"No label encoder for categorical features: {missing}")
+
+        self.calendar_table = calendar_table
+        self.features_list = list(features_list)
+        self.stages = stages
+
+        self.overall_avg = lookup_tables['overall_avg']
+        self.congestion_table = lookup_tables['congestion_by_hour_slot']
+        self.slot_avg = lookup_tables['slot_historical_avg']
+        self.tier_avg = lookup_tables['tier_historical_avg']
+        self.lokasi_avg = lookup_tables['lokasi_historical_avg']
+        self.slot_std = lookup_tables['slot_duration_std']
+        self.slot_min = lookup_tables['slot_duration_min']
+        self.slot_max = lookup_tables['slot_duration_max']
+        self.location_history = lookup_tables['location_history']
+        self.block_enc = lookup_tables['BLOCK_target_enc']
+
+        # Kode label encoder (classes_ terurut, nilai asing -> kode 0 = classes_[0])
+        self.codes = {
+            col: {str(value): code for code, value in enumerate(label_encoders[col].classes_)}
+            for col in CATEGORICAL_FEATURES if col in label_encoders
+        }
+        shift_codes = self.codes.get('gate_in_shift', {})
+        self.shift_code_by_hour = [float(shift_codes.get(calculate_shift(h), 0)) for h in range(24)]
+        if telemetry is not None:
+            # Nilai asing (fallback classes_[0]) dicatat per kolom; shift selalu dikenal
+            self.codes = {
+                col: telemetry.track(col, col_codes, group='encoders')
+                for col, col_codes in self.codes.items()
+            }
+
+        self.int_time_index = [FEATURE_INDEX[name] for name in INT_TIME_FEATURES]
+        self.float_time_index = [FEATURE_INDEX[name] for name in FLOAT_TIME_FEATURES]
+        # Gather buffer kerja -> urutan features_list
+        self.take_index = np.array([FEATURE_INDEX[f] for f in self.features_list], dtype=np.intp)
+        self.local = threading.local()
+
+    def _run(self, stage):
+        return self.stages is None or stage in self.stages
+
+    def _buffers(self):
+        local = self.local
+        if not hasattr(local, 'row'):
+            local.work = np.zeros(len(MODEL_FEATURES), dtype=np.float64)
+            local.row = np.zeros((1, len(self.features_list)), dtype=np.float64)
+            local.nan_mask = np.zeros(len(self.features_list), dtype=bool)
+        return local.work, local.row, local.nan_mask
+
+    def fill(self, feature_input, live_congestion=None):
+        """
+        Fitur satu truk (dict TruckRecord.to_feature_input) ke buffer thread ini.
+
+        live_congestion: None, atau (slot_congestion, hourly_volume, weight)
+        seperti build_serving_frame.
+
+        Returns:
+            np.ndarray: buffer (1, len(features_list)) float64, dipakai ulang
+        """
+        work, row, nan_mask = self._buffers()
+        index = FEATURE_INDEX
+        codes = self.codes
+
+        # Lokasi (add_location_features)
+        slot = clean_categorical_value(feature_input['slot'])
+        tier = clean_categorical_value(feature_input['tier'])
+        block = clean_categorical_value(feature_input['block'])
+        raw_row = feature_input.get('row')
+        row_numeric = 0 if raw_row is None else to_int_value(clean_categorical_value(raw_row))
+        lokasi = f'{slot} {row_numeric} {tier}'
+        slot_numeric = to_int_value(slot)
+        tier_numeric = to_int_value(tier)
+
+        work[index['slot_numeric']] = slot_numeric
+        work[index['row_numeric']] = row_numeric
+        work[index['tier_numeric']] = tier_numeric
+        work[index['block_numeric']] = first_int(block, 0)
+        work[index['distance_from_gate']] = slot_numeric * 10 + row_numeric * 2 + tier_numeric * 3
+        work[index['vertical_distance']] = tier_numeric ** 2
+
+        # Waktu (add_calendar_features)
+        raw_time = feature_input.get('gate_in_time', feature_input.get('gate_in'))
+        int_values, float_values = self.calendar_table.row(parse_gate_in_time(raw_time))
+        for i, value in zip(self.int_time_index, int_values):
+            work[i] = value
+        for i, value in zip(self.float_time_index, float_values):
+            work[i] = value
+        hour = int(int_values[0])
+        work[index['gate_in_shift']] = self.shift_code_by_hour[hour]
+
+        # Lookup tables
+        if self._run('congestion'):
+            work[index['congestion_count']] = self.congestion_table.get(f'{hour}_{slot}', DEFAULT_CONGESTION)
+        if self._run('historical'):
+            work[index['slot_historical_avg']] = self.slot_avg.get(slot, self.overall_avg)
+            work[index['tier_historical_avg']] = self.tier_avg.get(tier, self.overall_avg)
+            lokasi_avg = self.lokasi_avg.get(lokasi, self.overall_avg)
+            work[index['lokasi_historical_avg']] = lokasi_avg
+            work[index['LOKASI_target_enc']] = lokasi_avg
+        if self._run('slot_stats'):
+            work[index['slot_duration_std']] = self.slot_std.get(slot, DEFAULT_SLOT_STD)
+            work[index['slot_duration_min']] = self.slot_min.get(slot, DEFAULT_SLOT_MIN)
+            work[index['slot_duration_max']] = self.slot_max.get(slot, DEFAULT_SLOT_MAX)
+        if self._run('location_history'):
+            history = self.location_history.get(lokasi, None)
+            last = history['last_duration'] if history else math.nan
+            rolling = history['rolling_mean_3'] if history else math.nan
+            lokasi_avg = work[index['lokasi_historical_avg']]
+            work[index['prev_duration_same_location']] = lokasi_avg if math.isnan(last) else last
+            work[index['rolling_mean_3']] = lokasi_avg if math.isnan(rolling) else rolling
+        if self._run('block_encoding'):
+            work[index['BLOCK_target_enc']] = self.block_enc.get(block, self.overall_avg)
+
+        if live_congestion is not None and self._run('live'):
+            slot_congestion, hourly_volume, weight = live_congestion
+            if self._run('congestion'):
+                i = index['congestion_count']
+                work[i] = (1 - weight) * work[i] + weight * slot_congestion.get(slot, 0.0)
+            i = index['hourly_volume']
+            work[i] = (1 - weight) * work[i] + weight * hourly_volume
+
+        # Kontainer (add_container_features)
+        container_size = str(feature_input['CONTAINER_SIZE'])
+        ctr_status = feature_input['CTR_STATUS']
+        container_size_numeric = first_int(container_size, 20)
+        if self._run('container'):
+            container_type = str(feature_input['CONTAINER_TYPE']).strip().upper()
+            work[index['container_size_numeric']] = container_size_numeric
+            work[index['is_empty']] = ctr_status == 'MTY'
+            work[index['is_full']] = ctr_status == 'FCL'
+            work[index['is_reefer']] = any(m in container_type for m in REEFER_MARKERS)
+            work[index['is_special']] = container_type not in NON_SPECIAL_CONTAINER_TYPES
+        if self._run('interaction'):
+            work[index['slot_tier_interaction']] = slot_numeric * tier_numeric
+            work[index['size_tier_interaction']] = container_size_numeric * tier_numeric
+        if self._run('congestion_interaction'):
+            congestion = work[index['congestion_count']]
+            work[index['congestion_tier']] = congestion * tier_numeric
+            work[index['rush_hour_congestion']] = work[index['is_rush_hour']] * congestion
+
+        # Label encoding (encode_categoricals)
+        for col, value in (('JOB_TYPE', feature_input['JOB_TYPE']),
+                           ('CONTAINER_SIZE', container_size),
+                           ('CTR_STATUS', ctr_status),
+                           ('CONTAINER_TYPE', feature_input['CONTAINER_TYPE']),
+                           ('slot', slot), ('tier', tier), ('block', block)):
+            col_codes = codes.get(col)
+            if col_codes is not None:
+                work[index[col]] = col_codes.get(str(value), 0)
+
+        # Urutan features_list + fillna(0), tanpa alokasi array baru
+        out = row[0]
+        np.take(work, self.take_index, out=out)
+        np.isnan(out, out=nan_mask)
+        np.copyto(out, 0.0, where=nan_mask)
+        return row
@@ -0,0 +1,195 @@
+"""
+GATE FEED SUBSCRIBER
+====================
+Satu klien Socket.IO di backend untuk feed GATE_IN server eksternal,
+menggantikan relay GATE_IN -> GATE_IN_DATA dari setiap tab dashboard:
+
+  - Reconnect otomatis tanpa batas (backoff reconnect_delay .. reconnect_delay_max
+    detik), termasuk jika koneksi pertama gagal
+  - Setiap (re)connect mengirim REQUEST_INITIAL_STATE {eventNames: [...]} seperti
+    dashboard, sehingga event yang terlewat selama putus diterima lagi (resume)
+  - Payload batch {eventName, data: [...], rowCount, timestamp} atau satu truk
+  - Replay state awal tidak memicu prediksi ulang: key (truck_id, gate_in_time)
+    yang sudah diterima diingat (LRU berbatas seen_size, jauh lebih lama dari
+    TTL cache dedup App.py); truk tanpa gate_in_time di-key per truck_id
+  - Setiap truk baru diteruskan ke handler(payload) (App.py: normalizer +
+    antrian ingest, sama dengan GATE_IN_DATA). Key baru diingat setelah handler
+    menerima truk; handler mengembalikan False jika truk tidak diterima (antrian
+    ingest penuh) dan forget() dipanggil untuk truk yang dibuang dari antrian,
+    sehingga replay setelah reconnect meneruskannya lagi
+
+Butuh klien python-socketio (requests + websocket-client).
+
+Metrics: gate_feed_connects, gate_feed_disconnects, gate_feed_connect_errors,
+gate_feed_batches, gate_feed_rows, gate_feed_replayed, gate_feed_not_admitted,
+gate_feed_forgotten, gauge gate_feed_connected.
+
+Uji lokal dengan feed tiruan:
+    python gate_feed_server.py --port 5055 --rate 5
+    ARTG_GATE_FEED_URL=http://localhost:5055 python App.py
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from payload_normalizer import FIELD_ALIASES
+from service_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INITIAL_STATE_EVENT = 'REQUEST_INITIAL_STATE'
+
+
+def first_value(payload, aliases):
+    for alias in aliases:
+        value = payload.get(alias)
+        if value:
+            return str(value).strip()
+    return None
+
+
+def feed_key(payload):
+    """(truck_id, gate_in_time) dengan alias yang sama dengan payload_normalizer; None jika tanpa ID."""
+    truck_id = first_value(payload, FIELD_ALIASES['truck_id'])
+    if truck_id is None:
+        return None
+    return truck_id, first_value(payload, FIELD_ALIASES['gate_in_time'])
+
+
+class GateFeedSubscriber:
+    """Klien Socket.IO background untuk event GATE_IN server eksternal."""
+
+    def __init__(self, url, handler, event_names=('GATE_IN',), seen_size=50_000,
+                 reconnect_delay=1.0, reconnect_delay_max=30.0, query='dashboard=true'):
+        self.url = url
+        self.handler = handler
+        self.event_names = tuple(event_names)
+        self.seen_size = seen_size
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_delay_max = reconnect_delay_max
+        # Server eksternal mengenali klien dashboard dari query string
+        self.connect_url = f"{url}{'&' if '?' in url else '?'}{query}" if query else url
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+        self.client = None
+        self.connected = False
+        self.last_batch_at = None
+        self.thread = None
+        self.stopped = threading.Event()
+        metrics.register_gauge('gate_feed_connected', lambda: int(self.connected))
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='gate-feed', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.client is not None:
+            self.client.disconnect()
+
+    # ------------------------------------------------------------------
+    # Koneksi
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        import socketio
+
+        # Reconnect bawaan klien dimatikan: loop ini satu-satunya yang menyambung
+        # ulang, dengan klien baru per percobaan (reconnect bawaan tidak berlaku
+        # jika koneksi pertama gagal dan bisa balapan dengan connect() di bawah)
+        delay = self.reconnect_delay
+        while not self.stopped.is_set():
+            self.client = socketio.Client(reconnection=False)
+            self.client.on('connect', self._on_connect)
+            self.client.on('disconnect', self._on_disconnect)
+            for name in self.event_names:
+                self.client.on(name, self._on_event)
+            try:
+                self.client.connect(self.connect_url, transports=['websocket'])
+            except Exception as e:
+                metrics.inc('gate_feed_connect_errors')
+                logger.warning(f"Gate feed connect to {self.url} failed: {e} (retry in {delay:g}s)")
+                self.stopped.wait(delay)
+                delay = min(delay * 2, self.reconnect_delay_max)
+                continue
+            delay = self.reconnect_delay
+            self.client.wait()
+            self.client.disconnect()
+            self.stopped.wait(delay)
+
+    def _on_connect(self):
+        self.connected = True
+        metrics.inc('gate_feed_connects')
+        logger.info(f"Gate feed connected: {self.url} (requesting initial state {list(self.event_names)})")
+        self.client.emit(INITIAL_STATE_EVENT, {'eventNames': list(self.event_names)})
+
+    def _on_disconnect(self, *_args):
+        self.connected = False
+        metrics.inc('gate_feed_disconnects')
+        logger.warning(f"Gate feed disconnected: {self.url}")
+
+    # ------------------------------------------------------------------
+    # Event
+    # ------------------------------------------------------------------
+
+    def _on_event(self, data):
+        # Batch {eventName, data: [...], rowCount, timestamp} atau satu truk
+        if isinstance(data, dict) and isinstance(data.get('data'), list):
+            rows = data['data']
+        elif isinstance(data, dict) and isinstance(data.get('data'), dict):
+            rows = [data['data']]
+        else:
+            rows = [data]
+        metrics.inc('gate_feed_batches')
+        self.last_batch_at = time.time()
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            key = feed_key(row)
+            if key is not None and self._replayed(key):
+                continue
+            metrics.inc('gate_feed_rows')
+            try:
+                admitted = self.handler(row)
+            except Exception as e:
+                logger.error(f"Gate feed handler error: {e}", exc_info=True)
+                continue
+            if admitted is False:
+                # Tidak diingat: replay berikutnya mencoba lagi
+                metrics.inc('gate_feed_not_admitted')
+            elif key is not None:
+                self._remember(key)
+
+    def _replayed(self, key):
+        with self.lock:
+            if key in self.seen:
+                self.seen.move_to_end(key)
+                metrics.inc('gate_feed_replayed')
+                return True
+        return False
+
+    def _remember(self, key):
+        with self.lock:
+            self.seen[key] = None
+            if len(self.seen) > self.seen_size:
+                self.seen.popitem(last=False)
+
+    def forget(self, truck_id, gate_in_time=None):
+        """Lupakan truk yang sudah diterima lalu dibuang (mis. drop_oldest antrian ingest)."""
+        with self.lock:
+            removed = self.seen.pop((truck_id, gate_in_time), False) is None
+            removed |= self.seen.pop((truck_id, None), False) is None
+        if removed:
+            metrics.inc('gate_feed_forgotten')
+
+    def status(self):
+        return {
+            'url': self.url,
+            'connected': self.connected,
+            'events': list(self.event_names),
+            'seen': len(self.seen),
+            'last_batch_at': self.last_batch_at,
+        }
@@ -0,0 +1,165 @@
+"""
+GATE FEED SERVER (TIRUAN)
+=========================
+Pengganti lokal server WebSocket eksternal (10.130.0.176) untuk uji
+gate_feed.py dan dashboard, dengan protokol yang sama:
+
+  - REQUEST_INITIAL_STATE {eventNames: ['GATE_IN']} -> satu batch GATE_IN ke
+    peminta berisi --history event terakhir
+  - Broadcast batch {eventName, data: [...], rowCount, timestamp} setiap
+    --batch / --rate detik; field mentah seperti feed asli (TRUCK_ID,
+    GATE_IN_TIME, TO_BLOCK, X, Y, Z, CTR_SIZE, CTR_TYPE, CTR_STATUS, ACTIVITY)
+  - --replay FILE: kirim baris JSONL (satu payload truk per baris) alih-alih
+    truk sintetis
+  - --disconnect-every S: putuskan semua klien tiap S detik (uji reconnect + resume)
+
+Usage:
+    python gate_feed_server.py [--port 5055] [--rate 5] [--batch 5] [--history 200]
+                               [--count 0] [--replay rows.jsonl] [--disconnect-every 0]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import Flask, request
+from flask_socketio import SocketIO, emit
+
+EVENT_NAME = 'GATE_IN'
+
+CY_BLOCK_ROWS = 'ABCDEFG'
+CONTAINER_SIZES = ('20', '40', '45')
+CONTAINER_TYPES = ('DRY', 'DRY', 'DRY', 'RFR', 'O/T', 'FLT')
+CONTAINER_STATUSES = ('FCL', 'MTY')
+ACTIVITIES = ('DELIVERY', 'RECEIVING')
+
+
+def synthetic_rows(seed=None):
+    """Generator payload truk mentah (format feed eksternal)."""
+    rng = random.Random(seed)
+    sequence = 0
+    while True:
+        sequence += 1
+        block = rng.randint(1, 7)
+        if block == 7:
+            to_block, tier = 'D1', 'D1'
+        else:
+            to_block, tier = f'{block}{rng.choice(CY_BLOCK_ROWS)}', str(rng.randint(1, 5))
+        yield {
+            'TRUCK_ID': f'SIM-{sequence:06d}',
+            'CONTAINER_NO': f'SIMU{rng.randint(0, 9_999_999):07d}',
+            'GATE_IN_TIME': datetime.now().isoformat(timespec='seconds'),
+            'TO_BLOCK': to_block,
+            'X': str(rng.randint(1, 40)),
+            'Y': str(rng.randint(1, 6)),
+            'Z': tier,
+            'CTR_SIZE': rng.choice(CONTAINER_SIZES),
+            'CTR_TYPE': rng.choice(CONTAINER_TYPES),
+            'CTR_STATUS': rng.choice(CONTAINER_STATUSES),
+            'ACTIVITY': rng.choice(ACTIVITIES),
+        }
+
+
+def replay_rows(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def batch_event(rows):
+    return {
+        'eventName': EVENT_NAME,
+        'data': list(rows),
+        'rowCount': len(rows),
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def create_server(args):
+    app = Flask(__name__)
+    socketio = SocketIO(app, cors_allowed_origins='*', async_mode='threading')
+    history = deque(maxlen=args.history)
+    history_lock = threading.Lock()
+    clients = set()
+
+    @socketio.on('connect')
+    def handle_connect():
+        clients.add(request.sid)
+        print(f"[feed] client connected {request.sid} ({len(clients)} total)")
+
+    @socketio.on('disconnect')
+    def handle_disconnect(*_args):
+        clients.discard(request.sid)
+        print(f"[feed] client disconnected {request.sid}")
+
+    @socketio.on('REQUEST_INITIAL_STATE')
+    def handle_initial_state(data):
+        names = (data or {}).get('eventNames') or []
+        if EVENT_NAME in names:
+            with history_lock:
+                rows = list(history)
+            emit(EVENT_NAME, batch_event(rows))
+            print(f"[feed] initial state -> {request.sid}: {len(rows)} rows")
+
+    def kick_all():
+        for sid in list(clients):
+            socketio.server.disconnect(sid, namespace='/')
+
+    def publish():
+        rows = replay_rows(args.replay) if args.replay else synthetic_rows(args.seed)
+        interval = args.batch / args.rate if args.rate > 0 else 1.0
+        sent = 0
+        last_kick = time.monotonic()
+        while args.count <= 0 or sent < args.count:
+            socketio.sleep(interval)
+            size = args.batch if args.count <= 0 else min(args.batch, args.count - sent)
+            batch = [row for _, row in zip(range(size), rows)]
+            if not batch:
+                break
+            with history_lock:
+                history.extend(batch)
+            socketio.emit(EVENT_NAME, batch_event(batch))
+            sent += len(batch)
+            if args.disconnect_every > 0 and time.monotonic() - last_kick >= args.disconnect_every:
+                print(f"[feed] disconnecting {len(clients)} client(s) after {sent} rows")
+                kick_all()
+                last_kick = time.monotonic()
+        print(f"[feed] done: {sent} rows published")
+
+    socketio.start_background_task(publish)
+    return app, socketio
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in for the external GATE_IN feed')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--rate', type=float, default=5.0, help='Truk per detik')
+    parser.add_argument('--batch', type=int, default=5, help='Truk per batch GATE_IN')
+    parser.add_argument('--history', type=int, default=200, help='Event untuk REQUEST_INITIAL_STATE')
+    parser.add_argument('--count', type=int, default=0, help='Total truk (0 = tanpa batas)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--replay', default=None, help='File JSONL payload truk')
+    parser.add_argument('--disconnect-every', type=float, default=0.0,
+                        help='Putuskan semua klien tiap N detik (0 = tidak pernah)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app, socketio = create_server(args)
+    print(f"[feed] GATE_IN feed on http://{args.host}:{args.port} | {args.rate:g} trucks/s | "
+          f"batch {args.batch} | history {args.history}")
+    socketio.run(app, host=args.host, port=args.port, allow_unsafe_werkzeug=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
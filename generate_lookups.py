@@ -8,8 +8,14 @@ CRITICAL: Lookup tables HARUS di-generate dari DATASET YANG SAMA dengan yang dip
 
 Input:  Data/processed/dataset_final2bulan_45FEATURES_PROPER.csv
 Output: models/lookup_tables_2bulan.pkl (semua lookup tables dalam 1 file)
+        models/lookup_tables_2bulan/     (format kolom memory-mapped, dipakai App.py)
+
+Opsional: tambahkan truk yang sudah selesai dari arsip App.py (truck_archive.py),
+durasi aktual = waktu remove - waktu gate-in:
+    python generate_lookups.py --archive archive
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import joblib
@@ -17,6 +23,15 @@ from datetime import datetime
 import os
 import sys
 
+from feature_pipeline import build_lokasi, clean_categorical, to_int
+from lookup_store import save_lookup_store
+from truck_archive import completed_lookup_rows, load_archive
+
+parser = argparse.ArgumentParser(description='Generate lookup tables for production')
+parser.add_argument('--archive', default=None,
+                    help='Direktori arsip truk App.py (segmen .npz) untuk ditambahkan ke dataset')
+args = parser.parse_args()
+
 print("="*80)
 print("GENERATE LOOKUP TABLES FOR PRODUCTION")
 print("="*80)
@@ -44,6 +59,17 @@ df = pd.read_csv(dataset_path)
 
 print(f"   ✅ Dataset loaded: {len(df):,} records")
 print(f"   Full path: {os.path.abspath(dataset_path)}")
+
+if args.archive:
+    # Rentang durasi sama dengan dataset training (dataset sudah difilter outlier)
+    archive_rows = completed_lookup_rows(
+        load_archive(args.archive),
+        min_minutes=df['GATE_IN_STACK'].min(),
+        max_minutes=df['GATE_IN_STACK'].max(),
+    )
+    df = pd.concat([df, archive_rows], ignore_index=True)
+    dataset_path = f"{dataset_path} + {args.archive}"
+    print(f"   ✅ Archive rows added: {len(archive_rows):,} completed trucks from {args.archive}")
 print()
 
 # ============================================================================
@@ -51,28 +77,20 @@ print()
 # ============================================================================
 print("2. Preparing location features...")
 
-# Ekstrak versi numerik untuk agregasi
-def clean_categorical_value(value):
-    """Bersihkan nilai kategorikal - sama seperti training"""
-    s = str(value).strip()
-    if s.endswith('.0'):
-        s = s[:-2]
-    return s
-
-# Bersihkan kolom kategorikal
-df['slot'] = df['slot'].apply(clean_categorical_value)
-df['tier'] = df['tier'].apply(clean_categorical_value)
-df['block'] = df['block'].apply(clean_categorical_value)
-df['gate_in_shift'] = df['gate_in_shift'].apply(clean_categorical_value)
+# Pembersihan kategori dan key LOKASI memakai feature_pipeline (sama dengan App.py)
+df['slot'] = clean_categorical(df['slot'])
+df['tier'] = clean_categorical(df['tier'])
+df['block'] = clean_categorical(df['block'])
+df['gate_in_shift'] = clean_categorical(df['gate_in_shift'])
 
 # Versi numerik untuk pengelompokan
-df['slot_numeric'] = pd.to_numeric(df['slot'], errors='coerce').fillna(0).astype(int)
-df['tier_numeric'] = pd.to_numeric(df['tier'], errors='coerce').fillna(0).astype(int)
+df['slot_numeric'] = to_int(df['slot'])
+df['tier_numeric'] = to_int(df['tier'])
 
 # Buat kolom LOKASI (gabungan slot + row + tier)
 # Catatan: Dataset 2 bulan tidak punya kolom ROW terpisah, tapi punya row_numeric
 if 'row_numeric' in df.columns:
-    df['LOKASI'] = df['slot'] + ' ' + df['row_numeric'].astype(str) + ' ' + df['tier']
+    df['LOKASI'] = build_lokasi(df['slot'], df['row_numeric'], df['tier'])
 else:
     # Fallback: gunakan slot dan tier saja
     df['LOKASI'] = df['slot'] + ' ' + df['tier']
@@ -176,16 +194,19 @@ print("7. Generating lag features lookups...")
 # Untuk produksi, kita akan gunakan data historis terbaru per lokasi
 # Kelompokkan berdasarkan LOKASI dan ambil nilai terakhir yang diketahui
 
-# Last 3 durations per location
-location_history = {}
-for lokasi in df['LOKASI'].unique():
-    lokasi_data = df[df['LOKASI'] == lokasi]['GATE_IN_STACK'].tail(3).tolist()
-    if len(lokasi_data) > 0:
-        location_history[lokasi] = {
-            'last_duration': lokasi_data[-1] if len(lokasi_data) >= 1 else lokasi_avg.get(lokasi, overall_avg),
-            'last_3_durations': lokasi_data,
-            'rolling_mean_3': np.mean(lokasi_data) if len(lokasi_data) > 0 else lokasi_avg.get(lokasi, overall_avg)
-        }
+# Last 3 durations per location (satu groupby, urutan kemunculan LOKASI dipertahankan)
+last_3_by_lokasi = df.groupby('LOKASI', sort=False)['GATE_IN_STACK'].apply(
+    lambda s: s.tail(3).tolist()
+)
+location_history = {
+    lokasi: {
+        'last_duration': durations[-1],
+        'last_3_durations': durations,
+        'rolling_mean_3': np.mean(durations)
+    }
+    for lokasi, durations in last_3_by_lokasi.items()
+    if len(durations) > 0
+}
 
 lookup_tables['location_history'] = location_history
 print(f"   ✅ Location history: {len(location_history)} locations")
@@ -229,6 +250,11 @@ joblib.dump(lookup_tables, output_path)
 
 print(f"   ✅ Lookup tables saved to: {output_path}")
 print(f"   Full path: {os.path.abspath(output_path)}")
+
+# Format kolom (key terurut + array value) untuk memory-map di App.py
+store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+save_lookup_store(lookup_tables, store_dir)
+print(f"   ✅ Columnar lookup store saved to: {store_dir}")
 print()
 
 # ============================================================================
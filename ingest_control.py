@@ -0,0 +1,150 @@
+"""
+INGEST CONTROL
+==============
+Admission control untuk event GATE_IN_DATA:
+
+  - Rate limit token bucket per klien (Socket.IO sid): `rate` event/detik,
+    burst `burst`; event yang melebihi langsung ditolak tanpa inferensi
+  - Antrian ingest global berbatas dengan N worker; jika penuh, perilaku
+    ditentukan policy:
+      reject       event baru ditolak (klien menerima PREDICTION_REJECTED)
+      drop_oldest  event tertua di antrian dibuang, event baru masuk
+      coalesce     event untuk truck_id yang masih antri menggantikan yang lama
+                   (tanpa menambah panjang antrian); truk baru saat penuh ditolak
+
+Beban berlebih menjadi penolakan cepat yang terhitung di metrics, bukan
+antrian dan latency yang tumbuh tanpa batas.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from service_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('reject', 'drop_oldest', 'coalesce')
+
+
+class TokenBucket:
+    """Token bucket: isi ulang `rate` token/detik sampai `burst`."""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class ClientRateLimiter:
+    """Token bucket per klien; rate <= 0 = tanpa batas."""
+
+    def __init__(self, rate, burst, max_clients=10_000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    def allow(self, client_id):
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(client_id)
+            if bucket is None:
+                bucket = self.buckets[client_id] = TokenBucket(self.rate, self.burst, now)
+                if len(self.buckets) > self.max_clients:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(client_id)
+            return bucket.take(now)
+
+    def forget(self, client_id):
+        with self.lock:
+            self.buckets.pop(client_id, None)
+
+
+class IngestQueue:
+    """
+    Antrian berbatas + worker thread yang memanggil handler(item).
+
+    offer() tidak pernah memblok; hasilnya salah satu dari
+    'queued', 'coalesced', 'dropped_oldest' (item baru masuk) atau 'rejected'.
+    """
+
+    def __init__(self, handler, capacity=256, policy='reject', workers=4):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown ingest policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.handler = handler
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        self.items = OrderedDict()  # key -> (item, waktu masuk)
+        self.sequence = 0
+        self.cond = threading.Condition()
+        self.threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._run, name=f'ingest-{index}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        metrics.register_gauge('ingest_queue_depth', lambda: len(self.items))
+
+    def offer(self, key, item):
+        """
+        Masukkan item. key dipakai policy coalesce (truck_id); None = selalu entri baru.
+
+        Returns:
+            tuple: (hasil, item yang dibuang/digantikan atau None)
+        """
+        with self.cond:
+            if self.policy == 'coalesce' and key is not None and key in self.items:
+                replaced, queued_at = self.items[key]
+                # Posisi antrian tetap, umur dihitung dari event pertama
+                self.items[key] = (item, queued_at)
+                outcome, displaced = 'coalesced', replaced
+            elif len(self.items) >= self.capacity:
+                if self.policy != 'drop_oldest':
+                    metrics.inc('ingest_rejected_full')
+                    return 'rejected', None
+                _, (displaced, _) = self.items.popitem(last=False)
+                outcome = 'dropped_oldest'
+                self._put(key, item)
+            else:
+                outcome, displaced = 'queued', None
+                self._put(key, item)
+            self.cond.notify()
+        metrics.inc(f'ingest_{outcome}')
+        return outcome, displaced
+
+    def _put(self, key, item):
+        self.sequence += 1
+        if self.policy != 'coalesce' or key is None:
+            key = ('seq', self.sequence)
+        self.items[key] = (item, time.monotonic())
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.items:
+                    self.cond.wait()
+                _, (item, queued_at) = self.items.popitem(last=False)
+            metrics.observe('ingest_wait_ms', (time.monotonic() - queued_at) * 1000)
+            try:
+                self.handler(item)
+            except Exception as e:
+                logger.error(f"Ingest handler error: {e}", exc_info=True)
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,88 @@
+"""
+SYNTHETIC YARD LOAD GENERATOR
+=============================
+Membuat truk sintetis dalam jumlah besar untuk uji kapasitas antrian, statistik
+dan broadcast (endpoint POST /demo/load di App.py).
+
+Nilai diambil dari vocabulary yang dikenal model:
+  - LOKASI "slot row tier" dari lookup tables (lokasi_historical_avg)
+  - kode block dari BLOCK_target_enc (block D1 selalu stack D1)
+  - job type / ukuran / status / tipe kontainer dari label encoder
+"""
+
+import string
+from datetime import datetime
+
+import numpy as np
+
+from payload_normalizer import D1_BLOCK_ID, TruckRecord, parse_block
+
+PLATE_PREFIXES = ('B', 'L', 'W', 'H', 'G', 'E', 'N', 'AG', 'DK')
+PLATE_LETTERS = np.array(list(string.ascii_uppercase))
+
+
+class SyntheticYard:
+    """Sampler truk sintetis dari vocabulary lookup tables + label encoder."""
+
+    def __init__(self, lookup_tables, label_encoders):
+        self.lokasi = np.array(sorted(str(k) for k in lookup_tables['lokasi_historical_avg'].keys()))
+        self.blocks = []
+        for code in sorted(str(k) for k in lookup_tables['BLOCK_target_enc'].keys()):
+            block_id, block_code = parse_block(code)
+            if block_id is not None:
+                self.blocks.append((block_id, block_code))
+
+        self.job_types = np.asarray(label_encoders['JOB_TYPE'].classes_)
+        self.sizes = np.asarray(label_encoders['CONTAINER_SIZE'].classes_)
+        self.statuses = np.asarray(label_encoders['CTR_STATUS'].classes_)
+        self.types = np.asarray(label_encoders['CONTAINER_TYPE'].classes_)
+
+    def _plates(self, rng, count):
+        prefixes = rng.choice(PLATE_PREFIXES, size=count)
+        numbers = rng.integers(1000, 10000, size=count)
+        suffixes = rng.choice(PLATE_LETTERS, size=(count, 2))
+        return [
+            f'{prefix}{number}{a}{b}'
+            for prefix, number, (a, b) in zip(prefixes, numbers, suffixes)
+        ]
+
+    def sample(self, count, seed=None, gate_in_time=None):
+        """
+        Buat `count` TruckRecord acak.
+
+        Returns:
+            list: TruckRecord (siap untuk engineer_features / build_queue_entry)
+        """
+        rng = np.random.default_rng(seed)
+        gate_in_time = gate_in_time or datetime.now().isoformat()
+
+        lokasi = rng.choice(self.lokasi, size=count)
+        block_idx = rng.integers(0, len(self.blocks), size=count)
+        job_types = rng.choice(self.job_types, size=count)
+        sizes = rng.choice(self.sizes, size=count)
+        statuses = rng.choice(self.statuses, size=count)
+        types = rng.choice(self.types, size=count)
+        plates = self._plates(rng, count)
+
+        records = []
+        for i in range(count):
+            slot, row, tier = lokasi[i].split(' ')
+            block_id, block_code = self.blocks[block_idx[i]]
+            # Block D1 hanya menerima stack D1
+            if block_id == D1_BLOCK_ID:
+                tier = 'D1'
+            records.append(TruckRecord(
+                truck_id=plates[i],
+                block_id=block_id,
+                block_code=block_code,
+                slot=slot,
+                row=row,
+                tier=tier,
+                lokasi=f'{slot} {row} {tier}',
+                job_type=str(job_types[i]),
+                container_size=str(sizes[i]),
+                container_type=str(types[i]),
+                ctr_status=str(statuses[i]),
+                gate_in_time=gate_in_time,
+            ))
+        return records
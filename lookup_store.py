@@ -0,0 +1,264 @@
+"""
+COLUMNAR LOOKUP STORE
+=====================
+Format file lookup tables berbasis kolom (pengganti pickle dict bersarang).
+
+Satu direktori berisi:
+  - manifest.json          : daftar tabel, nilai skalar (overall_avg) dan metadata
+  - <tabel>.keys.npy       : key terurut (int64 atau unicode fixed-width)
+  - <tabel>.values.npy     : value float64 sejajar dengan key
+  - location_history.*.npy : last_duration, rolling_mean_3, last_3_durations (n x 3, NaN padding)
+
+Semua file .npy di-memory-map saat load (np.load mmap_mode='r'), sehingga:
+  - load hampir instan (tidak ada unpickle per key),
+  - halaman memori dibagi antar proses worker (page cache OS),
+  - footprint jauh lebih kecil daripada dict Python.
+
+Pencarian nilai memakai binary search (np.searchsorted) di atas key terurut.
+
+Konversi file pickle lama:
+    python lookup_store.py models/lookup_tables_2bulan.pkl models/lookup_tables_2bulan
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+LOCATION_HISTORY_WIDTH = 3
+
+
+def _to_builtin(value):
+    """Ubah skalar numpy menjadi tipe bawaan Python agar bisa ditulis ke JSON."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    return value
+
+
+def _build_key_array(keys):
+    """Bangun array key: int64 jika semua key integer, selain itu unicode."""
+    if all(isinstance(k, (int, np.integer)) and not isinstance(k, bool) for k in keys):
+        return np.asarray(keys, dtype=np.int64)
+    return np.asarray([str(k) for k in keys], dtype=np.str_)
+
+
+class ColumnarLookup:
+    """Lookup read-only key -> float dengan binary search di atas key terurut."""
+
+    __slots__ = ('keys_array', 'values_array', 'is_int_key')
+
+    def __init__(self, keys_array, values_array):
+        self.keys_array = keys_array
+        self.values_array = values_array
+        self.is_int_key = keys_array.dtype.kind == 'i'
+
+    def _index(self, key):
+        """Posisi key di array, atau -1 jika tidak ada."""
+        if self.is_int_key:
+            if isinstance(key, bool) or not isinstance(key, (int, np.integer)):
+                return -1
+        elif not isinstance(key, str):
+            return -1
+
+        n = len(self.keys_array)
+        if n == 0:
+            return -1
+        idx = int(np.searchsorted(self.keys_array, key))
+        if idx < n and self.keys_array[idx] == key:
+            return idx
+        return -1
+
+    def get(self, key, default=None):
+        idx = self._index(key)
+        if idx < 0:
+            return default
+        return self.values_array[idx]
+
+    def __getitem__(self, key):
+        idx = self._index(key)
+        if idx < 0:
+            raise KeyError(key)
+        return self.values_array[idx]
+
+    def __contains__(self, key):
+        return self._index(key) >= 0
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def keys(self):
+        return [k.item() for k in self.keys_array]
+
+    def items(self):
+        return zip(self.keys(), (v.item() for v in self.values_array))
+
+
+class LocationHistoryLookup:
+    """Lookup histori per LOKASI dengan array float lebar tetap."""
+
+    __slots__ = ('index', 'last_duration', 'rolling_mean_3', 'last_3_durations')
+
+    def __init__(self, keys_array, last_duration, rolling_mean_3, last_3_durations):
+        self.index = ColumnarLookup(keys_array, np.arange(len(keys_array)))
+        self.last_duration = last_duration
+        self.rolling_mean_3 = rolling_mean_3
+        self.last_3_durations = last_3_durations
+
+    def _record(self, idx):
+        durations = self.last_3_durations[idx]
+        return {
+            'last_duration': self.last_duration[idx],
+            'last_3_durations': [float(d) for d in durations if not np.isnan(d)],
+            'rolling_mean_3': self.rolling_mean_3[idx],
+        }
+
+    def get(self, key, default=None):
+        idx = self.index._index(key)
+        if idx < 0:
+            return default
+        return self._record(idx)
+
+    def __getitem__(self, key):
+        idx = self.index._index(key)
+        if idx < 0:
+            raise KeyError(key)
+        return self._record(idx)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def items(self):
+        return ((k, self._record(i)) for i, k in enumerate(self.keys()))
+
+
+def save_lookup_store(lookup_tables, out_dir):
+    """
+    Tulis dict lookup_tables (format generate_lookups.py) ke direktori kolom.
+
+    Returns:
+        str: path manifest yang ditulis
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'tables': {},
+        'location_history': None,
+        'scalars': {},
+        'metadata': {},
+    }
+
+    for name, table in lookup_tables.items():
+        if name == 'metadata':
+            manifest['metadata'] = _to_builtin(table)
+            continue
+
+        if name == 'location_history':
+            keys = _build_key_array(list(table.keys()))
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            entries = [table[k.item()] for k in keys]
+
+            last_duration = np.asarray([e['last_duration'] for e in entries], dtype=np.float64)
+            rolling_mean_3 = np.asarray([e['rolling_mean_3'] for e in entries], dtype=np.float64)
+            last_3 = np.full((len(entries), LOCATION_HISTORY_WIDTH), np.nan, dtype=np.float64)
+            for i, e in enumerate(entries):
+                recent = list(e.get('last_3_durations', []))[-LOCATION_HISTORY_WIDTH:]
+                last_3[i, :len(recent)] = recent
+
+            np.save(os.path.join(out_dir, 'location_history.keys.npy'), keys)
+            np.save(os.path.join(out_dir, 'location_history.last_duration.npy'), last_duration)
+            np.save(os.path.join(out_dir, 'location_history.rolling_mean_3.npy'), rolling_mean_3)
+            np.save(os.path.join(out_dir, 'location_history.last_3_durations.npy'), last_3)
+            manifest['location_history'] = {'entries': len(entries)}
+            continue
+
+        if isinstance(table, dict):
+            keys = _build_key_array(list(table.keys()))
+            values = np.asarray([table[k] for k in table.keys()], dtype=np.float64)
+            order = np.argsort(keys, kind='stable')
+            np.save(os.path.join(out_dir, f'{name}.keys.npy'), keys[order])
+            np.save(os.path.join(out_dir, f'{name}.values.npy'), values[order])
+            manifest['tables'][name] = {
+                'entries': int(len(keys)),
+                'key_dtype': keys.dtype.str,
+            }
+        else:
+            manifest['scalars'][name] = _to_builtin(table)
+
+    # Manifest ditulis terakhir: direktori tanpa manifest dianggap belum lengkap
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def has_lookup_store(store_dir):
+    """True jika direktori berisi lookup store yang lengkap."""
+    return os.path.exists(os.path.join(store_dir, MANIFEST_FILE))
+
+
+def load_lookup_store(store_dir, mmap=True):
+    """
+    Muat lookup store kolom dengan memory-map.
+
+    Hasilnya dict dengan struktur sama seperti pickle lama: tiap tabel
+    mendukung .get(key, default), sehingga engineer_features tidak perlu diubah.
+    """
+    with open(os.path.join(store_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported lookup store version: {manifest.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+
+    def load_array(filename):
+        return np.load(os.path.join(store_dir, filename), mmap_mode=mmap_mode)
+
+    lookup_tables = {}
+    for name in manifest['tables']:
+        lookup_tables[name] = ColumnarLookup(
+            load_array(f'{name}.keys.npy'),
+            load_array(f'{name}.values.npy'),
+        )
+
+    if manifest.get('location_history') is not None:
+        lookup_tables['location_history'] = LocationHistoryLookup(
+            load_array('location_history.keys.npy'),
+            load_array('location_history.last_duration.npy'),
+            load_array('location_history.rolling_mean_3.npy'),
+            load_array('location_history.last_3_durations.npy'),
+        )
+
+    lookup_tables.update(manifest['scalars'])
+    lookup_tables['metadata'] = manifest['metadata']
+    return lookup_tables
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python lookup_store.py <lookup_tables.pkl> <output_dir>")
+        sys.exit(1)
+
+    import joblib
+
+    pkl_path, out_dir = sys.argv[1], sys.argv[2]
+    tables = joblib.load(pkl_path)
+    manifest_path = save_lookup_store(tables, out_dir)
+    print(f"[OK] Lookup store written: {os.path.abspath(manifest_path)}")
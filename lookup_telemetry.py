@@ -0,0 +1,270 @@
+"""
+LOOKUP TELEMETRY
+================
+Hitung seberapa sering traffic produksi jatuh di luar lookup tables dan label
+encoder (nilai default / classes_[0] dipakai diam-diam), untuk menentukan
+ukuran cache dan kapan lookup tables perlu dibangun ulang:
+
+  - Per lookup table: jumlah lookup, miss, miss rate, top-K key yang miss
+  - Per kolom encoder: jumlah nilai, fallback ke classes_[0], top-K nilai asing
+  - Warm set per ruang key (hour_slot, slot, tier, lokasi, block): key yang
+    paling sering dicari + coverage (porsi lookup yang dilayani N key teratas
+    -> ukuran cache yang cukup)
+
+Top-K memakai sketch Space-Saving (Metwally dkk.) dengan memori tetap k key dan
+update O(1): count tiap key adalah batas atas, count - error batas bawah.
+
+Jalur lookup tidak pernah mengambil lock (aman di dalam run_cpu, lihat
+async_runtime.py): counter int di-increment langsung (cukup akurat untuk
+telemetri), key miss dan sampel warm set (1 dari `warm_sample` lookup) hanya
+di-append ke buffer deque. Sketch diperbarui oleh drain() di sisi pemanggil
+setelah run_cpu kembali, dan oleh snapshot().
+
+Tabel dibungkus TrackedLookup (.get dengan semantik sama dengan dict), sehingga
+feature_row.py dan build_serving_frame tidak perlu tahu soal telemetri.
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+
+# Lookup tables yang fallback-nya ke default (feature_pipeline / feature_row)
+TRACKED_TABLES = (
+    'congestion_by_hour_slot', 'slot_historical_avg', 'tier_historical_avg',
+    'lokasi_historical_avg', 'slot_duration_std', 'slot_duration_min',
+    'slot_duration_max', 'location_history', 'BLOCK_target_enc',
+)
+
+# Warm set per ruang key, dicatat dari satu tabel per ruang key (tabel lain
+# dengan key sama, mis. slot_duration_*, tidak menambah informasi)
+WARM_SETS = {
+    'congestion_by_hour_slot': 'hour_slot',
+    'slot_historical_avg': 'slot',
+    'tier_historical_avg': 'tier',
+    'lokasi_historical_avg': 'lokasi',
+    'BLOCK_target_enc': 'block',
+}
+
+# Nama field laporan per grup: (total, miss, rate, top key miss)
+REPORT_FIELDS = {
+    'lookups': ('lookups', 'misses', 'miss_rate', 'top_missing'),
+    'encoders': ('values', 'fallbacks', 'fallback_rate', 'top_unseen'),
+}
+
+MISSING = object()
+
+# Batas buffer key yang belum di-drain (yang tertua dibuang, counter tetap akurat)
+PENDING_MAX = 65536
+
+
+class SpaceSaving:
+    """Sketch top-K Space-Saving (Stream-Summary, increment satuan O(1))."""
+
+    __slots__ = ('k', 'counts', 'errors', 'buckets', 'min_count')
+
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        # count -> key dengan count tersebut (dict sebagai ordered set)
+        self.buckets = {}
+        self.min_count = 0
+
+    def _move(self, key, old, new):
+        bucket = self.buckets[old]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[old]
+            if old == self.min_count:
+                self.min_count = new
+        self.buckets.setdefault(new, {})[key] = None
+        self.counts[key] = new
+
+    def offer(self, key):
+        if self.k <= 0:
+            return
+        count = self.counts.get(key)
+        if count is not None:
+            self._move(key, count, count + 1)
+            return
+        if len(self.counts) < self.k:
+            self.counts[key] = 1
+            self.errors[key] = 0
+            self.buckets.setdefault(1, {})[key] = None
+            self.min_count = 1
+            return
+        # Ganti key dengan count terkecil; key baru mewarisi count itu sebagai error
+        victim = next(iter(self.buckets[self.min_count]))
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.buckets[floor][key] = None
+        del self.buckets[floor][victim]
+        self.counts[key] = floor
+        self.errors[key] = floor
+        self._move(key, floor, floor + 1)
+
+    def top(self, n=None):
+        """[(key, count, error)] urut count menurun."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        if n is not None:
+            items = items[:n]
+        return [(key, count, self.errors[key]) for key, count in items]
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class LookupStats:
+    """Counter dan sketch satu lookup table / kolom encoder."""
+
+    __slots__ = ('lookups', 'misses', 'missing', 'warm', 'warm_offered')
+
+    def __init__(self, top_k, warm_k):
+        self.lookups = 0
+        self.misses = 0
+        self.missing = SpaceSaving(top_k)
+        self.warm = SpaceSaving(warm_k) if warm_k > 0 else None
+        self.warm_offered = 0
+
+
+class TrackedLookup:
+    """Bungkus lookup table: .get mencatat hit/miss ke LookupStats tabel tersebut."""
+
+    __slots__ = ('table', 'stats', 'telemetry')
+
+    def __init__(self, table, stats, telemetry):
+        self.table = table
+        self.stats = stats
+        self.telemetry = telemetry
+
+    def get(self, key, default=None):
+        stats = self.stats
+        stats.lookups += 1
+        if stats.warm is not None and not stats.lookups % self.telemetry.warm_sample:
+            self.telemetry.offer_warm(stats, key)
+        value = self.table.get(key, MISSING)
+        if value is MISSING:
+            self.telemetry.record_miss(stats, key)
+            return default
+        return value
+
+    def __getitem__(self, key):
+        return self.table[key]
+
+    def __contains__(self, key):
+        return key in self.table
+
+    def __len__(self):
+        return len(self.table)
+
+
+class LookupTelemetry:
+    """Counter lookup/encoder + sketch top-K key miss dan warm set per ruang key."""
+
+    def __init__(self, top_k=200, warm_k=1000, warm_sample=10):
+        self.top_k = top_k
+        self.warm_k = warm_k
+        self.warm_sample = max(1, warm_sample)
+        self.lock = threading.Lock()
+        self.stats = {'lookups': {}, 'encoders': {}}
+        # (sketch, key) yang menunggu drain(); append/popleft deque thread-safe
+        self.pending = deque(maxlen=PENDING_MAX)
+        self.since = datetime.now().isoformat()
+
+    def _stats(self, group, name):
+        stats = self.stats[group].get(name)
+        if stats is None:
+            # Warm set hanya dari satu tabel per ruang key; setdefault atomik, tanpa lock
+            warm_k = self.warm_k if group == 'lookups' and name in WARM_SETS else 0
+            stats = self.stats[group].setdefault(name, LookupStats(self.top_k, warm_k))
+        return stats
+
+    def reset(self):
+        """Nolkan semua counter dan sketch (TrackedLookup yang ada tetap dipakai)."""
+        with self.lock:
+            self.pending.clear()
+            for group in self.stats.values():
+                for stats in group.values():
+                    stats.__init__(self.top_k, self.warm_k if stats.warm is not None else 0)
+            self.since = datetime.now().isoformat()
+
+    def track(self, name, table, group='lookups'):
+        return TrackedLookup(table, self._stats(group, name), self)
+
+    def instrument(self, lookup_tables, names=TRACKED_TABLES):
+        """Salinan dangkal lookup_tables dengan tabel `names` dibungkus TrackedLookup."""
+        tables = dict(lookup_tables)
+        for name in names:
+            if name in tables:
+                tables[name] = self.track(name, tables[name])
+        return tables
+
+    def record(self, group, name, key, hit):
+        """Catat satu lookup tanpa TrackedLookup (mis. encode_categoricals)."""
+        stats = self._stats(group, name)
+        stats.lookups += 1
+        if not hit:
+            self.record_miss(stats, key)
+
+    def record_miss(self, stats, key):
+        stats.misses += 1
+        self.pending.append((stats.missing, key))
+
+    def offer_warm(self, stats, key):
+        stats.warm_offered += 1
+        self.pending.append((stats.warm, key))
+
+    def drain(self):
+        """Masukkan key yang menunggu ke sketch (panggil di luar run_cpu)."""
+        pending = self.pending
+        if not pending:
+            return
+        with self.lock:
+            while True:
+                try:
+                    sketch, key = pending.popleft()
+                except IndexError:
+                    break
+                sketch.offer(key)
+
+    @staticmethod
+    def _top(sketch, n):
+        return [{'key': str(key), 'count': count, 'error': error} for key, count, error in sketch.top(n)]
+
+    def _warm_report(self, stats, top):
+        ranked = stats.warm.top()
+        coverage = {}
+        for n in (10, 100, self.warm_k):
+            # Batas bawah porsi lookup (tersampel) yang dilayani n key teratas
+            served = sum(count - error for _, count, error in ranked[:n])
+            coverage[f'top_{n}'] = round(served / stats.warm_offered, 4) if stats.warm_offered else None
+        return {
+            'sampled_lookups': stats.warm_offered,
+            'tracked_keys': len(stats.warm),
+            'coverage': coverage,
+            'top': self._top(stats.warm, top),
+        }
+
+    def snapshot(self, top=20):
+        """Laporan untuk GET /admin/lookup_telemetry."""
+        self.drain()
+        with self.lock:
+            report = {
+                'since': self.since, 'top_k': self.top_k,
+                'warm_k': self.warm_k, 'warm_sample': self.warm_sample,
+            }
+            for group, (total_field, miss_field, rate_field, top_field) in REPORT_FIELDS.items():
+                report[group] = {
+                    name: {
+                        total_field: stats.lookups,
+                        miss_field: stats.misses,
+                        rate_field: round(stats.misses / stats.lookups, 4) if stats.lookups else None,
+                        top_field: self._top(stats.missing, top),
+                    }
+                    for name, stats in sorted(self.stats[group].items())
+                }
+            report['warm_sets'] = {
+                space: self._warm_report(self.stats['lookups'][name], top)
+                for name, space in WARM_SETS.items() if name in self.stats['lookups']
+            }
+        return report
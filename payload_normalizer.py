@@ -0,0 +1,227 @@
+"""
+PAYLOAD NORMALIZER
+==================
+Normalisasi payload truk dari semua entry point (REST add_truck, demo populate,
+WebSocket GATE_IN_DATA) menjadi satu record bertipe (TruckRecord).
+
+Tabel alias (FIELD_ALIASES) dikompilasi sekali saat startup menjadi daftar
+(field, alias) sehingga biaya parsing per payload tetap dan bisa di-batch.
+"""
+
+from datetime import datetime
+from typing import NamedTuple
+
+# Alias field per payload, urutan = prioritas (alias pertama yang terisi dipakai)
+FIELD_ALIASES = {
+    'truck_id': ('truck_id', 'TRUCK_ID'),
+    'gate_in_time': ('GATE_IN_TIME', 'gate_in_time', 'gate_in'),
+    'to_block': ('to_block', 'TO_BLOCK'),
+    'block': ('block', 'BLOCK'),
+    'lokasi': ('lokasi', 'LOKASI'),
+    'slot': ('X', 'slot', 'SLOT'),
+    'row': ('Y', 'row', 'ROW'),
+    'tier': ('Z', 'tier', 'TIER'),
+    'container_size': ('CTR_SIZE', 'container_size', 'CONTAINER_SIZE'),
+    'container_type': ('CTR_TYPE', 'container_type', 'CONTAINER_TYPE'),
+    'ctr_status': ('CTR_STATUS', 'ctr_status'),
+    'activity': ('activity', 'ACTIVITY'),
+    'job_type': ('job_type', 'JOB_TYPE'),
+}
+
+# Nilai default jika field kosong
+FIELD_DEFAULTS = {
+    'truck_id': 'UNKNOWN',
+    'slot': '1',
+    'row': '1',
+    'tier': '1',
+    'container_size': '40',
+    'container_type': 'DRY',
+    'ctr_status': 'FCL',
+    'job_type': 'DELIVERY',
+}
+
+# Default per entry point (perilaku lama sebelum normalizer disatukan):
+# REST add_truck / predict_duration memakai CTR_STATUS 'FULL', WebSocket
+# GATE_IN_DATA memakai 'FCL' dan JOB_TYPE 'IMPORT' jika activity kosong
+REST_DEFAULTS = {**FIELD_DEFAULTS, 'ctr_status': 'FULL'}
+SOCKET_DEFAULTS = {**FIELD_DEFAULTS, 'job_type': 'IMPORT'}
+
+DEFAULT_BLOCK_ID = 1
+DEFAULT_BLOCK_CODE = '1G'
+D1_BLOCK_ID = 7
+
+
+class TruckRecord(NamedTuple):
+    """Record truk ternormalisasi (semua nilai kategori sudah di-strip)."""
+    truck_id: str
+    block_id: int
+    block_code: str
+    slot: str
+    row: str
+    tier: str
+    lokasi: str
+    job_type: str
+    container_size: str
+    container_type: str
+    ctr_status: str
+    gate_in_time: str
+
+    def to_feature_input(self):
+        """Bentuk input untuk engineer_features (nama kolom sesuai training)."""
+        return {
+            'JOB_TYPE': self.job_type,
+            'CONTAINER_SIZE': self.container_size,
+            'CTR_STATUS': self.ctr_status,
+            'CONTAINER_TYPE': self.container_type,
+            'slot': self.slot,
+            'tier': self.tier,
+            'block': self.block_code,
+            'row': self.row,
+            'gate_in_time': self.gate_in_time,
+        }
+
+
+def parse_block(raw_block):
+    """
+    Parsing kode blok tujuan.
+
+    Returns:
+        tuple: (block_id atau None, kode blok asli yang sudah di-strip atau None)
+        Contoh: "5A" -> (5, "5A"), "D1" -> (7, "D1"), "3" -> (3, "3")
+    """
+    if raw_block is None:
+        return None, None
+    code = str(raw_block).strip()
+    if not code:
+        return None, None
+    if code.upper().startswith('D'):
+        return D1_BLOCK_ID, code
+    if code[0].isdigit():
+        return int(code[0]), code
+    return None, code
+
+
+class PayloadNormalizer:
+    """Normalizer hasil kompilasi tabel alias (lihat compile_normalizer)."""
+
+    def __init__(self, compiled_aliases, stack_validator=None):
+        self._compiled = compiled_aliases
+        self._stack_validator = stack_validator
+
+    def _extract(self, data):
+        """Ambil nilai mentah tiap field dari alias pertama yang terisi."""
+        raw = {}
+        for field, aliases in self._compiled:
+            value = None
+            for alias in aliases:
+                candidate = data.get(alias)
+                if candidate:
+                    value = candidate
+                    break
+            raw[field] = value
+        return raw
+
+    def normalize(self, data, block_id=None, required=(), defaults=FIELD_DEFAULTS):
+        """
+        Normalisasi satu payload.
+
+        Args:
+            data: payload mentah (dict)
+            block_id: block ID tujuan jika sudah diketahui (mis. dari URL REST)
+            required: field yang wajib ada di payload
+            defaults: nilai default field kosong (REST_DEFAULTS / SOCKET_DEFAULTS)
+
+        Returns:
+            tuple: (record: TruckRecord atau None, error_message: str)
+            Jika validasi stack gagal, record tetap dikembalikan bersama pesan error.
+        """
+        if not isinstance(data, dict):
+            return None, 'Invalid payload (expected JSON object)'
+
+        raw = self._extract(data)
+
+        for field in required:
+            if raw.get(field) is None:
+                return None, f'Missing required field: {field}'
+
+        def text(field):
+            value = raw[field]
+            if value is None:
+                return defaults[field]
+            return str(value).strip()
+
+        # Lokasi "slot row tier" diutamakan, fallback ke field slot/row/tier terpisah
+        if raw['lokasi'] is not None:
+            lokasi = str(raw['lokasi']).strip()
+            lokasi_parts = lokasi.split()
+            if len(lokasi_parts) != 3:
+                return None, 'Invalid lokasi format (expected: "slot row tier")'
+            slot, row, tier = lokasi_parts
+        else:
+            slot, row, tier = text('slot'), text('row'), text('tier')
+            lokasi = f'{slot} {row} {tier}'
+
+        # Blok: TO_BLOCK lebih spesifik daripada field block
+        parsed_block_id, block_code = parse_block(raw['to_block'])
+        if parsed_block_id is None:
+            parsed_block_id, block_code = parse_block(raw['block'])
+
+        if block_id is None:
+            block_id = DEFAULT_BLOCK_ID if parsed_block_id is None else parsed_block_id
+        block_id = int(block_id)
+
+        # Untuk D1 selalu pakai "D1"; untuk CY gunakan kode asli (mis. 1G/2C)
+        if block_id == D1_BLOCK_ID:
+            block_code = 'D1'
+        block_code = block_code or DEFAULT_BLOCK_CODE
+
+        # Aktivitas / tipe pekerjaan
+        job_type = raw['job_type']
+        if job_type is None and raw['activity'] is not None:
+            activity = str(raw['activity']).strip().upper()
+            job_type = 'EXPORT' if activity == 'DELIVERY' else 'IMPORT'
+
+        gate_in_time = raw['gate_in_time'] or datetime.now().isoformat()
+
+        record = TruckRecord(
+            truck_id=text('truck_id'),
+            block_id=block_id,
+            block_code=block_code,
+            slot=slot,
+            row=row,
+            tier=tier,
+            lokasi=lokasi,
+            job_type=str(job_type).strip() if job_type is not None else defaults['job_type'],
+            container_size=text('container_size'),
+            container_type=text('container_type'),
+            ctr_status=text('ctr_status'),
+            gate_in_time=str(gate_in_time).strip(),
+        )
+
+        if self._stack_validator is not None:
+            is_valid, error_message = self._stack_validator(tier, block_id)
+            if not is_valid:
+                return record, error_message
+
+        return record, ''
+
+    def normalize_batch(self, payloads, block_id=None, required=(), defaults=FIELD_DEFAULTS):
+        """Normalisasi banyak payload sekaligus; hasil list of (record, error_message)."""
+        normalize = self.normalize
+        return [normalize(p, block_id=block_id, required=required, defaults=defaults) for p in payloads]
+
+
+def compile_normalizer(field_aliases=None, stack_validator=None):
+    """
+    Kompilasi tabel alias menjadi PayloadNormalizer (dipanggil sekali saat startup).
+
+    Args:
+        field_aliases: dict {field: (alias1, alias2, ...)}, default FIELD_ALIASES
+        stack_validator: fungsi (tier, block_id) -> (is_valid, error_message)
+    """
+    field_aliases = field_aliases or FIELD_ALIASES
+    missing = set(FIELD_ALIASES) - set(field_aliases)
+    if missing:
+        raise ValueError(f"Alias table missing fields: {sorted(missing)}")
+    compiled = tuple((field, tuple(aliases)) for field, aliases in field_aliases.items())
+    return PayloadNormalizer(compiled, stack_validator)
@@ -0,0 +1,163 @@
+"""
+PREDICTION CUBE
+===============
+Prediksi yang sudah dihitung sebelumnya untuk seluruh ruang key yard yang dikenal.
+
+Ruang key yard terbatas: LOKASI yang dikenal x block x 24 jam x beberapa profil
+kontainer (job type, ukuran, status, tipe). Fitur tanggal (hari dalam minggu,
+tanggal, bulan, weekend) ikut masuk model, jadi cube dibangun per tanggal.
+
+Satu direktori berisi:
+  - cube.npy      : float32 berdimensi (tanggal, lokasi, block, jam, profil)
+  - manifest.json : vocabulary tiap sumbu, tanggal awal, dan fingerprint artefak
+
+Fingerprint adalah sha256 dari FEATURE_VERSION, file model, label encoder,
+features list dan lookup tables. Jika salah satu berubah, cube dianggap basi
+dan App.py kembali ke inferensi live sampai cube dibangun ulang:
+    python build_prediction_cube.py --days 2
+"""
+
+import hashlib
+import json
+import os
+from datetime import date
+
+import numpy as np
+
+from feature_pipeline import FEATURE_VERSION
+from lookup_store import has_lookup_store
+
+CUBE_FILE = 'cube.npy'
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+
+# Profil kontainer default: (JOB_TYPE, CONTAINER_SIZE, CTR_STATUS, CONTAINER_TYPE)
+# JOB_TYPE memakai kelas label encoder; tiga lainnya nilai mentah payload
+DEFAULT_PROFILES = tuple(
+    (job_type, size, status, 'DRY')
+    for job_type in ('Delivery', 'Receiving')
+    for size in ('20', '40')
+    for status in ('FCL', 'MTY')
+)
+
+
+def model_artifact_paths(model_dir):
+    """File artefak yang menentukan hasil prediksi (urutan tetap)."""
+    lookup_store_dir = os.path.join(model_dir, 'lookup_tables_2bulan')
+    if has_lookup_store(lookup_store_dir):
+        lookup_path = lookup_store_dir
+    else:
+        lookup_path = os.path.join(model_dir, 'lookup_tables_2bulan.pkl')
+    return [
+        os.path.join(model_dir, 'best_model_2_bulan.pkl'),
+        os.path.join(model_dir, 'label_encoders_2_bulan.pkl'),
+        os.path.join(model_dir, 'features_list_2_bulan.pkl'),
+        lookup_path,
+    ]
+
+
+def _hash_file(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+
+def compute_fingerprint(paths):
+    """sha256 dari versi fitur + isi file (direktori di-hash per file, urut nama)."""
+    digest = hashlib.sha256()
+    digest.update(f'feature_version={FEATURE_VERSION}'.encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                digest.update(name.encode())
+                _hash_file(digest, os.path.join(path, name))
+        else:
+            _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+class PredictionCube:
+    """Lookup prediksi: satu pembacaan array per truk untuk key yang dikenal."""
+
+    def __init__(self, values, manifest):
+        self.values = values
+        self.manifest = manifest
+        self.start_ordinal = date.fromisoformat(manifest['start_date']).toordinal()
+        self.num_days = values.shape[0]
+
+        self.lokasi_index = {key: i for i, key in enumerate(manifest['lokasi'])}
+        self.block_index = {code: i for i, code in enumerate(manifest['blocks'])}
+        self.profile_index = {tuple(p): i for i, p in enumerate(manifest['profiles'])}
+
+    def __len__(self):
+        return int(self.values.size)
+
+    def index(self, lokasi, block_code, dt, profile):
+        """Indeks (tanggal, lokasi, block, jam, profil) atau None jika di luar cube."""
+        day = dt.toordinal() - self.start_ordinal
+        if day < 0 or day >= self.num_days:
+            return None
+        lokasi_idx = self.lokasi_index.get(lokasi)
+        block_idx = self.block_index.get(block_code)
+        profile_idx = self.profile_index.get(profile)
+        if lokasi_idx is None or block_idx is None or profile_idx is None:
+            return None
+        return day, lokasi_idx, block_idx, dt.hour, profile_idx
+
+    def lookup(self, lokasi, block_code, dt, profile):
+        """Prediksi (menit) atau None jika key tidak dikenal."""
+        idx = self.index(lokasi, block_code, dt, profile)
+        if idx is None:
+            return None
+        value = float(self.values[idx])
+        if np.isnan(value):
+            return None
+        return value
+
+
+def save_cube_manifest(out_dir, start_date, lokasi, blocks, profiles, fingerprint):
+    """Tulis manifest.json (dipanggil SETELAH cube.npy selesai ditulis)."""
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'start_date': start_date.isoformat(),
+        'lokasi': list(lokasi),
+        'blocks': list(blocks),
+        'hours': 24,
+        'profiles': [list(p) for p in profiles],
+        'profile_fields': ['JOB_TYPE', 'CONTAINER_SIZE', 'CTR_STATUS', 'CONTAINER_TYPE'],
+        'fingerprint': fingerprint,
+    }
+    tmp_path = os.path.join(out_dir, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_FILE))
+    return manifest
+
+
+def load_cube(cube_dir, expected_fingerprint=None, mmap=True):
+    """
+    Muat cube dari direktori.
+
+    Returns:
+        tuple: (PredictionCube atau None, pesan status)
+    """
+    manifest_path = os.path.join(cube_dir, MANIFEST_FILE)
+    cube_path = os.path.join(cube_dir, CUBE_FILE)
+    if not (os.path.exists(manifest_path) and os.path.exists(cube_path)):
+        return None, f'no prediction cube in {cube_dir}'
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        return None, f"unsupported cube format {manifest.get('format_version')}"
+    if expected_fingerprint is not None and manifest.get('fingerprint') != expected_fingerprint:
+        return None, 'prediction cube is stale (model or lookups changed), rebuild it'
+
+    values = np.load(cube_path, mmap_mode='r' if mmap else None)
+    expected_shape = (
+        len(manifest['lokasi']), len(manifest['blocks']), 24, len(manifest['profiles'])
+    )
+    if values.ndim != 5 or values.shape[1:] != expected_shape:
+        return None, f'cube shape {values.shape} does not match manifest'
+    return PredictionCube(values, manifest), 'ok'
@@ -0,0 +1,166 @@
+"""
+PRE-FORK SERVER
+===============
+Muat model, label encoder, features list, lookup tables dan prediction cube
+SEKALI di parent, jalankan warm-up, bekukan objek dari GC (gc.freeze) lalu fork
+N worker. Worker berbagi halaman memori artefak copy-on-write, jadi startup
+per worker hanya beberapa milidetik dan memori unik (USS) per worker kecil.
+
+Tiap worker melayani port sendiri (base-port + indeks); taruh nginx di depan
+dengan ip_hash (sticky session wajib untuk Socket.IO long-polling):
+
+    upstream artg_backend {
+        ip_hash;
+        server 127.0.0.1:5001;
+        server 127.0.0.1:5002;
+    }
+
+Catatan:
+  - Hanya Linux/macOS (os.fork) dan mode threading.
+  - Antrian (QUEUES), metrics dan akurasi adalah state per worker. Broadcast
+    Socket.IO antar worker butuh ARTG_SOCKETIO_MESSAGE_QUEUE (mis. redis).
+  - Worker yang mati di-fork ulang dari parent (tanpa memuat ulang artefak).
+
+Usage:
+    python prefork.py [--workers 4] [--host 0.0.0.0] [--base-port 5001]
+                      [--report-interval 60]
+"""
+
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+
+from process_memory import read_process_memory
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pre-fork ARTG backend workers')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('ARTG_WORKERS', '4')))
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--base-port', type=int, default=5001)
+    parser.add_argument('--report-interval', type=float, default=60.0,
+                        help='Interval laporan memori worker (detik), 0 = hanya saat startup')
+    return parser.parse_args()
+
+
+def format_memory(memory):
+    if memory is None:
+        return 'memory n/a'
+    return (f"RSS {memory['rss_kb'] / 1024:7.1f} MiB | PSS {memory['pss_kb'] / 1024:7.1f} MiB | "
+            f"USS {memory['uss_kb'] / 1024:7.1f} MiB")
+
+
+class PreforkServer:
+    def __init__(self, args, App):
+        self.args = args
+        self.App = App
+        self.workers = {}  # pid -> indeks worker
+        self.stopping = False
+
+    def spawn(self, index):
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            self.run_worker(index, forked_at)
+            os._exit(0)
+        self.workers[pid] = index
+        return pid
+
+    def run_worker(self, index, forked_at):
+        # SIGTERM -> SystemExit agar atexit (flush arsip truk) tetap jalan
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            self.App.init_worker(index)
+            port = self.args.base_port + index
+            ready_ms = (time.perf_counter() - forked_at) * 1000
+            print(f"[worker {index}] pid {os.getpid()} | port {port} | "
+                  f"ready in {ready_ms:.1f} ms after fork", flush=True)
+            self.App.socketio.run(
+                self.App.app, host=self.args.host, port=port,
+                debug=False, use_reloader=False, allow_unsafe_werkzeug=True,
+            )
+        except SystemExit:
+            pass
+
+    def report(self):
+        parent = read_process_memory()
+        print(f"[parent]   pid {os.getpid()} | {format_memory(parent)}", flush=True)
+        total_uss = 0
+        for pid, index in sorted(self.workers.items(), key=lambda item: item[1]):
+            memory = read_process_memory(pid)
+            if memory is not None:
+                total_uss += memory['uss_kb']
+            print(f"[worker {index}] pid {pid} | {format_memory(memory)}", flush=True)
+        if parent is not None:
+            print(f"[total]    parent RSS + worker USS = "
+                  f"{(parent['rss_kb'] + total_uss) / 1024:.1f} MiB", flush=True)
+
+    def stop(self, *_):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def serve(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.args.workers):
+            self.spawn(index)
+
+        # Laporan pertama setelah worker selesai bind port
+        next_report = time.monotonic() + 3.0
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                index = self.workers.pop(pid, None)
+                if index is not None and not self.stopping:
+                    print(f"[parent] worker {index} (pid {pid}) exited with status {status}, "
+                          f"re-forking", flush=True)
+                    self.spawn(index)
+                continue
+
+            if not self.stopping and next_report is not None and time.monotonic() >= next_report:
+                self.report()
+                interval = self.args.report_interval
+                next_report = time.monotonic() + interval if interval > 0 else None
+            time.sleep(0.2)
+
+
+def main():
+    args = parse_args()
+    if not hasattr(os, 'fork'):
+        sys.exit('prefork.py needs os.fork (Linux/macOS); run App.py directly on Windows')
+    if os.getenv('ARTG_ASYNC_MODE', 'threading').strip().lower() != 'threading':
+        sys.exit('prefork.py supports ARTG_ASYNC_MODE=threading only')
+
+    # Thread background (arsip truk, antrian ingest) dimulai per worker, bukan di parent
+    os.environ['ARTG_PREFORK_PARENT'] = '1'
+
+    started = time.perf_counter()
+    import App
+    load_ms = (time.perf_counter() - started) * 1000
+    warm_ms = App.warm_up()
+
+    # Objek artefak dipindah ke generasi permanen: GC worker tidak menyentuh
+    # (dan tidak menyalin) halaman yang berisi objek tersebut
+    gc.collect()
+    gc.freeze()
+    print(f"[parent] artifacts loaded in {load_ms:.0f} ms | warm-up {warm_ms:.0f} ms | "
+          f"{gc.get_freeze_count():,} objects frozen | "
+          f"{args.workers} workers on ports {args.base_port}-{args.base_port + args.workers - 1}",
+          flush=True)
+
+    PreforkServer(args, App).serve()
+
+
+if __name__ == '__main__':
+    main()
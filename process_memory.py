@@ -0,0 +1,49 @@
+"""
+PROCESS MEMORY
+==============
+Memori proses dari /proc (Linux): RSS, PSS dan USS.
+
+  - RSS : semua halaman resident (halaman bersama dihitung penuh di tiap proses)
+  - PSS : halaman bersama dibagi rata ke proses yang memakainya
+  - USS : halaman privat saja = memori yang benar-benar hilang jika proses mati
+
+Untuk worker pre-fork (prefork.py), USS menunjukkan berapa yang TIDAK
+terbagi copy-on-write dengan parent.
+"""
+
+import os
+
+FIELDS = {
+    'Rss': 'rss_kb',
+    'Pss': 'pss_kb',
+    'Private_Clean': 'private_clean_kb',
+    'Private_Dirty': 'private_dirty_kb',
+    'Shared_Clean': 'shared_clean_kb',
+    'Shared_Dirty': 'shared_dirty_kb',
+}
+
+
+def read_process_memory(pid=None):
+    """
+    Memori proses dalam KiB.
+
+    Returns:
+        dict (rss_kb, pss_kb, uss_kb, ...) atau None jika /proc tidak tersedia
+    """
+    pid = os.getpid() if pid is None else pid
+    values = dict.fromkeys(FIELDS.values(), 0)
+    path = f'/proc/{pid}/smaps_rollup'
+    if not os.path.exists(path):
+        # Kernel lama: jumlahkan semua mapping
+        path = f'/proc/{pid}/smaps'
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                key = FIELDS.get(name)
+                if key is not None:
+                    values[key] += int(rest.split()[0])
+    except (OSError, ValueError):
+        return None
+    values['uss_kb'] = values['private_clean_kb'] + values['private_dirty_kb']
+    return values
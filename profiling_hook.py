@@ -0,0 +1,229 @@
+"""
+SAMPLING PROFILER HOOK
+======================
+Mode profiling opt-in untuk hot path (predict_duration, handle_gate_in).
+
+Aktifkan dengan environment variable saat startup:
+    ARTG_PROFILING=1                  # wajib, tanpa ini decorator tidak membungkus apa pun
+    ARTG_PROFILE_SAMPLE_RATE=0.01     # fraksi panggilan yang diprofil (default 0)
+    ARTG_PROFILE_DIR=profiles         # direktori output export
+    ARTG_PROFILE_INTERVAL_MS=1        # interval sampling stack
+
+Jika ARTG_PROFILING tidak aktif, @profiled mengembalikan fungsi asli apa adanya
+sehingga overhead nol. Jika aktif, setiap panggilan yang tersampel:
+  - dijalankan di bawah cProfile (diagregasi jadi pstats), dan
+  - stack thread-nya disampel berkala oleh thread sampler (collapsed stack).
+
+Export menghasilkan file .pstats (bisa dibuka snakeviz/pstats) dan .collapsed
+(format "frame1;frame2;frame3 count" untuk flamegraph.pl / speedscope).
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MAX_WINDOW_SECONDS = 600
+MAX_UNIQUE_STACKS = 20000
+
+
+class SamplingProfiler:
+    """Profiler in-process: cProfile per panggilan tersampel + sampler stack."""
+
+    def __init__(self, sample_rate=0.0, output_dir='profiles', interval_ms=1.0):
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self.output_dir = output_dir
+        self.interval = max(0.0005, float(interval_ms) / 1000.0)
+
+        self.window_until = 0.0
+        self.lock = threading.Lock()
+        self.cprofile_lock = threading.Lock()
+
+        self.stats = {}                 # nama -> pstats.Stats teragregasi
+        self.stack_counts = Counter()   # "nama;frame;frame" -> jumlah sampel
+        self.dropped_stacks = 0
+        self.profiled_calls = Counter()
+
+        self.active_threads = {}        # thread_id -> nama fungsi
+        self.has_active = threading.Event()
+        self.sampler_thread = None
+
+    # ------------------------------------------------------------------
+    # Kontrol
+    # ------------------------------------------------------------------
+
+    def start_window(self, seconds):
+        """Profil SEMUA panggilan selama `seconds` detik (dibatasi MAX_WINDOW_SECONDS)."""
+        seconds = max(0.0, min(float(seconds), MAX_WINDOW_SECONDS))
+        self.window_until = time.time() + seconds
+        return self.window_until
+
+    def should_profile(self):
+        if self.window_until and time.time() < self.window_until:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.stack_counts = Counter()
+            self.dropped_stacks = 0
+            self.profiled_calls = Counter()
+
+    # ------------------------------------------------------------------
+    # Sampler stack
+    # ------------------------------------------------------------------
+
+    def _ensure_sampler(self):
+        if self.sampler_thread is not None:
+            return
+        with self.lock:
+            if self.sampler_thread is None:
+                self.sampler_thread = threading.Thread(target=self._sample_loop, daemon=True)
+                self.sampler_thread.start()
+
+    def _sample_loop(self):
+        while True:
+            self.has_active.wait()
+            time.sleep(self.interval)
+            active = dict(self.active_threads)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, name in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                self._record_stack(name, frame)
+
+    def _record_stack(self, name, frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        parts.append(name)
+        key = ';'.join(reversed(parts))
+        with self.lock:
+            if key in self.stack_counts or len(self.stack_counts) < MAX_UNIQUE_STACKS:
+                self.stack_counts[key] += 1
+            else:
+                self.dropped_stacks += 1
+
+    # ------------------------------------------------------------------
+    # Wrapper
+    # ------------------------------------------------------------------
+
+    def wrap(self, func, name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.should_profile():
+                return func(*args, **kwargs)
+            return self._run_profiled(func, name, args, kwargs)
+        return wrapper
+
+    def _run_profiled(self, func, name, args, kwargs):
+        self._ensure_sampler()
+        thread_id = threading.get_ident()
+        self.active_threads[thread_id] = name
+        self.has_active.set()
+
+        # cProfile hanya boleh aktif satu per proses di Python >= 3.12
+        profile = cProfile.Profile() if self.cprofile_lock.acquire(blocking=False) else None
+        try:
+            if profile is not None:
+                profile.enable()
+            return func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.cprofile_lock.release()
+            self.active_threads.pop(thread_id, None)
+            if not self.active_threads:
+                self.has_active.clear()
+            with self.lock:
+                self.profiled_calls[name] += 1
+                if profile is not None:
+                    if name in self.stats:
+                        self.stats[name].add(profile)
+                    else:
+                        self.stats[name] = pstats.Stats(profile)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def status(self):
+        with self.lock:
+            return {
+                'sample_rate': self.sample_rate,
+                'window_active': time.time() < self.window_until,
+                'window_until': (
+                    datetime.fromtimestamp(self.window_until).isoformat()
+                    if self.window_until else None
+                ),
+                'profiled_calls': dict(self.profiled_calls),
+                'unique_stacks': len(self.stack_counts),
+                'stack_samples': sum(self.stack_counts.values()),
+                'dropped_stacks': self.dropped_stacks,
+                'output_dir': os.path.abspath(self.output_dir),
+            }
+
+    def export(self, reset=False):
+        """
+        Tulis profil teragregasi ke disk.
+
+        Returns:
+            list: path file yang ditulis (.collapsed + satu .pstats per fungsi)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        written = []
+
+        with self.lock:
+            stack_counts = list(self.stack_counts.items())
+            stats = dict(self.stats)
+
+        collapsed_path = os.path.join(self.output_dir, f'profile_{stamp}.collapsed')
+        with open(collapsed_path, 'w') as f:
+            for stack, count in sorted(stack_counts):
+                f.write(f'{stack} {count}\n')
+        written.append(collapsed_path)
+
+        for name, stat in stats.items():
+            stats_path = os.path.join(self.output_dir, f'profile_{stamp}_{name}.pstats')
+            stat.dump_stats(stats_path)
+            written.append(stats_path)
+
+        if reset:
+            self.reset()
+        return written
+
+
+# Instance global (None jika profiling tidak diaktifkan saat startup)
+profiler = None
+if os.getenv('ARTG_PROFILING', '0').lower() in ('1', 'true', 'yes'):
+    profiler = SamplingProfiler(
+        sample_rate=os.getenv('ARTG_PROFILE_SAMPLE_RATE', '0'),
+        output_dir=os.getenv('ARTG_PROFILE_DIR', 'profiles'),
+        interval_ms=os.getenv('ARTG_PROFILE_INTERVAL_MS', '1'),
+    )
+    logger.info(f"Profiling mode enabled | sample_rate={profiler.sample_rate}")
+
+
+def profiled(name):
+    """Decorator: bungkus fungsi dengan profiler hanya jika profiling aktif."""
+    def decorator(func):
+        if profiler is None:
+            return func
+        return profiler.wrap(func, name)
+    return decorator
@@ -0,0 +1,108 @@
+"""
+QUEUE STORE
+===========
+Antrian truk per blok dengan lock per blok untuk penulis dan snapshot
+copy-on-write untuk pembaca.
+
+  - Penulis (add_truck, remove_truck, clear_block, demo, sweeper kedaluwarsa)
+    mengambil lock blok yang bersangkutan saja, membuat tuple baru, lalu
+    mengganti referensi snapshot (satu assignment atomik).
+  - Pembaca (/blocks, statistik, broadcast) cukup membaca referensi tuple
+    terakhir tanpa lock, sehingga tidak pernah menunggu penulis dan tidak
+    pernah melihat list yang sedang diubah.
+
+Waktu tunggu lock dicatat ke metrics (queue_lock_wait_ms, queue_lock_contended).
+Entri truk (truck_entry.QueuedTruck) diperlakukan immutable setelah dimasukkan.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from service_metrics import metrics
+
+
+class BlockQueues:
+    """Kumpulan antrian per blok (block_id -> tuple truk)."""
+
+    def __init__(self, block_ids):
+        self._locks = {block_id: threading.Lock() for block_id in block_ids}
+        self._snapshots = {block_id: () for block_id in block_ids}
+
+    @property
+    def block_ids(self):
+        return tuple(self._snapshots)
+
+    @contextmanager
+    def _locked(self, block_id):
+        lock = self._locks[block_id]
+        if not lock.acquire(blocking=False):
+            started = time.perf_counter()
+            lock.acquire()
+            metrics.inc('queue_lock_contended')
+            metrics.observe('queue_lock_wait_ms', (time.perf_counter() - started) * 1000)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    # ------------------------------------------------------------------
+    # Pembaca (tanpa lock)
+    # ------------------------------------------------------------------
+
+    def snapshot(self, block_id):
+        """Tuple truk saat ini untuk satu blok (immutable)."""
+        return self._snapshots[block_id]
+
+    def snapshot_all(self):
+        """Snapshot semua blok (konsisten per blok, bukan lintas blok)."""
+        return dict(self._snapshots)
+
+    def __getitem__(self, block_id):
+        return self._snapshots[block_id]
+
+    # ------------------------------------------------------------------
+    # Penulis (lock per blok)
+    # ------------------------------------------------------------------
+
+    def append(self, block_id, truck):
+        with self._locked(block_id):
+            self._snapshots[block_id] = self._snapshots[block_id] + (truck,)
+
+    def extend(self, block_id, trucks):
+        trucks = tuple(trucks)
+        with self._locked(block_id):
+            self._snapshots[block_id] = self._snapshots[block_id] + trucks
+
+    def pop(self, block_id, index):
+        """Hapus truk pada indeks; None jika indeks tidak valid."""
+        with self._locked(block_id):
+            current = self._snapshots[block_id]
+            if index < 0 or index >= len(current):
+                return None
+            self._snapshots[block_id] = current[:index] + current[index + 1:]
+            return current[index]
+
+    def remove(self, block_id, trucks):
+        """
+        Hapus truk tertentu (berdasarkan identitas objek) dalam satu salinan tuple.
+        Truk yang sudah tidak ada di antrian diabaikan.
+
+        Returns:
+            tuple: truk yang benar-benar dihapus
+        """
+        targets = {id(truck) for truck in trucks}
+        with self._locked(block_id):
+            current = self._snapshots[block_id]
+            kept = tuple(truck for truck in current if id(truck) not in targets)
+            if len(kept) == len(current):
+                return ()
+            self._snapshots[block_id] = kept
+            return tuple(truck for truck in current if id(truck) in targets)
+
+    def clear(self, block_id):
+        """Kosongkan antrian blok; kembalikan tuple truk yang dihapus."""
+        with self._locked(block_id):
+            removed = self._snapshots[block_id]
+            self._snapshots[block_id] = ()
+            return removed
@@ -0,0 +1,87 @@
+"""
+SERVICE METRICS
+===============
+Registry metrik in-process yang ringan (counter + ringkasan nilai seperti
+latency atau selisih prediksi) untuk endpoint GET /metrics.
+"""
+
+import threading
+from collections import Counter, deque
+
+import numpy as np
+
+LATENCY_WINDOW = 2048
+
+
+class LatencySummary:
+    """Ringkasan nilai: count, mean, max + kuantil dari window sampel terakhir."""
+
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = float('-inf')
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def snapshot(self):
+        if self.count == 0:
+            return {'count': 0}
+        recent = np.fromiter(self.recent, dtype=np.float64)
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'max': round(self.max, 3),
+            'p50': round(float(p50), 3),
+            'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3),
+        }
+
+
+class MetricsRegistry:
+    """Counter dan summary thread-safe (nama summary latency diakhiri _ms)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.latencies = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name, value):
+        with self.lock:
+            summary = self.latencies.get(name)
+            if summary is None:
+                summary = self.latencies[name] = LatencySummary()
+            summary.observe(value)
+
+    def register_gauge(self, name, fn):
+        """Daftarkan fungsi tanpa argumen yang dievaluasi saat snapshot."""
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            latencies = {name: s.snapshot() for name, s in self.latencies.items()}
+        gauges = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                gauges[name] = f'error: {e}'
+        return {'counters': counters, 'summaries': latencies, 'gauges': gauges}
+
+
+# Registry global untuk seluruh aplikasi
+metrics = MetricsRegistry()
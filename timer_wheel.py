@@ -0,0 +1,111 @@
+"""
+TIMER WHEEL
+===========
+Hierarchical timing wheel (Varghese & Lauck) untuk kedaluwarsa truk di antrian:
+
+  - `levels` roda masing-masing 64 slot; level 0 beresolusi satu tick, level k
+    mencakup 64^k tick per slot (default 4 level x 1 detik = ~194 hari)
+  - schedule() O(1): entri masuk slot level terendah yang jangkauannya cukup
+  - advance() O(1) per tick + per entri kedaluwarsa: saat level bawah berputar
+    penuh, satu slot level di atasnya di-cascade turun (tiap entri turun paling
+    banyak `levels` kali seumur hidupnya)
+  - Tidak ada scan antrian: hanya entri yang jatuh tempo yang disentuh
+
+Pembatalan bersifat lazy: pemanggil mengabaikan entri yang sudah tidak relevan
+saat kedaluwarsa (mis. truk yang sudah dihapus manual).
+"""
+
+import math
+import threading
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+
+
+class TimerWheel:
+    """Timer wheel hierarkis; waktu dalam detik epoch, resolusi `tick_s`."""
+
+    def __init__(self, tick_s=1.0, levels=4, now=0.0):
+        self.tick_s = float(tick_s)
+        self.levels = levels
+        self.wheels = [[[] for _ in range(SLOTS)] for _ in range(levels)]
+        self.current = self._tick(now)
+        self.count = 0
+        self.sizes = [0] * levels
+        self.lock = threading.Lock()
+
+    def _tick(self, ts):
+        return int(math.floor(ts / self.tick_s))
+
+    def schedule(self, deadline_ts, item):
+        """Jadwalkan item kedaluwarsa pada deadline_ts (sudah lewat = tick berikutnya)."""
+        with self.lock:
+            self._place(max(int(math.ceil(deadline_ts / self.tick_s)), self.current + 1), item)
+            self.count += 1
+
+    def _place(self, expires, item):
+        delta = expires - self.current
+        for level in range(self.levels):
+            if delta < SLOTS << (SLOT_BITS * level) or level == self.levels - 1:
+                break
+        if delta >= SLOTS << (SLOT_BITS * level):
+            # Di luar jangkauan roda teratas: parkir di slot terjauh, dijadwalkan ulang saat cascade
+            index = ((self.current >> (SLOT_BITS * level)) - 1) & SLOT_MASK
+        else:
+            index = (expires >> (SLOT_BITS * level)) & SLOT_MASK
+        self.wheels[level][index].append((expires, item))
+        self.sizes[level] += 1
+
+    def advance(self, now_ts):
+        """
+        Majukan roda sampai now_ts.
+
+        Returns:
+            list: item yang kedaluwarsa (urut tick)
+        """
+        target = self._tick(now_ts)
+        expired = []
+        with self.lock:
+            while self.current < target:
+                # Level bawah kosong: lompat langsung ke batas putaran berikutnya
+                empty = 0
+                while empty < self.levels and not self.sizes[empty]:
+                    empty += 1
+                if empty == self.levels:
+                    self.current = target
+                    break
+                if empty:
+                    self.current = min(target, self._next_cascade(empty)) - 1
+                self.current += 1
+                # Cascade dari level tertinggi yang berputar penuh pada tick ini
+                for level in range(self.levels - 1, 0, -1):
+                    if self.current & ((1 << (SLOT_BITS * level)) - 1):
+                        continue
+                    index = (self.current >> (SLOT_BITS * level)) & SLOT_MASK
+                    entries = self.wheels[level][index]
+                    self.wheels[level][index] = []
+                    self.sizes[level] -= len(entries)
+                    for expires, item in entries:
+                        self._place(expires, item)
+                slot = self.wheels[0][self.current & SLOT_MASK]
+                if slot:
+                    self.wheels[0][self.current & SLOT_MASK] = []
+                    self.sizes[0] -= len(slot)
+                    expired.extend(item for _, item in slot)
+            self.count -= len(expired)
+        return expired
+
+    def _next_cascade(self, level):
+        """Tick berikutnya yang men-cascade slot berisi di `level` (atau level di atasnya)."""
+        shift = SLOT_BITS * level
+        wheel = self.wheels[level]
+        boundary = self.current >> shift
+        for _ in range(SLOTS):
+            boundary += 1
+            if wheel[boundary & SLOT_MASK] or not boundary & SLOT_MASK:
+                break
+        return boundary << shift
+
+    def __len__(self):
+        return self.count
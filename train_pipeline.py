@@ -0,0 +1,595 @@
+"""
+TRAINING PIPELINE
+=================
+Versi command-line dari notebook/modeling_45features_PROPER_FIXED.ipynb:
+
+  1. load      : dataset fitur (45 fitur + GATE_IN_STACK), atau data bersih
+                 (output notebook cleaning) yang dibangun via build_training_features
+  2. encode    : cleaning kategori + smoothing LOKASI (sama dengan notebook),
+                 LabelEncoder, lalu matriks float64 disimpan sebagai .npy di
+                 cache (--cache-dir); run berikutnya dengan dataset & opsi sama
+                 langsung memory-map matriks tersebut (tanpa baca CSV lagi)
+  3. tune      : studi Optuna LightGBM / XGBoost / CatBoost berjalan paralel di
+                 --jobs proses (storage journal bersama, MedianPruner dari MAE
+                 validasi per iterasi boosting); worker membaca matriks yang sama
+                 lewat memmap (halaman dibagi lewat page cache, tanpa pickling)
+  4. fit       : base model dengan parameter terbaik + StackingRegressor (cv=3, Ridge)
+  5. evaluate  : MAE / RMSE / R2 / within 5 & 10 menit di test split
+  6. save      : artefak berversi di <out>/versions/<versi>/ dengan nama file yang
+                 dipakai App.py; --promote menyalinnya ke <out>/ (atomic rename)
+
+Waktu per stage dicatat di model_metadata_2_bulan.json (stage_seconds).
+
+Catatan:
+  - Split 80/20 dan evaluasi di test split mengikuti notebook (angka bisa dibandingkan)
+  - MinMaxScaler notebook tidak dipakai: App.py tidak menskalakan fitur saat serving,
+    dan model pohon tidak berubah oleh skala monoton
+  - Setelah --promote, bangun ulang prediction cube (fingerprint model berubah)
+
+Usage:
+    python train_pipeline.py Data/processed/dataset_final2bulan_45FEATURES_PROPER.csv \\
+        [--trials 50] [--jobs 6] [--out models] [--promote]
+    python train_pipeline.py Data/processed/dataset_rapi_2bulan.csv --clean-input
+    python train_pipeline.py Data/processed/gate_history --clean-input
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+from clean_raw_data import MANIFEST_FILE, read_clean_dataset
+from feature_pipeline import (
+    CATEGORICAL_FEATURES, FEATURE_VERSION, MODEL_FEATURES, TARGET_COL,
+    build_training_features, clean_categorical, filter_training_target,
+)
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+BASE_MODELS = ('lgbm', 'xgb', 'catboost')
+
+# Nama file artefak yang dimuat App.py
+MODEL_FILE = 'best_model_2_bulan.pkl'
+ENCODERS_FILE = 'label_encoders_2_bulan.pkl'
+FEATURES_FILE = 'features_list_2_bulan.pkl'
+METADATA_FILE = 'model_metadata_2_bulan.json'
+
+# Kategori yang di-clean notebook sebelum encoding
+CLEANED_CATEGORICALS = ('slot', 'tier', 'block', 'gate_in_shift')
+
+
+# ============================================================================
+# STAGE TIMER
+# ============================================================================
+
+class StageTimer:
+    """Catat wall-clock per stage (detik) dan cetak saat stage selesai."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        print(f"\n[{name}] ...", flush=True)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds[name] = round(elapsed, 3)
+            print(f"[{name}] done in {elapsed:.1f} s", flush=True)
+
+
+# ============================================================================
+# LOAD + ENCODE (CACHE MEMMAP)
+# ============================================================================
+
+def dataset_cache_key(dataset_path, clean_input, lokasi_blend):
+    """Key cache: isi file dataset (ukuran + mtime) + versi fitur + opsi preprocessing."""
+    # Direktori partisi clean_raw_data.py: manifest berubah setiap export baru ditambahkan
+    stat = os.stat(os.path.join(dataset_path, MANIFEST_FILE) if os.path.isdir(dataset_path) else dataset_path)
+    parts = [
+        os.path.abspath(dataset_path), str(stat.st_size), str(int(stat.st_mtime)),
+        str(FEATURE_VERSION), ','.join(MODEL_FEATURES), str(clean_input), f'{lokasi_blend:g}',
+    ]
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=8).hexdigest()
+
+
+def load_dataset(dataset_path, clean_input):
+    """DataFrame MODEL_FEATURES + target (dataset fitur, atau dibangun dari data bersih)."""
+    if clean_input:
+        raw_df = filter_training_target(read_clean_dataset(dataset_path))
+        return build_training_features(raw_df).dropna().reset_index(drop=True)
+    return pd.read_csv(dataset_path, usecols=MODEL_FEATURES + [TARGET_COL])
+
+
+def encode_dataset(df, lokasi_blend):
+    """
+    Preprocessing notebook: clean kategori, smoothing LOKASI ke rata-rata global,
+    LabelEncoder (fit pada seluruh data).
+
+    Returns:
+        tuple: (matriks float64 [baris, 45], target float64, dict label encoder)
+    """
+    for col in CLEANED_CATEGORICALS:
+        df[col] = clean_categorical(df[col])
+
+    global_mean = df[TARGET_COL].mean()
+    for col in ('LOKASI_target_enc', 'lokasi_historical_avg'):
+        df[col] = lokasi_blend * df[col] + (1 - lokasi_blend) * global_mean
+
+    label_encoders = {}
+    for col in CATEGORICAL_FEATURES:
+        le = LabelEncoder()
+        df[col] = le.fit_transform(df[col].astype(str))
+        label_encoders[col] = le
+
+    X = df[MODEL_FEATURES].fillna(0).to_numpy(dtype=np.float64)
+    y = df[TARGET_COL].to_numpy(dtype=np.float64)
+    return X, y, label_encoders
+
+
+SPLIT_FILES = ('X_train', 'y_train', 'X_test', 'y_test')
+
+
+def prepare_matrix(args, timer):
+    """
+    Matriks fitur ter-encode (sudah di-split 80/20 seperti notebook) dari cache
+    atau dibangun lalu disimpan sebagai .npy.
+
+    Returns:
+        tuple: (direktori cache, dict label encoder, info cache)
+    """
+    key = dataset_cache_key(args.dataset, args.clean_input, args.lokasi_blend)
+    cache_dir = os.path.join(args.cache_dir, key)
+    encoders_path = os.path.join(cache_dir, ENCODERS_FILE)
+    paths = [os.path.join(cache_dir, f'{name}.npy') for name in SPLIT_FILES]
+
+    if all(os.path.exists(p) for p in paths + [encoders_path]) and not args.rebuild_cache:
+        with timer.stage('load_cache'):
+            label_encoders = joblib.load(encoders_path)
+            print(f"   Cache hit: {cache_dir}")
+        return cache_dir, label_encoders, {'key': key, 'hit': True}
+
+    with timer.stage('load'):
+        df = load_dataset(args.dataset, args.clean_input)
+        print(f"   {len(df):,} rows from {args.dataset}")
+
+    with timer.stage('encode'):
+        X, y, label_encoders = encode_dataset(df, args.lokasi_blend)
+        del df
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size=TEST_SIZE, random_state=RANDOM_STATE, shuffle=True
+        )
+        arrays = (X[train_idx], y[train_idx], X[test_idx], y[test_idx])
+        os.makedirs(cache_dir, exist_ok=True)
+        # Tulis ke file sementara lalu rename: run paralel tidak membaca cache setengah jadi
+        for path, array in zip(paths, arrays):
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(path + '.tmp', path)
+        joblib.dump(label_encoders, encoders_path)
+        print(f"   Cached {X.shape[0]:,} x {X.shape[1]} matrix "
+              f"({X.nbytes / 2**20:.1f} MiB, train {len(train_idx):,} / test {len(test_idx):,}) -> {cache_dir}")
+    return cache_dir, label_encoders, {'key': key, 'hit': False}
+
+
+def load_split(cache_dir):
+    """X_train, y_train, X_test, y_test sebagai memmap read-only (tanpa salinan)."""
+    return tuple(
+        np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r') for name in SPLIT_FILES
+    )
+
+
+# ============================================================================
+# MODEL & RUANG PENCARIAN (sama dengan notebook)
+# ============================================================================
+
+def suggest_params(trial, name):
+    if name == 'lgbm':
+        return {
+            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+            'max_depth': trial.suggest_int('max_depth', 3, 12),
+            'num_leaves': trial.suggest_int('num_leaves', 20, 200),
+            'min_child_samples': trial.suggest_int('min_child_samples', 10, 100),
+            'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.5, 1.0),
+            'reg_alpha': trial.suggest_float('reg_alpha', 0.0, 10.0),
+            'reg_lambda': trial.suggest_float('reg_lambda', 0.0, 10.0),
+        }
+    if name == 'xgb':
+        return {
+            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+            'max_depth': trial.suggest_int('max_depth', 3, 12),
+            'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
+            'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.5, 1.0),
+            'gamma': trial.suggest_float('gamma', 0.0, 5.0),
+            'reg_alpha': trial.suggest_float('reg_alpha', 0.0, 10.0),
+            'reg_lambda': trial.suggest_float('reg_lambda', 0.0, 10.0),
+        }
+    return {
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'depth': trial.suggest_int('depth', 4, 10),
+        'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1, 10),
+        'border_count': trial.suggest_int('border_count', 32, 255),
+    }
+
+
+def fixed_params(name, threads):
+    """Parameter tetap notebook + jumlah thread per proses."""
+    if name == 'lgbm':
+        return {
+            'objective': 'regression', 'metric': 'mae', 'boosting_type': 'gbdt',
+            'n_estimators': 500, 'random_state': RANDOM_STATE, 'verbose': -1,
+            'force_col_wise': True, 'n_jobs': threads,
+        }
+    if name == 'xgb':
+        return {
+            'n_estimators': 500, 'random_state': RANDOM_STATE, 'tree_method': 'hist',
+            'verbosity': 0, 'eval_metric': 'mae', 'n_jobs': threads,
+        }
+    return {
+        'iterations': 500, 'random_state': RANDOM_STATE, 'verbose': False,
+        'custom_metric': ['MAE'], 'thread_count': threads,
+    }
+
+
+def build_estimator(name, params, threads, callbacks=None):
+    """Estimator sklearn-compatible + kwargs fit (eval set / early stopping notebook)."""
+    params = {**params, **fixed_params(name, threads)}
+    if name == 'lgbm':
+        import lightgbm as lgb
+        return lgb.LGBMRegressor(**params), lambda X_val, y_val: {
+            'eval_set': [(X_val, y_val)],
+            'callbacks': [lgb.early_stopping(50, verbose=False)] + list(callbacks or ()),
+        }
+    if name == 'xgb':
+        import xgboost as xgb
+        if callbacks:
+            params['callbacks'] = list(callbacks)
+        return xgb.XGBRegressor(**params), lambda X_val, y_val: {
+            'eval_set': [(X_val, y_val)], 'verbose': False,
+        }
+    from catboost import CatBoostRegressor
+    return CatBoostRegressor(**params), lambda X_val, y_val: {
+        'eval_set': (X_val, y_val), 'early_stopping_rounds': 50, 'verbose': False,
+        'callbacks': list(callbacks or ()) or None,
+    }
+
+
+# ============================================================================
+# PRUNING: MAE validasi per iterasi boosting dilaporkan ke Optuna
+# ============================================================================
+
+class TrialPruner:
+    """
+    Laporkan MAE validasi setiap `every` iterasi; jika trial.should_prune(),
+    training dihentikan dan trial ditandai pruned setelah fit selesai.
+    """
+
+    def __init__(self, trial, every=25):
+        self.trial = trial
+        self.every = every
+        self.pruned = False
+
+    def report(self, iteration, mae):
+        if (iteration + 1) % self.every:
+            return False
+        self.trial.report(mae, iteration)
+        self.pruned = self.trial.should_prune()
+        return self.pruned
+
+    def callbacks(self, name):
+        if name == 'lgbm':
+            def lgbm_callback(env):
+                for _, metric, value, _ in env.evaluation_result_list:
+                    if metric in ('l1', 'mae') and self.report(env.iteration, value):
+                        import optuna
+                        raise optuna.TrialPruned(f'pruned at iteration {env.iteration + 1}')
+            return [lgbm_callback]
+
+        if name == 'xgb':
+            import xgboost as xgb
+            pruner = self
+
+            class XGBPruningCallback(xgb.callback.TrainingCallback):
+                def after_iteration(self, model, epoch, evals_log):
+                    history = next(iter(evals_log.values()))['mae']
+                    return pruner.report(epoch, float(history[-1]))
+            return [XGBPruningCallback()]
+
+        pruner = self
+
+        class CatBoostPruningCallback:
+            def after_iteration(self, info):
+                history = info.metrics['validation']['MAE']
+                # False = hentikan training
+                return not pruner.report(info.iteration - 1, float(history[-1]))
+        return [CatBoostPruningCallback()]
+
+
+# ============================================================================
+# TUNING PARALEL (proses terpisah, storage journal bersama)
+# ============================================================================
+
+def open_storage(journal_path):
+    import optuna
+    storages = optuna.storages
+    if hasattr(storages, 'journal') and hasattr(storages.journal, 'JournalFileBackend'):
+        backend = storages.journal.JournalFileBackend(journal_path)
+    else:
+        backend = storages.JournalFileStorage(journal_path)
+    return storages.JournalStorage(backend)
+
+
+def tune_worker(name, study_name, journal_path, cache_dir, n_trials, threads, seed):
+    """Satu proses worker: ikut optimasi study bersama sampai total n_trials tercapai."""
+    import optuna
+    from optuna.study import MaxTrialsCallback
+    from optuna.trial import TrialState
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X_train, y_train, X_test, y_test = load_split(cache_dir)
+    study = optuna.load_study(
+        study_name=study_name, storage=open_storage(journal_path),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=100),
+    )
+
+    def objective(trial):
+        pruner = TrialPruner(trial)
+        model, fit_kwargs = build_estimator(
+            name, suggest_params(trial, name), threads, callbacks=pruner.callbacks(name)
+        )
+        model.fit(X_train, y_train, **fit_kwargs(X_test, y_test))
+        if pruner.pruned:
+            raise optuna.TrialPruned()
+        return mean_absolute_error(y_test, model.predict(X_test))
+
+    study.optimize(
+        objective, n_trials=n_trials, gc_after_trial=True,
+        callbacks=[MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))],
+    )
+    return name
+
+
+def tune_all(cache_dir, args, run_dir, timer):
+    """
+    Jalankan ketiga studi sekaligus di --jobs proses.
+
+    Returns:
+        dict: {model: {'params', 'best_mae', 'trials', 'pruned'}}
+    """
+    import optuna
+    from optuna.trial import TrialState
+
+    journal_path = os.path.join(run_dir, 'optuna_journal.log')
+    storage = open_storage(journal_path)
+    workers_per_model = max(1, args.jobs // len(BASE_MODELS))
+    threads = max(1, (os.cpu_count() or 1) // (workers_per_model * len(BASE_MODELS)))
+    print(f"   {len(BASE_MODELS)} studies x {workers_per_model} processes x {threads} threads | "
+          f"{args.trials} trials each | journal {journal_path}")
+
+    study_names = {}
+    for name in BASE_MODELS:
+        study_names[name] = f'{name}-{os.path.basename(run_dir)}'
+        optuna.create_study(study_name=study_names[name], storage=storage,
+                            direction='minimize', load_if_exists=True)
+
+    with timer.stage('tune'):
+        with ProcessPoolExecutor(max_workers=workers_per_model * len(BASE_MODELS)) as pool:
+            futures = [
+                pool.submit(tune_worker, name, study_names[name], journal_path, cache_dir,
+                            args.trials, threads, RANDOM_STATE + 100 * worker + index)
+                for worker in range(workers_per_model)
+                for index, name in enumerate(BASE_MODELS)
+            ]
+            for future in futures:
+                future.result()
+
+    results = {}
+    for name in BASE_MODELS:
+        study = optuna.load_study(study_name=study_names[name], storage=storage)
+        states = [t.state for t in study.trials]
+        results[name] = {
+            'params': study.best_params,
+            'best_mae': round(study.best_value, 4),
+            'trials': len(states),
+            'pruned': states.count(TrialState.PRUNED),
+        }
+        print(f"   {name:9s} best MAE {study.best_value:.4f} | "
+              f"{len(states)} trials ({results[name]['pruned']} pruned)")
+    return results
+
+
+# ============================================================================
+# FIT + EVALUASI
+# ============================================================================
+
+def regression_report(y_true, y_pred):
+    errors = np.abs(y_true - y_pred)
+    return {
+        'MAE': float(mean_absolute_error(y_true, y_pred)),
+        'RMSE': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'R2': float(r2_score(y_true, y_pred)),
+        'within_5min_pct': float((errors <= 5).mean() * 100),
+        'within_10min_pct': float((errors <= 10).mean() * 100),
+    }
+
+
+def fit_models(cache_dir, tuned, args, timer):
+    """
+    Base model dengan parameter terbaik + StackingRegressor (cv=3, Ridge).
+    Fit pada DataFrame berkolom MODEL_FEATURES (App.py memanggil predict dengan DataFrame).
+
+    Returns:
+        tuple: (dict model, dict laporan per model, jumlah baris train, jumlah baris test)
+    """
+    from sklearn.ensemble import StackingRegressor
+
+    X_train, y_train, X_test, y_test = load_split(cache_dir)
+    X_train = pd.DataFrame(X_train, columns=MODEL_FEATURES)
+    X_test = pd.DataFrame(X_test, columns=MODEL_FEATURES)
+    threads = max(1, os.cpu_count() or 1)
+
+    models = {}
+    with timer.stage('fit'):
+        for name in BASE_MODELS:
+            started = time.perf_counter()
+            model, fit_kwargs = build_estimator(name, tuned[name]['params'], threads)
+            model.fit(X_train, y_train, **fit_kwargs(X_test, y_test))
+            models[name] = model
+            print(f"   {name:9s} fitted in {time.perf_counter() - started:.1f} s")
+
+        # Base model di dalam stacking dilatih ulang per fold (tanpa eval set)
+        started = time.perf_counter()
+        stacking = StackingRegressor(
+            estimators=[(name, build_estimator(name, tuned[name]['params'], 1)[0]) for name in BASE_MODELS],
+            final_estimator=Ridge(alpha=1.0), cv=3, n_jobs=args.jobs,
+        )
+        stacking.fit(X_train, y_train)
+        models['stacking'] = stacking
+        print(f"   stacking  fitted in {time.perf_counter() - started:.1f} s")
+
+    reports = {}
+    with timer.stage('evaluate'):
+        for name, model in models.items():
+            reports[name] = regression_report(y_test, model.predict(X_test))
+            print(f"   {name:9s} MAE {reports[name]['MAE']:.4f} | RMSE {reports[name]['RMSE']:.4f} | "
+                  f"R2 {reports[name]['R2']:.4f} | within 10 min {reports[name]['within_10min_pct']:.1f}%")
+    return models, reports, len(y_train), len(y_test)
+
+
+# ============================================================================
+# ARTEFAK BERVERSI
+# ============================================================================
+
+MODEL_NAMES = {
+    'lgbm': 'LightGBM', 'xgb': 'XGBoost', 'catboost': 'CatBoost', 'stacking': 'Stacking Ensemble',
+}
+
+
+def save_artifacts(run_dir, version, models, reports, tuned, label_encoders, args,
+                   cache_info, train_size, test_size, timer, total_started):
+    """Tulis model terbaik + encoder + features list + metadata ke run_dir."""
+    best = min(reports, key=lambda name: reports[name]['MAE'])
+    with timer.stage('save'):
+        joblib.dump(models[best], os.path.join(run_dir, MODEL_FILE))
+        joblib.dump(label_encoders, os.path.join(run_dir, ENCODERS_FILE))
+        joblib.dump(list(MODEL_FEATURES), os.path.join(run_dir, FEATURES_FILE))
+    timer.seconds['total'] = round(time.perf_counter() - total_started, 3)
+
+    metadata = {
+        'version': version,
+        'model_name': MODEL_NAMES[best],
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'feature_version': FEATURE_VERSION,
+        'features_count': len(MODEL_FEATURES),
+        'features_list': list(MODEL_FEATURES),
+        'performance': reports[best],
+        'all_models_performance': [
+            {'model': MODEL_NAMES[name], **report} for name, report in reports.items()
+        ],
+        'hyperparameters': {name: result['params'] for name, result in tuned.items()},
+        'tuning': {
+            name: {k: v for k, v in result.items() if k != 'params'} for name, result in tuned.items()
+        },
+        'data_info': {
+            'dataset': os.path.abspath(args.dataset),
+            'clean_input': args.clean_input,
+            'lokasi_blend': args.lokasi_blend,
+            'cache_key': cache_info['key'],
+            'cache_hit': cache_info['hit'],
+            'train_size': train_size,
+            'test_size': test_size,
+        },
+        'trials_per_model': args.trials,
+        'jobs': args.jobs,
+        'stage_seconds': timer.seconds,
+    }
+    with open(os.path.join(run_dir, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=4, default=str)
+    return metadata
+
+
+def promote(run_dir, out_dir):
+    """Salin artefak versi ke out_dir (file .tmp lalu os.replace per file)."""
+    for filename in (ENCODERS_FILE, FEATURES_FILE, METADATA_FILE, MODEL_FILE):
+        tmp_path = os.path.join(out_dir, filename + '.tmp')
+        shutil.copyfile(os.path.join(run_dir, filename), tmp_path)
+        os.replace(tmp_path, os.path.join(out_dir, filename))
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train ARTG duration model (versioned artifacts)')
+    parser.add_argument('dataset', help='CSV dataset fitur (45 fitur + GATE_IN_STACK)')
+    parser.add_argument('--clean-input', action='store_true',
+                        help='Dataset adalah data bersih (CSV SLOT, ROW, TIER, STACK, GATE_IN, ... '
+                             'atau direktori partisi clean_raw_data.py)')
+    parser.add_argument('--trials', type=int, default=50, help='Trial Optuna per model')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Jumlah proses tuning (dibagi rata ke 3 studi)')
+    parser.add_argument('--out', default='models', help='Direktori artefak App.py')
+    parser.add_argument('--cache-dir', default=os.path.join('models', 'feature_cache'))
+    parser.add_argument('--rebuild-cache', action='store_true')
+    parser.add_argument('--lokasi-blend', type=float, default=0.3,
+                        help='Bobot LOKASI target encoding vs rata-rata global (notebook: 0.3, 1 = tanpa smoothing)')
+    parser.add_argument('--promote', action='store_true',
+                        help='Salin artefak versi baru ke --out (dipakai App.py saat restart)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timer = StageTimer()
+    total_started = time.perf_counter()
+
+    print("=" * 80)
+    print("ARTG TRAINING PIPELINE")
+    print("=" * 80)
+
+    cache_dir, label_encoders, cache_info = prepare_matrix(args, timer)
+
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{cache_info['key'][:8]}"
+    run_dir = os.path.join(args.out, 'versions', version)
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"\nVersion: {version} -> {run_dir}")
+
+    tuned = tune_all(cache_dir, args, run_dir, timer)
+    models, reports, train_size, test_size = fit_models(cache_dir, tuned, args, timer)
+    metadata = save_artifacts(run_dir, version, models, reports, tuned, label_encoders,
+                              args, cache_info, train_size, test_size, timer, total_started)
+
+    print("\n" + "=" * 80)
+    print(f"Best model: {metadata['model_name']} | MAE {metadata['performance']['MAE']:.4f}")
+    print("Stage wall-clock (s): " + ', '.join(f'{k} {v:.1f}' for k, v in timer.seconds.items()))
+    if args.promote:
+        promote(run_dir, args.out)
+        print(f"[OK] Promoted {version} -> {args.out}/ (rebuild prediction cube before restart)")
+    else:
+        print(f"[OK] Artifacts in {run_dir} (use --promote to activate)")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
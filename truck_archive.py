@@ -0,0 +1,267 @@
+"""
+TRUCK ARCHIVE
+=============
+Arsip kolom append-only untuk truk yang keluar dari antrian (remove_truck =
+selesai, clear_block = dibersihkan, sweeper = kedaluwarsa), sebagai ground
+truth untuk retraining dan pembaruan lookup tables.
+
+  - Request hanya memasukkan truk ke buffer memori berbatas (tidak menunggu disk);
+    jika buffer penuh, truk dibuang dan dihitung di metrics (archive_dropped)
+  - Thread writer menulis segmen .npz (satu array per kolom) saat buffer mencapai
+    segment_rows atau baris tertua melewati flush_interval_s
+  - Segmen ditulis ke file .tmp lalu di-rename (pembaca tidak pernah melihat
+    segmen setengah jadi); segmen tertua dihapus jika total melewati max_bytes
+
+Baca arsip:
+    from truck_archive import load_archive, completed_lookup_rows
+    df = load_archive('archive')              # semua kolom (COLUMNS)
+    rows = completed_lookup_rows(df)          # kolom dataset generate_lookups.py
+
+    python generate_lookups.py --archive archive
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import FEATURE_VERSION, TARGET_COL, shift_labels, to_int
+from service_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.npz'
+
+# Kolom arsip -> dtype numpy (string: unicode lebar variabel per segmen)
+COLUMNS = {
+    'truck_id': str,
+    'block_id': np.int8,
+    'block': str,
+    'lokasi': str,
+    'slot': str,
+    'row': str,
+    'tier': str,
+    'job_type': str,
+    'container_size': str,
+    'container_type': str,
+    'ctr_status': str,
+    'predicted_duration': np.float32,
+    'degraded': np.bool_,
+    'feature_hash': np.uint64,
+    'model_version': str,
+    'gate_in_ts': np.float64,
+    'removed_ts': np.float64,
+    'removal_reason': str,
+}
+
+# Field QueuedTruck yang menentukan vektor fitur (bersama model_version)
+FEATURE_INPUT_FIELDS = (
+    'job_type', 'container_size', 'container_type', 'ctr_status',
+    'slot', 'row', 'tier', 'block',
+)
+
+
+def feature_hash(truck):
+    """
+    Hash 64-bit input fitur truk (field kategori + jam/tanggal gate-in + FEATURE_VERSION).
+    Vektor fitur adalah fungsi deterministik dari input ini dan model_version.
+    """
+    gate_in = datetime.fromtimestamp(truck.gate_in_ts).strftime('%Y-%m-%d %H')
+    parts = [str(FEATURE_VERSION), gate_in]
+    parts.extend(getattr(truck, name) for name in FEATURE_INPUT_FIELDS)
+    digest = hashlib.blake2b('|'.join(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class TruckArchive:
+    """Writer arsip di background dengan buffer memori berbatas."""
+
+    def __init__(self, directory, model_version='', segment_rows=50_000,
+                 flush_interval_s=300.0, buffer_size=100_000, max_bytes=512 * 2**20):
+        self.directory = directory
+        self.model_version = model_version
+        self.segment_rows = segment_rows
+        self.flush_interval_s = flush_interval_s
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+
+        self.buffer = deque()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.write_lock = threading.Lock()
+        self.sequence = 0
+        self.closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name='truck-archive', daemon=True)
+        self.thread.start()
+        metrics.register_gauge('archive_buffered', lambda: len(self.buffer))
+
+    # ------------------------------------------------------------------
+    # Dipanggil dari request
+    # ------------------------------------------------------------------
+
+    def append(self, truck, block_id, reason, removed_ts=None):
+        """Antrikan satu truk (non-blocking). False jika buffer penuh."""
+        removed_ts = time.time() if removed_ts is None else removed_ts
+        with self.lock:
+            if len(self.buffer) >= self.buffer_size:
+                metrics.inc('archive_dropped')
+                return False
+            self.buffer.append((truck, block_id, reason, removed_ts, time.monotonic()))
+            full = len(self.buffer) >= self.segment_rows
+        metrics.inc('archive_appended')
+        if full:
+            self.wakeup.set()
+        return True
+
+    def extend(self, trucks, block_id, reason):
+        """Antrikan banyak truk dari satu blok (clear_block)."""
+        removed_ts = time.time()
+        return sum(self.append(t, block_id, reason, removed_ts) for t in trucks)
+
+    # ------------------------------------------------------------------
+    # Thread writer
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.wait(timeout=min(self.flush_interval_s, 5.0))
+            self.wakeup.clear()
+            try:
+                self._flush_due()
+            except Exception as e:
+                metrics.inc('archive_write_errors')
+                logger.error(f"Archive write error: {e}", exc_info=True)
+
+    def _flush_due(self):
+        while True:
+            with self.lock:
+                if not self.buffer:
+                    return
+                oldest_age = time.monotonic() - self.buffer[0][4]
+                if len(self.buffer) < self.segment_rows and oldest_age < self.flush_interval_s:
+                    return
+            self._write_batch()
+
+    def _take(self):
+        with self.lock:
+            count = min(len(self.buffer), self.segment_rows)
+            return [self.buffer.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Tulis semua isi buffer sekarang (shutdown / admin)."""
+        written = 0
+        while self.buffer:
+            written += self._write_batch()
+        return written
+
+    def close(self):
+        self.closed = True
+        self.wakeup.set()
+        return self.flush()
+
+    def _write_batch(self):
+        with self.write_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            columns = self._columns(batch)
+            self.sequence += 1
+            first_ts = datetime.fromtimestamp(batch[0][3]).strftime('%Y%m%dT%H%M%S')
+            name = f'{SEGMENT_PREFIX}{first_ts}-{os.getpid()}-{self.sequence:06d}'
+            tmp_path = os.path.join(self.directory, name + '.tmp' + SEGMENT_SUFFIX)
+            np.savez_compressed(tmp_path, **columns)
+            os.replace(tmp_path, os.path.join(self.directory, name + SEGMENT_SUFFIX))
+            self._enforce_retention()
+
+            metrics.inc('archive_rows_written', len(batch))
+            metrics.inc('archive_segments_written')
+            metrics.observe('archive_write_ms', (time.perf_counter() - started) * 1000)
+            return len(batch)
+
+    def _columns(self, batch):
+        trucks = [item[0] for item in batch]
+        columns = {
+            name: np.array([getattr(t, name) for t in trucks], dtype=COLUMNS[name])
+            for name in (
+                'truck_id', 'lokasi', 'slot', 'row', 'tier', 'block', 'job_type',
+                'container_size', 'container_type', 'ctr_status',
+                'predicted_duration', 'degraded', 'gate_in_ts',
+            )
+        }
+        columns['block_id'] = np.array([item[1] for item in batch], dtype=COLUMNS['block_id'])
+        columns['removal_reason'] = np.array([item[2] for item in batch], dtype=str)
+        columns['removed_ts'] = np.array([item[3] for item in batch], dtype=COLUMNS['removed_ts'])
+        columns['feature_hash'] = np.array([feature_hash(t) for t in trucks], dtype=np.uint64)
+        columns['model_version'] = np.array([self.model_version] * len(batch), dtype=str)
+        return columns
+
+    def _enforce_retention(self):
+        segments = list_segments(self.directory)
+        sizes = [os.path.getsize(path) for path in segments]
+        total = sum(sizes)
+        for path, size in zip(segments, sizes):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            metrics.inc('archive_segments_expired')
+
+
+def list_segments(directory):
+    """Segmen lengkap terurut dari yang tertua (file .tmp diabaikan)."""
+    pattern = os.path.join(directory, SEGMENT_PREFIX + '*' + SEGMENT_SUFFIX)
+    return sorted(
+        (p for p in glob.glob(pattern) if not p.endswith('.tmp' + SEGMENT_SUFFIX)),
+        key=lambda p: (os.path.getmtime(p), p),
+    )
+
+
+def load_archive(directory):
+    """Gabungkan semua segmen menjadi satu DataFrame (kolom COLUMNS)."""
+    frames = []
+    for path in list_segments(directory):
+        with np.load(path, allow_pickle=False) as segment:
+            frames.append(pd.DataFrame({name: segment[name] for name in COLUMNS}))
+    if not frames:
+        return pd.DataFrame({name: pd.Series(dtype=object) for name in COLUMNS})
+    return pd.concat(frames, ignore_index=True)
+
+
+def completed_lookup_rows(archive_df, min_minutes=None, max_minutes=None):
+    """
+    Truk yang selesai (removal_reason == 'removed') dalam bentuk kolom dataset
+    generate_lookups.py: slot, row_numeric, tier, block, gate_in_hour,
+    gate_in_shift, GATE_IN_STACK (durasi aktual menit = removed - gate-in).
+    """
+    done = archive_df[archive_df['removal_reason'] == 'removed']
+    minutes = (done['removed_ts'].astype(float) - done['gate_in_ts'].astype(float)) / 60.0
+    keep = minutes > 0
+    if min_minutes is not None:
+        keep &= minutes >= min_minutes
+    if max_minutes is not None:
+        keep &= minutes <= max_minutes
+    done = done[keep]
+    minutes = minutes[keep]
+
+    # Jam lokal, sama dengan gate_in_time di antrian
+    hours = np.array([datetime.fromtimestamp(ts).hour for ts in done['gate_in_ts']], dtype=int)
+    return pd.DataFrame({
+        'slot': done['slot'].to_numpy(),
+        'row_numeric': to_int(done['row']).to_numpy(),
+        'tier': done['tier'].to_numpy(),
+        'block': done['block'].to_numpy(),
+        'gate_in_hour': hours,
+        'gate_in_shift': shift_labels(hours).to_numpy(),
+        TARGET_COL: minutes.to_numpy(),
+    })
@@ -0,0 +1,96 @@
+"""
+TRUCK ENTRY
+===========
+Representasi ringkas truk di QUEUES.
+
+  - __slots__ (tanpa __dict__ per objek)
+  - nilai kategori (job, ukuran, tipe, status, lokasi, slot, row, tier, block)
+    di-intern: truk di lokasi yang sama berbagi satu objek string
+  - waktu gate-in disimpan sebagai epoch detik (float); expected_ready_time
+    dan prediction_source diturunkan saat serialisasi
+
+Bentuk JSON lama (dict 16 field) hanya dibuat di tepi API lewat to_dict().
+Objek diperlakukan immutable setelah masuk antrian (lihat queue_store.py).
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_intern = sys.intern
+
+
+class QueuedTruck:
+    """Satu truk dalam antrian blok."""
+
+    __slots__ = (
+        'truck_id', 'job_type', 'container_size', 'container_type', 'ctr_status',
+        'lokasi', 'slot', 'row', 'tier', 'block',
+        'predicted_duration', 'degraded', 'gate_in_ts',
+    )
+
+    def __init__(self, truck_id, job_type, container_size, container_type, ctr_status,
+                 lokasi, slot, row, tier, block, predicted_duration, degraded, gate_in_ts):
+        self.truck_id = truck_id
+        self.job_type = _intern(job_type)
+        self.container_size = _intern(container_size)
+        self.container_type = _intern(container_type)
+        self.ctr_status = _intern(ctr_status)
+        self.lokasi = _intern(lokasi)
+        self.slot = _intern(slot)
+        self.row = _intern(row)
+        self.tier = _intern(tier)
+        self.block = _intern(block)
+        self.predicted_duration = predicted_duration
+        self.degraded = degraded
+        self.gate_in_ts = gate_in_ts
+
+    @classmethod
+    def from_record(cls, record, predicted_duration, degraded_reason=None, gate_in_ts=None):
+        """Bentuk dari TruckRecord; gate_in_ts default = sekarang."""
+        return cls(
+            record.truck_id,
+            record.job_type,
+            record.container_size,
+            record.container_type,
+            record.ctr_status,
+            record.lokasi,
+            record.slot,
+            record.row,
+            record.tier,
+            record.block_code,
+            predicted_duration,
+            degraded_reason is not None,
+            datetime.now().timestamp() if gate_in_ts is None else gate_in_ts,
+        )
+
+    @property
+    def expected_ready_ts(self):
+        return self.gate_in_ts + self.predicted_duration * 60.0
+
+    def to_dict(self):
+        """Bentuk JSON API (sama dengan format antrian sebelumnya)."""
+        gate_in_time = datetime.fromtimestamp(self.gate_in_ts)
+        expected_ready_time = gate_in_time + timedelta(minutes=self.predicted_duration)
+        return {
+            'truck_id': self.truck_id,
+            'job_type': self.job_type,
+            'container_size': self.container_size,
+            'container_type': self.container_type,
+            'ctr_status': self.ctr_status,
+            'lokasi': self.lokasi,
+            'slot': self.slot,
+            'row': self.row,
+            'tier': self.tier,
+            'block': self.block,
+            'predicted_duration': self.predicted_duration,
+            'prediction_source': 'fallback' if self.degraded else 'model',
+            'degraded': self.degraded,
+            'gate_in_time': gate_in_time.strftime(TIME_FORMAT),
+            'expected_ready_time': expected_ready_time.strftime(TIME_FORMAT),
+            'added_at': gate_in_time.isoformat(),
+        }
+
+    def __repr__(self):
+        return f'QueuedTruck({self.truck_id!r}, {self.lokasi!r}, {self.predicted_duration})'